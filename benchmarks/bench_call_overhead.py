@@ -0,0 +1,67 @@
+"""Microbenchmark of the per-call overhead of argument validation.
+
+Requests are answered by a canned response instead of the network, so the
+timings contain serialization, argument handling and deserialization only.
+
+Run from the repository root::
+
+    python benchmarks/bench_call_overhead.py [--calls N] [--entries N]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+import urllib3
+
+from pytypid import ApiClient, Configuration, PIDManagementApi
+from pytypid.record import CompactRecord
+from pytypid_generated_client import rest
+
+
+class CannedApiClient(ApiClient):
+    """Answers every request with the same response, without sending it."""
+
+    def __init__(self, configuration: Configuration, body: bytes) -> None:
+        super().__init__(configuration)
+        self.body = body
+
+    def call_api(self, *args: Any, **kwargs: Any) -> rest.RESTResponse:
+        response = urllib3.HTTPResponse(
+            body=self.body, status=201, headers={"Content-Type": "application/json"}
+        )
+        return rest.RESTResponse(response)
+
+
+def measure(name: str, function: Callable[[], Any], calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    per_call = (time.perf_counter() - start) / calls
+    print("%-36s %8.1f us/call" % (name, per_call * 1e6))
+    return per_call
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--entries", type=int, default=10, help="entries per record")
+    args = parser.parse_args()
+
+    keys = ["21.T11148/%028x" % i for i in range(args.entries)]
+    record = CompactRecord("pid/1", keys, ["value"] * len(keys)).to_record()
+    body = json.dumps(record.to_dict()).encode()
+    api = PIDManagementApi(CannedApiClient(Configuration(), body))
+
+    validated = measure(
+        "create_pid", lambda: api.create_pid(pid_record=record, dryrun=True), args.calls
+    )
+    fast = measure(
+        "fast.create_pid", lambda: api.fast.create_pid(pid_record=record, dryrun=True), args.calls
+    )
+    print("%-36s %8.1f us/call" % ("saved", (validated - fast) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
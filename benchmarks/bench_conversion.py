@@ -0,0 +1,51 @@
+"""Benchmark of record conversions, for 1M key/value pairs by default.
+
+Run from the repository root::
+
+    python benchmarks/bench_conversion.py [--records N] [--pairs N]
+"""
+
+import argparse
+import time
+from typing import Any, Callable, List
+
+from pytypid import SimpleRecord
+from pytypid.record import to_compact_records, to_records, to_simple_records
+from pytypid_generated_client.models import SimplePair
+
+
+def measure(name: str, function: Callable[[], Any], pairs: int) -> Any:
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    print("%-40s %8.3f s %10.0f pairs/s" % (name, seconds, pairs / seconds))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--pairs", type=int, default=10, help="pairs per record")
+    args = parser.parse_args()
+    total = args.records * args.pairs
+
+    keys = ["21.T11148/%028x" % i for i in range(args.pairs)]
+    simple: List[SimpleRecord] = [
+        SimpleRecord(pid="pid/%d" % i, record=[
+            SimplePair(key=key, value="value %d" % (i % 100)) for key in keys
+        ])
+        for i in range(args.records)
+    ]
+    print("%d records with %d pairs each" % (args.records, args.pairs))
+
+    measure("SimpleRecord.to_record (per record)", lambda: [r.to_record() for r in simple], total)
+    measure("to_records(trusted=False)", lambda: to_records(simple, trusted=False), total)
+    records = measure("to_records", lambda: to_records(simple), total)
+    measure("to_records(pause_gc=True)", lambda: to_records(simple, pause_gc=True), total)
+    measure("to_simple_records", lambda: to_simple_records(records), total)
+    compact = measure("to_compact_records", lambda: to_compact_records(records), total)
+    measure("to_records(compact)", lambda: to_records(compact), total)
+
+
+if __name__ == "__main__":
+    main()
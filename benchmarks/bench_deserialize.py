@@ -0,0 +1,54 @@
+"""Benchmark of response deserialization per validation mode, for 10k
+records and 10k known PIDs by default.
+
+Run from the repository root::
+
+    python benchmarks/bench_deserialize.py [--records N] [--entries N] [--repeat N]
+"""
+
+import argparse
+import json
+import time
+
+from pytypid import ApiClient, Configuration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--entries", type=int, default=10, help="entries per record")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    keys = ["21.T11148/%028x" % i for i in range(args.entries)]
+    batch = json.dumps({
+        "pidRecords": [
+            {"pid": "pid/%d" % i, "entries": {k: [{"key": k, "value": str(i)}] for k in keys}}
+            for i in range(args.records)
+        ],
+        "mapping": {},
+    })
+    known_pids = json.dumps([
+        {"pid": "pid/%d" % i, "created": "2024-05-01T10:00:00Z", "modified": "2024-05-02T10:00Z"}
+        for i in range(args.records)
+    ])
+    print("%d records with %d entries each, best of %d"
+          % (args.records, args.entries, args.repeat))
+    print("%-12s %24s %24s" % ("validation", "BatchRecordResponse", "List[KnownPid]"))
+
+    for validation in Configuration.RESPONSE_VALIDATION:
+        client = ApiClient(Configuration(response_validation=validation))
+        timings = []
+        responses = ((batch, "BatchRecordResponse"), (known_pids, "List[KnownPid]"))
+        for text, response_type in responses:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                client.deserialize(text, response_type, "application/json")
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+        print("%-12s %22.1f ms %22.1f ms" % (validation, timings[0] * 1000, timings[1] * 1000))
+
+
+if __name__ == "__main__":
+    main()
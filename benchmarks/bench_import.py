@@ -0,0 +1,87 @@
+"""Benchmark of the import time of pytypid, as paid by every cold start.
+
+Each statement is run in a fresh interpreter, several times; the minimum is
+the least noisy estimate. With ``--output``, the results are appended as a
+JSON line together with the package version, so they can be compared across
+releases.
+
+Run from the repository root::
+
+    PYTHONPATH=. python benchmarks/bench_import.py [--runs N] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+STATEMENTS = {
+    "import pytypid": "import pytypid",
+    "records": "from pytypid.record import CompactRecord",
+    "client": "from pytypid import ApiClient, Configuration, PIDManagementApi",
+    "generated model": "from pytypid_generated_client import PIDRecord",
+    "first call": (
+        "from pytypid import ApiClient, Configuration, PIDManagementApi\n"
+        "from pytypid.stub import StubService\n"
+        "from pytypid.transport import WSGITransport\n"
+        "transport = WSGITransport(StubService())\n"
+        "configuration = Configuration(host='http://stub', transport=transport)\n"
+        "PIDManagementApi(ApiClient(configuration)).find_all(size=1)"
+    ),
+}
+
+_TIMER = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "exec(compile(%r, '<bench>', 'exec'))\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def measure(statement: str, runs: int) -> List[float]:
+    """Seconds taken by `statement` in `runs` fresh interpreters."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _TIMER % statement],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        times.append(float(output))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="JSON lines file to append the results to")
+    args = parser.parse_args()
+
+    # compile the byte code first, so that it is not part of the first run
+    measure("import pytypid.load", 1)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, statement in STATEMENTS.items():
+        times = measure(statement, args.runs)
+        results[name] = {"min": min(times), "median": statistics.median(times)}
+        print("%-18s %8.1f ms min %8.1f ms median" % (
+            name, min(times) * 1e3, statistics.median(times) * 1e3
+        ))
+
+    if args.output:
+        from pytypid_generated_client import __version__
+
+        with open(args.output, "a") as file:
+            file.write(json.dumps({
+                "version": __version__,
+                "python": platform.python_version(),
+                "runs": args.runs,
+                "results": results,
+            }) + "\n")
+
+
+if __name__ == "__main__":
+    main()
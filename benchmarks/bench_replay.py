@@ -0,0 +1,72 @@
+"""Benchmark of the client-side cost of a recorded workload.
+
+Replays a recording made with `pytypid.replay.RecordingTransport`, so the
+timings contain the work of the client only: serialization, the generated
+API layer, decoding and deserialization. Without a recording, a workload of
+`create_pids` and `find_all` calls is recorded against the in-memory
+`pytypid.stub.StubService` first.
+
+Run from the repository root::
+
+    python benchmarks/bench_replay.py [--batches N] [--records N] [--repeat N]
+"""
+
+import argparse
+import io
+import time
+import tracemalloc
+
+from pytypid import ApiClient, Configuration, PIDManagementApi
+from pytypid.record import CompactRecord
+from pytypid.replay import RecordingTransport, ReplayTransport
+from pytypid.stub import StubService
+from pytypid.transport import WSGITransport
+
+HOST = "http://stub"
+
+
+def workload(api: PIDManagementApi, batches: int, records: int) -> None:
+    keys = ["21.T11148/%028x" % i for i in range(10)]
+    for _ in range(batches):
+        batch = [
+            CompactRecord("tmp/%d" % i, keys, ["value %d" % i] * len(keys)).to_record()
+            for i in range(records)
+        ]
+        api.create_pids(batch, dryrun=True)
+        api.find_all(size=records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--records", type=int, default=1000, help="records per batch")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    recording = io.BytesIO()
+    recorder = RecordingTransport(recording, WSGITransport(StubService()))
+    with ApiClient(Configuration(host=HOST, transport=recorder)) as client:
+        workload(PIDManagementApi(client), args.batches, args.records)
+    recorder.close()
+    print("recording: %d bytes" % len(recording.getvalue()))
+
+    for run in range(args.repeat + 1):
+        recording.seek(0)
+        replay = ReplayTransport(recording)
+        api = PIDManagementApi(ApiClient(Configuration(host=HOST, transport=replay)))
+        if run == args.repeat:
+            # separately, since tracing slows down the workload
+            tracemalloc.start()
+            workload(api, args.batches, args.records)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print("replay: %8.1f MiB peak memory" % (peak / 2**20))
+            break
+        wall, cpu = time.perf_counter(), time.process_time()
+        workload(api, args.batches, args.records)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        print("replay: %8.1f ms wall %8.1f ms cpu" % (wall * 1e3, cpu * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark of timestamp parsing for a page of 100k known PIDs.
+
+Compares the parsers on the two timestamps of every known PID, then times
+the deserialization of the whole page per validation mode. ``--distinct``
+sets how many different timestamps the page contains; PIDs created in
+batches share theirs.
+
+Run from the repository root::
+
+    python benchmarks/bench_timestamps.py [--pids N] [--distinct N] [--repeat N]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, List
+
+from dateutil.parser import isoparse, parse
+from pydantic import TypeAdapter
+
+from pytypid import ApiClient, Configuration, timestamps
+from pytypid.timestamps import parse_datetime
+
+
+def best(function: Callable[[], Any], repeat: int, setup: Callable[[], Any] = list) -> float:
+    timings = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pids", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=1_000, help="different timestamps")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    texts = [
+        (start + timedelta(seconds=i * 7.123)).isoformat(timespec="milliseconds")
+        .replace("+00:00", "Z")
+        for i in range(args.distinct)
+    ]
+    page = [
+        {"pid": "pid/%d" % i, "created": texts[i % len(texts)],
+         "modified": texts[(i * 7) % len(texts)]}
+        for i in range(args.pids)
+    ]
+    values: List[str] = [p[k] for p in page for k in ("created", "modified")]
+    adapter = TypeAdapter(datetime)
+    print("%d timestamps, %d distinct, best of %d" % (len(values), args.distinct, args.repeat))
+
+    parsers = [
+        ("dateutil.parser.parse", parse, list),
+        ("dateutil.parser.isoparse", isoparse, list),
+        ("pydantic", adapter.validate_python, list),
+        ("parse_datetime, cold cache", parse_datetime, timestamps._cache.clear),
+        ("parse_datetime, warm cache", parse_datetime, list),
+    ]
+    for name, function, setup in parsers:
+        seconds = best(lambda: [function(v) for v in values], args.repeat, setup)
+        print("%-28s %8.1f ms %8.0f ns/timestamp" % (
+            name, seconds * 1e3, seconds / len(values) * 1e9
+        ))
+
+    text = json.dumps(page)
+    print("\nList[KnownPid] page of %d" % args.pids)
+    for validation in Configuration.RESPONSE_VALIDATION:
+        client = ApiClient(Configuration(response_validation=validation))
+        seconds = best(
+            lambda: client.deserialize(text, "List[KnownPid]", "application/json"),
+            args.repeat, timestamps._cache.clear,
+        )
+        print("%-28s %8.1f ms" % (validation, seconds * 1e3))
+
+
+if __name__ == "__main__":
+    main()
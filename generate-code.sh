@@ -11,3 +11,6 @@ docker run --rm -v ${PWD}:/local $DOCKER_IMAGE generate \
     -g python \
     -o /local \
     --additional-properties=packageName=pytypid_generated_client,packageUrl=https://github.com/kit-data-manager/typid-client,packageVersion=${VERSION:?Version number required},disallowAdditionalPropertiesIfNotPresent=false
+
+# lazy imports and deferred validators, see postprocess_generated.py
+python3 postprocess_generated.py
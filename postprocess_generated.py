@@ -0,0 +1,199 @@
+"""Post-process the generated client for a fast import.
+
+Run by generate-code.sh after the generator, so the changes survive
+regenerating the client from a new version of the API:
+
+* The `__init__` modules of the package import their members on first
+  access instead of importing all APIs and models up front.
+* pydantic builds the validators of models and API methods when they are
+  first used, not on import (`defer_build`).
+* dateutil and multiprocessing, which are slow to import, are imported
+  where they are used.
+
+Each change is applied only if it is missing, so running the script again
+changes nothing. With --check, the files are left as they are and the exit
+status tells if any change is missing.
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PACKAGE = "pytypid_generated_client"
+
+_IMPORT = re.compile(r"^from (%s\.[\w.]+) import (\w+)(?: as \w+)?$" % PACKAGE)
+
+_LAZY_FUNCTIONS = '''
+
+
+def __getattr__(name: str) -> Any:
+    # import the module defining `name` on first access only
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name)) from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+'''
+
+
+def lazy_init(text: str) -> str:
+    """Turn the imports of the members of a package `__init__` into lazy
+    ones."""
+    if "_LAZY_IMPORTS" in text:
+        return text
+    lines = text.splitlines()
+    kept: List[str] = []
+    imports: List[str] = []
+    modules: Dict[str, str] = {}
+    position = None
+    for line in lines:
+        match = _IMPORT.match(line)
+        if match:
+            if position is None:
+                position = len(kept)
+            imports.append(line)
+            modules[match.group(2)] = match.group(1)
+        elif line.startswith("# import "):
+            continue
+        else:
+            kept.append(line)
+    if position is None:
+        return text
+    block = [
+        "# import the members lazily, on first access, so that importing one",
+        "# module does not import (and build) all of them",
+        "import importlib",
+        "from typing import TYPE_CHECKING, Any, List",
+        "",
+        "if TYPE_CHECKING:",
+    ] + ["    " + line for line in imports] + [
+        "",
+        "_LAZY_IMPORTS = {",
+    ] + ['    "%s": "%s",' % item for item in modules.items()] + ["}"]
+    head = "\n".join(kept[:position]).rstrip("\n")
+    tail = "\n".join(kept[position:]).strip("\n")
+    return head + "\n\n" + "\n".join(block) + _LAZY_FUNCTIONS + (
+        "\n\n" + tail + "\n" if tail else ""
+    )
+
+
+def defer_model(text: str) -> str:
+    """Build the validators of a model on first use."""
+    if "defer_build=True" in text:
+        return text
+    return re.sub(
+        r"(    model_config = ConfigDict\(\n(?:        .*\n)*?)(    \))",
+        r"\1        defer_build=True,\n\2",
+        text,
+        count=1,
+    )
+
+
+def defer_api_response(text: str) -> str:
+    """Build the validators of the generic `ApiResponse` on first use."""
+    if '"defer_build": True' in text:
+        return text
+    return text.replace(
+        '"arbitrary_types_allowed": True\n', '"arbitrary_types_allowed": True,\n'
+        '        "defer_build": True,\n', 1
+    )
+
+
+def defer_api(text: str) -> str:
+    """Build the validators of the API methods on their first call."""
+    if "_DEFERRED" in text:
+        return text
+    text = text.replace("from pydantic import validate_call,", "from pydantic import ConfigDict, "
+                        "validate_call,", 1)
+    text = text.replace("    @validate_call\n", "    @validate_call(config=_DEFERRED)\n")
+    return text.replace(
+        "\n\nclass ",
+        "\n# build the validators of the methods on their first call, not on import\n"
+        "_DEFERRED = ConfigDict(defer_build=True)\n\n\nclass ",
+        1,
+    )
+
+
+def local_dateutil(text: str) -> str:
+    """Import dateutil when parsing dates."""
+    if "from dateutil.parser import parse\n" not in text.split("\nclass ", 1)[0]:
+        return text
+    text = text.replace("from dateutil.parser import parse\n", "", 1)
+    return re.sub(
+        r"^( +)(return parse\(string\))",
+        r"\1from dateutil.parser import parse\n\1\2",
+        text,
+        flags=re.MULTILINE,
+    )
+
+
+def local_multiprocessing(text: str) -> str:
+    """Import multiprocessing only for the default pool size."""
+    assignment = (
+        "        self.connection_pool_maxsize = connection_pool_maxsize if "
+        "connection_pool_maxsize is not None else multiprocessing.cpu_count() * 5\n"
+    )
+    if assignment not in text:
+        return text
+    text = text.replace("import multiprocessing\n", "", 1)
+    return text.replace(
+        assignment,
+        "        if connection_pool_maxsize is None:\n"
+        "            # imported here, multiprocessing is slow to import\n"
+        "            import multiprocessing\n"
+        "            connection_pool_maxsize = multiprocessing.cpu_count() * 5\n"
+        "        self.connection_pool_maxsize = connection_pool_maxsize\n",
+        1,
+    )
+
+
+def steps(root: Path) -> Dict[Path, List[Callable[[str], str]]]:
+    """The changes to apply, by file."""
+    package = root / PACKAGE
+    files: Dict[Path, List[Callable[[str], str]]] = {
+        package / "__init__.py": [lazy_init],
+        package / "api" / "__init__.py": [lazy_init],
+        package / "models" / "__init__.py": [lazy_init],
+        package / "api_response.py": [defer_api_response],
+        package / "api_client.py": [local_dateutil],
+        package / "configuration.py": [local_multiprocessing],
+    }
+    for path in sorted((package / "api").glob("*_api.py")):
+        files[path] = [defer_api]
+    for path in sorted((package / "models").glob("*.py")):
+        if path.name != "__init__.py":
+            files[path] = [defer_model]
+    return files
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", nargs="?", default=Path(__file__).parent, type=Path,
+                        help="directory containing %s" % PACKAGE)
+    parser.add_argument("--check", action="store_true",
+                        help="only report files missing a change, with exit status 1")
+    args = parser.parse_args(argv)
+    missing = []
+    for path, changes in steps(args.root).items():
+        text = original = path.read_text(encoding="utf-8")
+        for change in changes:
+            text = change(text)
+        if text != original:
+            missing.append(path)
+            if not args.check:
+                path.write_text(text, encoding="utf-8")
+    for path in missing:
+        print(("missing changes: %s" if args.check else "changed: %s") % path)
+    return 1 if args.check and missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
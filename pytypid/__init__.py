@@ -1,7 +1,48 @@
-from pytypid_generated_client.api import PIDManagementApi
-from pytypid_generated_client.models import BatchRecordResponse
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
-from .record import SimpleRecord
+if TYPE_CHECKING:
+    from pytypid_generated_client.models import BatchRecordResponse
+
+    from .api import PIDManagementApi
+    from .client import ApiClient
+    from .configuration import Configuration
+    from .metrics import TransportMetrics
+    from .record import CompactRecord, SimpleRecord
 
 # Explicit public members
-__all__ = ["SimpleRecord", "PIDManagementApi", "BatchRecordResponse"]
+__all__ = [
+    "SimpleRecord",
+    "CompactRecord",
+    "PIDManagementApi",
+    "BatchRecordResponse",
+    "ApiClient",
+    "Configuration",
+    "TransportMetrics",
+]
+
+# The members are imported on first access: `import pytypid` is cheap, and
+# e.g. `from pytypid import CompactRecord` does not import the API classes.
+_LAZY_IMPORTS = {
+    "SimpleRecord": "pytypid.record",
+    "CompactRecord": "pytypid.record",
+    "PIDManagementApi": "pytypid.api",
+    "BatchRecordResponse": "pytypid_generated_client.models",
+    "ApiClient": "pytypid.client",
+    "Configuration": "pytypid.configuration",
+    "TransportMetrics": "pytypid.metrics",
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name)) from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -0,0 +1,220 @@
+"""API classes with a call path that skips argument validation.
+
+The public methods of the generated API classes are wrapped by pydantic's
+`validate_call`, which validates every argument on every call, including
+models that were validated when they were built. The classes created by
+`unvalidated` call the undecorated methods instead. They serialize the same
+request, as long as the arguments already have the declared types.
+"""
+
+import os
+from typing import IO, Any, Dict, List, Optional, Tuple, Type, TypeVar, Union, cast
+from urllib.parse import quote
+
+from pytypid_generated_client.api.pid_management_api import (
+    PIDManagementApi as GeneratedPIDManagementApi,
+)
+from pytypid_generated_client.api_response import ApiResponse
+from pytypid_generated_client.models import KnownPid, PIDRecord
+
+from .streaming import DEFAULT_CHUNK_SIZE, BatchRecordStream, ModelStream, ResponseBody
+from .table import KnownPidTable
+
+A = TypeVar("A")
+
+_RECORD_RESPONSE_TYPES: Dict[str, Optional[str]] = {
+    "400": None,
+    "200": "PIDRecord",
+    "404": None,
+    "409": None,
+    "412": None,
+    "428": None,
+    "503": None,
+    "500": None,
+}
+
+_unvalidated: Dict[type, type] = {}
+
+
+def unvalidated(api_cls: Type[A]) -> Type[A]:
+    """Return a subclass of a generated API class whose public methods skip
+    the validation of their arguments."""
+    try:
+        return _unvalidated[api_cls]
+    except KeyError:
+        pass
+    methods: Dict[str, Any] = {}
+    for name in dir(api_cls):
+        wrapped = getattr(getattr(api_cls, name), "__wrapped__", None)
+        if not name.startswith("_") and wrapped is not None:
+            methods[name] = wrapped
+    fast_cls: Type[A] = type("Fast" + api_cls.__name__, (api_cls,), {
+        "__doc__": "`%s` without validation of method arguments." % api_cls.__name__,
+        "__module__": __name__,
+        **methods,
+    })
+    _unvalidated[api_cls] = fast_cls
+    return fast_cls
+
+
+class PIDManagementApi(GeneratedPIDManagementApi):
+    """Generated `PIDManagementApi`, with a fast variant for hot loops,
+    streaming variants for large responses, and methods addressing single
+    PIDs.
+
+    `api.fast` offers the same methods without validation of their
+    arguments, which saves the cost of validating already validated
+    models on every call::
+
+        for record in records:
+            api.fast.create_pid(pid_record=record, dryrun=True)
+
+    Passing arguments of the wrong type to the fast methods is not detected
+    and may produce invalid requests.
+    """
+
+    _fast: Optional[GeneratedPIDManagementApi] = None
+
+    @property
+    def fast(self) -> GeneratedPIDManagementApi:
+        """This API without validation of method arguments."""
+        if self._fast is None:
+            self._fast = unvalidated(GeneratedPIDManagementApi)(self.api_client)
+        return self._fast
+
+    def find_all_stream(
+        self, *, chunk_size: int = DEFAULT_CHUNK_SIZE, **kwargs: Any
+    ) -> ModelStream[KnownPid]:
+        """Like `find_all`, but decode the known PIDs while the response
+        arrives, instead of reading it completely first::
+
+            with api.find_all_stream(size=100000) as known_pids:
+                for known_pid in known_pids:
+                    ...
+
+        The response is requested in the JSON list format.
+
+        :param chunk_size: Number of bytes to read at once.
+        :param kwargs: Arguments of `find_all`.
+        """
+        kwargs["accept"] = "application/json"
+        response = self.find_all_without_preload_content(**kwargs)
+        return ModelStream(
+            self.api_client, response, "KnownPid",
+            chunk_size=chunk_size, response_types_map={"400": "object"},
+        )
+
+    def find_all_table(
+        self,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_numpy: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> KnownPidTable:
+        """Like `find_all`, but return the known PIDs as columns, filled while
+        the response arrives without building a `KnownPid` per row.
+
+        :param chunk_size: Number of bytes to read at once.
+        :param use_numpy: See `KnownPidTable`.
+        :param kwargs: Arguments of `find_all`.
+        """
+        with self.find_all_stream(chunk_size=chunk_size, **kwargs) as known_pids:
+            return KnownPidTable.from_json(known_pids.iter_json(), use_numpy)
+
+    def export_known_pids(
+        self,
+        target: Union[str, "os.PathLike[str]", IO[bytes]],
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> int:
+        """Write a `find_all` response to a file as it arrives, without
+        decoding it.
+
+        :param target: Path of the file to create or overwrite, or a binary
+          file object.
+        :param chunk_size: Number of bytes to read and write at once.
+        :param kwargs: Arguments of `find_all`, e.g. `accept` to select the
+          format.
+        :return: Number of bytes written.
+        """
+        response = self.find_all_without_preload_content(**kwargs)
+        body = ResponseBody(
+            response, chunk_size, api_client=self.api_client, response_types_map={"400": "object"}
+        )
+        return body.write_to(target)
+
+    def create_pids_stream(
+        self,
+        pid_record: List[PIDRecord],
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> BatchRecordStream:
+        """Like `create_pids`, but decode the created records while the
+        response arrives. The mapping of placeholder PIDs is available from
+        the stream once all records were read.
+
+        :param chunk_size: Number of bytes to read at once.
+        :param kwargs: Further arguments of `create_pids`.
+        """
+        response = self.create_pids_without_preload_content(pid_record, **kwargs)
+        return BatchRecordStream(
+            self.api_client, response, "PIDRecord", path=("pidRecords",), chunk_size=chunk_size
+        )
+
+    def get_pid_record(
+        self, pid: str, validation: Optional[bool] = None, **kwargs: Any
+    ) -> PIDRecord:
+        """Get the record of `pid`.
+
+        The generated `get_record` has no parameter for the PID, as the API
+        describes its path as ``/pid/**``.
+
+        :param validation: If true, validate the record before returning it.
+        :param kwargs: `_request_timeout` or `_headers`.
+        """
+        return self.get_pid_record_with_http_info(pid, validation, **kwargs).data
+
+    def get_pid_record_with_http_info(
+        self, pid: str, validation: Optional[bool] = None, **kwargs: Any
+    ) -> ApiResponse[PIDRecord]:
+        """Like `get_pid_record`, with status and headers, e.g. the ETag."""
+        param = self._get_record_serialize(validation, None, None, kwargs.get("_headers"), 0)
+        return self._call_for_pid(pid, param, kwargs.get("_request_timeout"))
+
+    def update_pid_record(
+        self, pid: str, pid_record: PIDRecord, dryrun: Optional[bool] = None, **kwargs: Any
+    ) -> PIDRecord:
+        """Replace the record of `pid`.
+
+        The generated `update_pid` has no parameter for the PID, as the API
+        describes its path as ``/pid/**``.
+
+        :param dryrun: If true, only validate the update.
+        :param kwargs: `_request_timeout` or `_headers`, e.g. ``If-Match``.
+        """
+        return self.update_pid_record_with_http_info(pid, pid_record, dryrun, **kwargs).data
+
+    def update_pid_record_with_http_info(
+        self, pid: str, pid_record: PIDRecord, dryrun: Optional[bool] = None, **kwargs: Any
+    ) -> ApiResponse[PIDRecord]:
+        """Like `update_pid_record`, with status and headers, e.g. the new
+        ETag."""
+        param = self._update_pid_serialize(
+            pid_record, dryrun, None, None, kwargs.get("_headers"), 0
+        )
+        return self._call_for_pid(pid, param, kwargs.get("_request_timeout"))
+
+    def _call_for_pid(
+        self, pid: str, param: Tuple[Any, ...], request_timeout: Any
+    ) -> ApiResponse[PIDRecord]:
+        method, url, *rest = param
+        url = url.replace("/pid/**", "/pid/" + quote(pid, safe="/"), 1)
+        response_data = self.api_client.call_api(
+            method, url, *rest, _request_timeout=request_timeout
+        )
+        response_data.read()
+        return cast(ApiResponse[PIDRecord], self.api_client.response_deserialize(
+            response_data=response_data, response_types_map=_RECORD_RESPONSE_TYPES
+        ))
@@ -0,0 +1,169 @@
+"""Bulk creation and validation of PID records on a pool of worker processes.
+
+Building, validating and serializing pydantic models is bound to the GIL,
+which limits a single process to a few thousand records per second.
+`BulkRunner` shards the records into chunks, which worker processes (see
+`pytypid.parallel`) turn into requests, and merges the results back in
+input order. Records travel between the processes in the compact binary
+form of `pytypid.codec`, and workers turn them into request bodies without
+building pydantic models. As `CompactRecord` keeps only the PID, keys,
+values and entry names, additional properties of the records are not sent,
+nor returned.
+"""
+
+import json
+import multiprocessing.context
+from concurrent.futures import ProcessPoolExecutor
+from types import TracebackType
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar, cast
+
+from pytypid_generated_client import rest
+from pytypid_generated_client.configuration import Configuration
+from pytypid_generated_client.exceptions import ApiException
+from pytypid_generated_client.models import BatchRecordResponse, PIDRecord
+
+from .api import PIDManagementApi
+from .codec import decode_compact_records, decode_records, encode_records
+from .parallel import worker_client, worker_pool
+from .record import AnyRecord, CompactRecord
+
+T = TypeVar("T")
+
+
+def _chunks(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _data(api: PIDManagementApi, response: Any, response_type: Optional[str]) -> Any:
+    """Read the response of a `*_without_preload_content` call like the
+    generated API methods do, and return its data.
+
+    :param response_type: Type of successful responses, None to skip
+      deserialization.
+    :raises ApiException: if the server answered with an error status.
+    """
+    response_data = rest.RESTResponse(response)
+    response_data.read()  # type: ignore[no-untyped-call]
+    return api.api_client.response_deserialize(
+        response_data=response_data,
+        response_types_map={"2XX": response_type},
+    ).data
+
+
+def _create_pids_chunk(payload: bytes, dryrun: bool) -> Tuple[bytes, Dict[str, str]]:
+    """Worker side of `BulkRunner.create_pids`."""
+    api = PIDManagementApi(worker_client())
+    # the unvalidated methods serialize the JSON representation of the
+    # records as it is, without building the models
+    body = cast(List[PIDRecord], [record.to_dict() for record in decode_compact_records(payload)])
+    response_data = api.fast.create_pids_without_preload_content(body, dryrun)
+    response = json.loads(_data(api, response_data, "bytearray"))
+    created = [CompactRecord.from_dict(r) for r in response.get("pidRecords") or ()]
+    return encode_records(created), response.get("mapping") or {}
+
+
+def _validate_chunk(payload: bytes) -> List[Optional[ApiException]]:
+    """Worker side of `BulkRunner.validate`."""
+    api = PIDManagementApi(worker_client())
+    errors: List[Optional[ApiException]] = []
+    for record in decode_compact_records(payload):
+        body = cast(PIDRecord, record.to_dict())
+        try:
+            _data(api, api.fast.create_pid_without_preload_content(body, True), None)
+            errors.append(None)
+        except ApiException as e:
+            errors.append(e)
+    return errors
+
+
+class BulkRunner:
+    """Runs `create_pids` and dry-run validation for large amounts of
+    records on a pool of worker processes.
+
+    Records may be given as `PIDRecord`, `SimplePidRecord` or `CompactRecord`.
+    They are sent, and created records are returned, without additional
+    properties (see `CompactRecord`).
+    Use as a context manager, or call `shutdown` when done::
+
+        with BulkRunner(configuration, max_workers=8) as runner:
+            errors = runner.validate(records)
+            response = runner.create_pids(records, chunk_size=200)
+
+    :param configuration: Configuration of the worker clients.
+    :param max_workers: Number of worker processes, defaults to the CPU count.
+    :param chunk_size: Default number of records per chunk.
+    :param warm_up: Number of connections each worker opens in advance.
+    :param mp_context: Multiprocessing context, e.g. to select a start method.
+    """
+
+    def __init__(
+        self,
+        configuration: Configuration,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 500,
+        warm_up: int = 1,
+        mp_context: Optional[multiprocessing.context.BaseContext] = None,
+    ) -> None:
+        self.chunk_size = chunk_size
+        self._pool: ProcessPoolExecutor = worker_pool(
+            configuration, max_workers=max_workers, warm_up=warm_up, mp_context=mp_context
+        )
+
+    def __enter__(self) -> "BulkRunner":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        self._pool.shutdown()
+
+    def create_pids(
+        self,
+        records: Sequence[AnyRecord],
+        dryrun: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> BatchRecordResponse:
+        """Create the records with one `create_pids` request per chunk.
+
+        Placeholder PIDs only connect records within the same chunk, so keep
+        linked records together, or use a `chunk_size` covering all of them.
+
+        :return: The created records in input order, and the merged mapping
+          from placeholder to actual PIDs.
+        :raises ApiException: if the request of any chunk failed.
+        """
+        size = chunk_size or self.chunk_size
+        payloads = [encode_records(chunk) for chunk in _chunks(records, size)]
+        created: List[PIDRecord] = []
+        mapping: Dict[str, str] = {}
+        for encoded, chunk_mapping in self._pool.map(
+            _create_pids_chunk, payloads, [dryrun] * len(payloads)
+        ):
+            created += decode_records(encoded)
+            mapping.update(chunk_mapping)
+        return BatchRecordResponse.model_construct(pid_records=created, mapping=mapping)
+
+    def validate(
+        self,
+        records: Sequence[AnyRecord],
+        chunk_size: Optional[int] = None,
+    ) -> List[Optional[ApiException]]:
+        """Validate each record with a dry run of `create_pid`.
+
+        :return: For each record in input order, None if it is valid, or the
+          exception describing the failed validation.
+        """
+        size = chunk_size or self.chunk_size
+        payloads = [encode_records(chunk) for chunk in _chunks(records, size)]
+        results: List[Optional[ApiException]] = []
+        for errors in self._pool.map(_validate_chunk, payloads):
+            results += errors
+        return results
@@ -0,0 +1,106 @@
+import os
+from types import TracebackType
+from typing import Any, Optional, Type
+
+from pytypid_generated_client import rest
+from pytypid_generated_client.api_client import ApiClient as GeneratedApiClient
+from pytypid_generated_client.configuration import Configuration as GeneratedConfiguration
+
+from .configuration import Configuration
+from .construct import from_json_data
+from .interning import interner
+from .metrics import TransportMetrics
+from .rest import RESTClientObject
+from .timestamps import parse_datetime
+
+
+class ApiClient(GeneratedApiClient):
+    """Generated API client, communicating through the `pytypid` transport.
+
+    Can be used wherever the generated `ApiClient` is expected, e.g. as
+    `PIDManagementApi(ApiClient(configuration))`. Clients with compatible
+    configurations share connection pools; leaving the `with` block (or
+    calling `close`) releases them.
+    """
+
+    rest_client: RESTClientObject
+    _default: Optional["ApiClient"] = None
+
+    def __init__(
+        self,
+        configuration: Optional[GeneratedConfiguration] = None,
+        header_name: Optional[str] = None,
+        header_value: Optional[str] = None,
+        cookie: Optional[str] = None,
+    ) -> None:
+        if configuration is None:
+            configuration = Configuration.get_default()
+        super().__init__(configuration, header_name, header_value, cookie)
+        # replaces the private REST client created by the generated constructor,
+        # which has not opened any connection yet
+        self.rest_client = RESTClientObject(configuration)
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the shared connection pools of this client."""
+        self.rest_client.close()
+
+    def _deserialize_model(self, data: Any, klass: Any) -> Any:
+        """Build a model of a response, as selected by `response_validation`
+        and `intern_strings` of the configuration."""
+        intern = getattr(self.configuration, "intern_strings", True)
+        validation = getattr(self.configuration, "response_validation", "full")
+        if validation == "full":
+            return klass.from_dict(interner.intern_json(data) if intern else data)
+        return from_json_data(klass, data, check=validation == "structural", intern=intern)
+
+    def _ApiClient__deserialize_model(self, data: Any, klass: Any) -> Any:
+        # overrides the private method the generated client calls for every
+        # model of a response; spelled out, as a `__deserialize_model` here
+        # would match it only as long as both classes are named ApiClient
+        return self._deserialize_model(data, klass)
+
+    def _ApiClient__deserialize_datetime(self, string: str) -> Any:
+        # overrides the private method of the generated client, which parses
+        # with the slower, non-caching `dateutil.parser.parse`; spelled out
+        # like `_ApiClient__deserialize_model`
+        try:
+            return parse_datetime(string)
+        except ValueError:
+            raise rest.ApiException(
+                status=0, reason="Failed to parse `%s` as datetime object" % string
+            ) from None
+
+    @property
+    def metrics(self) -> TransportMetrics:
+        """Connection pool metrics of this client."""
+        return self.rest_client.metrics
+
+    @classmethod
+    def get_default(cls) -> "ApiClient":
+        """Return the default `pytypid` client, creating it on first use."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+
+def _reset_generated_default_after_fork() -> None:
+    """Give the default generated client of a forked child its own pools.
+
+    `pytypid` clients re-acquire their transport by themselves; a generated
+    client would keep using the connections of the parent.
+    """
+    default = GeneratedApiClient._default
+    if default is not None and not isinstance(default.rest_client, RESTClientObject):
+        default.rest_client = rest.RESTClientObject(default.configuration)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_generated_default_after_fork)
@@ -0,0 +1,87 @@
+"""Compact binary form of PID records, for moving many records between
+processes without pickling pydantic models."""
+
+import marshal
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
+
+from pytypid_generated_client.models import PIDRecord, PIDRecordEntry, SimplePidRecord
+
+from .construct import construct
+from .interning import interner
+from .record import AnyRecord, CompactRecord
+
+# (pid, (key, name, value, key, name, value, ...), additional_properties)
+RecordTuple = Tuple[Optional[str], Tuple[Optional[str], ...], Optional[Dict[str, Any]]]
+
+# marshal version 4 stores repeated string objects as back-references
+_MARSHAL_VERSION = 4
+
+
+def record_to_tuple(record: AnyRecord) -> RecordTuple:
+    """Flatten a record into plain tuples of strings.
+
+    Additional properties of entries and pairs are not kept.
+    """
+    flat: List[Optional[str]] = []
+    if isinstance(record, CompactRecord):
+        names = record.names or (None,) * len(record.keys)
+        for triple in zip(record.keys, names, record.values):
+            flat += triple
+        return record.pid, tuple(flat), None
+    if isinstance(record, SimplePidRecord):
+        for pair in record.record or ():
+            if pair.key:
+                flat += (pair.key, None, pair.value)
+    else:
+        for key, entries in (record.entries or {}).items():
+            for entry in entries:
+                flat += (key, entry.name, entry.value)
+    return record.pid, tuple(flat), record.additional_properties or None
+
+
+def record_from_tuple(data: RecordTuple) -> PIDRecord:
+    """Build a `PIDRecord` from `record_to_tuple` output, without validation.
+
+    The input is expected to stem from validated models.
+    """
+    pid, flat, additional_properties = data
+    entries: Dict[str, List[PIDRecordEntry]] = {}
+    for i in range(0, len(flat), 3):
+        assert flat[i] is not None, "Malformed record tuple"
+        key, value = interner.pair(cast(str, flat[i]), flat[i + 2])
+        name = flat[i + 1]
+        if name is None:
+            entry = construct(PIDRecordEntry, key=key, value=value)
+        else:
+            entry = construct(PIDRecordEntry, key=key, name=name, value=value)
+        if key in entries:
+            entries[key].append(entry)
+        else:
+            entries[key] = [entry]
+    record = construct(PIDRecord, pid=pid, entries=entries)
+    if additional_properties:
+        record.additional_properties = dict(additional_properties)
+    return record
+
+
+def compact_from_tuple(data: RecordTuple) -> CompactRecord:
+    """Build a `CompactRecord` from `record_to_tuple` output."""
+    pid, flat, _ = data
+    keys = flat[0::3]
+    assert None not in keys, "Malformed record tuple"
+    return CompactRecord(pid, cast(Tuple[str, ...], keys), flat[2::3], flat[1::3])
+
+
+def encode_records(records: Iterable[AnyRecord]) -> bytes:
+    """Serialize records into the compact binary form."""
+    return marshal.dumps([record_to_tuple(r) for r in records], _MARSHAL_VERSION)
+
+
+def decode_records(data: bytes) -> List[PIDRecord]:
+    """Restore records serialized by `encode_records`."""
+    return [record_from_tuple(t) for t in marshal.loads(data)]
+
+
+def decode_compact_records(data: bytes) -> List[CompactRecord]:
+    """Restore records serialized by `encode_records` as `CompactRecord`."""
+    return [compact_from_tuple(t) for t in marshal.loads(data)]
@@ -0,0 +1,106 @@
+from typing import TYPE_CHECKING, Any, Optional
+
+from pytypid_generated_client.configuration import Configuration as GeneratedConfiguration
+
+from .encoding import REQUEST_ENCODINGS
+
+if TYPE_CHECKING:
+    from .transport import Transport
+
+
+class Configuration(GeneratedConfiguration):
+    """Generated configuration, extended by settings of the `pytypid` transport.
+
+    Accepts all arguments of the generated configuration, plus:
+
+    :param connection_pool_block: If True, requests wait for a free pooled
+      connection instead of opening throwaway connections once
+      `connection_pool_maxsize` connections are in use.
+    :param connection_pool_timeout: Seconds to wait for a free connection when
+      `connection_pool_block` is set. None waits forever.
+    :param intern_strings: If True, records in responses share one string
+      object per distinct entry key and (short) value, see `pytypid.interning`.
+    :param response_validation: How models in responses are built. "full"
+      validates them with pydantic, like the generated client. For a trusted
+      server, "structural" only checks the JSON types of the values, and
+      "none" builds the models from the data as it is.
+    :param request_compression: Content-Encoding of JSON request bodies,
+      "gzip" or "deflate". None sends them uncompressed. The server must
+      accept the encoding.
+    :param request_compression_threshold: Minimum size in bytes of request
+      bodies to compress. Smaller bodies are sent as they are.
+    :param request_compression_level: Compression level from 0 (none, the
+      body is only wrapped in the encoding) over 1 (fastest) to 9 (smallest).
+    :param response_compression: If True, ask for compressed responses with
+      an Accept-Encoding header. They are decoded transparently.
+    :param unix_socket: Path of a Unix domain socket to connect to instead of
+      the host and port of `host`, e.g. of a local sidecar proxy.
+    :param http2: If True, talk HTTP/2 to HTTPS servers, using urllib3's
+      experimental support. Needs the `h2` package.
+    :param transport: A `pytypid.transport.Transport` sending the requests
+      instead of urllib3 connection pools, e.g. a
+      `pytypid.transport.WSGITransport`.
+    """
+
+    RESPONSE_VALIDATION = ("full", "structural", "none")
+
+    def __init__(
+        self,
+        *args: Any,
+        connection_pool_block: bool = False,
+        connection_pool_timeout: Optional[float] = None,
+        intern_strings: bool = True,
+        response_validation: str = "full",
+        request_compression: Optional[str] = None,
+        request_compression_threshold: int = 16 * 1024,
+        request_compression_level: int = 6,
+        response_compression: bool = True,
+        unix_socket: Optional[str] = None,
+        http2: bool = False,
+        transport: Optional["Transport"] = None,
+        **kwargs: Any,
+    ) -> None:
+        if response_validation not in self.RESPONSE_VALIDATION:
+            raise ValueError(
+                "response_validation must be one of %s" % ", ".join(self.RESPONSE_VALIDATION)
+            )
+        if request_compression not in (None,) + REQUEST_ENCODINGS:
+            raise ValueError(
+                "request_compression must be None or one of %s" % ", ".join(REQUEST_ENCODINGS)
+            )
+        if not 0 <= request_compression_level <= 9:
+            raise ValueError("request_compression_level must be between 0 and 9")
+        super().__init__(*args, **kwargs)
+        self.connection_pool_block = connection_pool_block
+        """Wait for a free pooled connection instead of opening a new one
+        """
+        self.connection_pool_timeout = connection_pool_timeout
+        """Seconds to wait for a free pooled connection (None: no limit)
+        """
+        self.intern_strings = intern_strings
+        """Share string objects of record keys and values in responses
+        """
+        self.response_validation = response_validation
+        """Validation of response models: "full", "structural" or "none"
+        """
+        self.request_compression = request_compression
+        """Content-Encoding of JSON request bodies, "gzip", "deflate" or None
+        """
+        self.request_compression_threshold = request_compression_threshold
+        """Minimum size in bytes of request bodies to compress
+        """
+        self.request_compression_level = request_compression_level
+        """Compression level of request bodies
+        """
+        self.response_compression = response_compression
+        """Ask for compressed responses
+        """
+        self.unix_socket = unix_socket
+        """Path of a Unix domain socket to connect to
+        """
+        self.http2 = http2
+        """Talk HTTP/2 to HTTPS servers
+        """
+        self.transport = transport
+        """Custom transport replacing the connection pools
+        """
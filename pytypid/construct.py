@@ -0,0 +1,251 @@
+"""Fast construction of generated models from trusted data.
+
+pydantic's `model_construct` skips validation, but still processes field
+defaults and aliases on every call, which makes it about as slow as
+validating. `construct` fills in the defaults from a per-class template
+and sets the instance state directly. `from_json_data` builds nested
+models from decoded JSON that way, e.g. responses of a trusted server.
+"""
+
+import gc
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Generator, Optional, Tuple, Type, TypeVar, Union, cast
+
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+from typing_extensions import Annotated, get_args, get_origin
+
+from pytypid_generated_client.exceptions import ApiValueError
+
+from .interning import interner
+from .timestamps import parse_datetime
+
+M = TypeVar("M", bound=BaseModel)
+
+# (immutable defaults, (name, copy method of mutable default), ...)
+_Template = Tuple[Dict[str, Any], Tuple[Tuple[str, Callable[[], Any]], ...]]
+
+# class -> template, or None if the class needs the full `model_construct`
+_templates: Dict[type, Optional[_Template]] = {}
+
+_new = object.__new__
+_set = object.__setattr__
+
+
+def _template(cls: Type[BaseModel]) -> Optional[_Template]:
+    if cls.__pydantic_post_init__ is not None or cls.__private_attributes__:
+        return None
+    immutable: Dict[str, Any] = {}
+    mutable: Dict[str, Callable[[], Any]] = {}
+    for name, field in cls.model_fields.items():
+        if field.default_factory is not None:
+            return None
+        if field.default is PydanticUndefined:
+            continue
+        if isinstance(field.default, (dict, list, set)):
+            mutable[name] = field.default.copy
+        else:
+            immutable[name] = field.default
+    return immutable, tuple(mutable.items())
+
+
+def construct(cls: Type[M], **values: Any) -> M:
+    """Create an instance of `cls` from field values, without validation.
+
+    Equivalent to `cls.model_construct(**values)` for the generated models.
+    Values must be given by field name, not by alias; missing fields get
+    their defaults.
+    """
+    try:
+        template = _templates[cls]
+    except KeyError:
+        template = _templates[cls] = _template(cls)
+    if template is None:
+        return cls.model_construct(**values)
+    immutable, mutable = template
+    fields_set = set(values)
+    state = immutable.copy()
+    for name, copy in mutable:
+        if name not in values:
+            state[name] = copy()
+    state.update(values)
+    obj = _new(cls)
+    _set(obj, "__dict__", state)
+    _set(obj, "__pydantic_fields_set__", fields_set)
+    _set(obj, "__pydantic_extra__", None)
+    _set(obj, "__pydantic_private__", None)
+    return obj
+
+
+@contextmanager
+def gc_paused(pause: bool = True) -> Generator[None, None, None]:
+    """Pause the cyclic garbage collector while creating many models.
+
+    Models built from data create no reference cycles, but their allocations
+    trigger full collections over and over again, which slows down building
+    large batches several times. The collector is paused for the whole
+    process, including other threads, so callers opt in.
+
+    :param pause: If False, leave the collector alone.
+    """
+    enabled = gc.isenabled()
+    if not (pause and enabled):
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+# Building models from decoded JSON: a builder per model class, which
+# converts each JSON property and sets the instance state directly.
+_Converter = Optional[Callable[[Any], Any]]
+
+_builders: Dict[Tuple[type, bool, bool], Callable[[Any], Any]] = {}
+
+
+def _parse_datetime(value: Any) -> Any:
+    return parse_datetime(value) if isinstance(value, str) else value
+
+
+def _expect(kind: type, convert: _Converter) -> Callable[[Any], Any]:
+    """Wrap `convert` into a check of the JSON type of the value."""
+    def checked(value: Any) -> Any:
+        if value is not None and not isinstance(value, kind):
+            raise ApiValueError(
+                "Expected %s in response, got %s" % (kind.__name__, type(value).__name__)
+            )
+        return value if convert is None else convert(value)
+    return checked
+
+
+def _converter(annotation: Any, check: bool, intern: bool) -> _Converter:
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin is Annotated:
+        return _converter(args[0], check, intern)
+    if origin is Union:
+        options = [a for a in args if a is not type(None)]
+        return _converter(options[0], check, intern) if len(options) == 1 else None
+    convert: _Converter = None
+    kind: Optional[type] = None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        key = (annotation, check, intern)
+        model: Type[BaseModel] = annotation
+
+        def build_nested(value: Any) -> Any:
+            # resolved on use, so that models may refer to each other
+            builder = _builders.get(key) or _builder(model, check, intern)
+            return builder(value)
+        convert, kind = build_nested, dict
+    elif annotation is datetime:
+        convert, kind = _parse_datetime, str
+    elif origin is list:
+        item = _converter(args[0], check, intern)
+        kind = list
+        if item is not None:
+            convert = (lambda value: [item(v) for v in value])
+    elif origin is dict:
+        item = _converter(args[1], check, intern)
+        kind = dict
+        if item is not None:
+            convert = (lambda value: {k: item(v) for k, v in value.items()})
+    elif annotation in (str, int, bool, float):
+        kind = annotation
+    if check and kind is not None:
+        return _expect(kind, convert)
+    return convert
+
+
+def _interning(name: str, convert: _Converter) -> _Converter:
+    """Add the interning of `pytypid.interning.Interner.intern_json` to the
+    converter of a property."""
+    if name == "key":
+        return (lambda value: sys.intern(value) if isinstance(value, str) else value)
+    if name == "value":
+        return interner.value if convert is None else (lambda v: interner.value(convert(v)))
+    if name == "entries":
+        entries = convert or (lambda value: value)
+        return (lambda value: {
+            sys.intern(k) if isinstance(k, str) else k: v for k, v in entries(value).items()
+        })
+    return convert
+
+
+def _builder(cls: Type[M], check: bool, intern: bool) -> Callable[[Any], M]:
+    """Create the builder of a model class."""
+    fields = cls.model_fields
+    if "additional_properties" not in fields or "actual_instance" in fields:
+        # a choice between several schemas, which is resolved by validation
+        def build_validated(data: Any) -> M:
+            if check and data is not None and not isinstance(data, dict):
+                raise ApiValueError("Expected object in response, got %s" % type(data).__name__)
+            return cast(M, cls.from_dict(data))  # type: ignore[attr-defined]
+        _builders[(cls, check, intern)] = build_validated
+        return build_validated
+
+    plan = []
+    for name, field in fields.items():
+        if name != "additional_properties":
+            convert = _converter(field.annotation, check, intern)
+            if intern:
+                convert = _interning(name, convert)
+            plan.append((name, field.alias or name, convert))
+    aliases = frozenset(alias for _, alias, _ in plan)
+    names = frozenset(name for name, _, _ in plan)
+
+    def build(data: Any) -> M:
+        if not isinstance(data, dict):
+            if check and data is not None:
+                raise ApiValueError("Expected object in response, got %s" % type(data).__name__)
+            return cast(M, cls.from_dict(data))  # type: ignore[attr-defined]
+        state: Dict[str, Any] = {}
+        for name, alias, convert in plan:
+            value = data.get(alias)
+            if convert is not None and value is not None:
+                value = convert(value)
+            state[name] = value
+        fields_set = set(names)
+        if len(data) > len(plan):
+            state["additional_properties"] = {k: v for k, v in data.items() if k not in aliases}
+            fields_set.add("additional_properties")
+        else:
+            state["additional_properties"] = {}
+        obj = _new(cls)
+        _set(obj, "__dict__", state)
+        _set(obj, "__pydantic_fields_set__", fields_set)
+        _set(obj, "__pydantic_extra__", None)
+        _set(obj, "__pydantic_private__", None)
+        return obj
+
+    if _template(cls) is None:
+        def build_constructed(data: Any) -> M:
+            obj = build(data)
+            return cls.model_construct(_fields_set=obj.model_fields_set, **obj.__dict__)
+        _builders[(cls, check, intern)] = build_constructed
+        return build_constructed
+    _builders[(cls, check, intern)] = build
+    return build
+
+
+def from_json_data(cls: Type[M], data: Any, check: bool = False, intern: bool = False) -> M:
+    """Create an instance of a generated model from decoded JSON, without
+    validation. Like `cls.from_dict(data)`, the JSON properties unknown to
+    the model are kept as additional properties.
+
+    Models which need validation to be built, like the ones representing a
+    choice between several schemas, are built by `from_dict`.
+
+    :param check: If True, check that JSON values have the right types
+      (object, array, string, ...) on the way, which is much cheaper than
+      validating them.
+    :param intern: If True, share keys and values of records like
+      `pytypid.interning.interner.intern_json` does.
+    :raises ApiValueError: if `check` is set and a value has the wrong type.
+    """
+    builder = _builders.get((cls, check, intern)) or _builder(cls, check, intern)
+    return cast(M, builder(data))
@@ -0,0 +1,64 @@
+"""Content codings of request and response bodies.
+
+Batch requests and responses repeat the same attribute keys in every record
+and shrink several times when compressed, which pays off on slow links.
+Request bodies are compressed with the `request_compression` setting of
+`pytypid.Configuration`. With `response_compression`, responses are
+requested in the encodings of `ACCEPT_ENCODING`: gzip and deflate, plus br
+and zstd if the brotli or zstandard modules are installed. urllib3 decodes
+them incrementally, so streamed responses stay streamed.
+"""
+
+import gzip
+import zlib
+from typing import Tuple
+
+import urllib3.util.request
+
+REQUEST_ENCODINGS = ("gzip", "deflate")
+
+ACCEPT_ENCODING: str = urllib3.util.request.ACCEPT_ENCODING
+"""Response encodings urllib3 can decode in this environment"""
+
+
+def compress(data: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compress a request body for the Content-Encoding `encoding`.
+
+    zlib releases the GIL while compressing, so other threads keep running
+    while a large body is compressed.
+
+    :param encoding: "gzip" or "deflate".
+    :param level: Compression level from 0 (none) to 9 (smallest).
+    """
+    if encoding == "gzip":
+        # without a timestamp, equal bodies compress to equal bytes
+        return gzip.compress(data, level, mtime=0)
+    if encoding == "deflate":
+        # "deflate" means the zlib format (RFC 9110, section 8.4.1.2)
+        return zlib.compress(data, level)
+    raise ValueError("Unsupported request encoding %r" % encoding)
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Reverse `compress`."""
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "deflate":
+        return zlib.decompress(data)
+    raise ValueError("Unsupported request encoding %r" % encoding)
+
+
+def encode_body(
+    data: bytes, encoding: str, threshold: int, level: int = 6
+) -> Tuple[bytes, bool]:
+    """Compress a request body if it has at least `threshold` bytes and
+    compression makes it smaller.
+
+    :return: The body to send and whether it is compressed.
+    """
+    if len(data) < threshold:
+        return data, False
+    compressed = compress(data, encoding, level)
+    if len(compressed) >= len(data):
+        return data, False
+    return compressed, True
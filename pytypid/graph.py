@@ -0,0 +1,142 @@
+"""Resolving graphs of PID records that reference each other.
+
+Record values often are PIDs of other records, like the ones linked by
+`create_pids`. `resolve_pid_graph` follows these references breadth-first
+from some root PIDs, fetching the records of each level in parallel, and
+returns the records with the references between them::
+
+    graph = resolve_pid_graph(
+        api, [root], references_with_prefix("21.11152/"), max_depth=3
+    )
+    for pid, referenced in graph.edges.items():
+        ...
+
+Every PID is fetched at most once, also if it is referenced repeatedly or
+in a cycle. Records found in `cache`, any mutable mapping from PID to
+record, are not fetched, and fetched records are added to it.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any, Callable, Dict, Iterable, List, MutableMapping, NamedTuple, Optional, Set, Tuple,
+)
+
+import urllib3
+
+from pytypid_generated_client.exceptions import ApiException
+from pytypid_generated_client.models import PIDRecord
+
+from .api import PIDManagementApi
+
+Predicate = Callable[[str, str], bool]
+"""Tells if the value (second argument) of an entry with the key (first
+argument) is a PID reference"""
+
+
+def references_with_prefix(*prefixes: str) -> Predicate:
+    """Predicate taking the values starting with one of `prefixes`, e.g.
+    "21.11152/", as PID references."""
+    return lambda key, value: value.startswith(prefixes)
+
+
+def references(record: PIDRecord, is_reference: Predicate) -> List[str]:
+    """PIDs referenced by `record`, in the order of its entries, without
+    duplicates."""
+    found: Dict[str, None] = {}
+    for key, entries in (record.entries or {}).items():
+        for entry in entries:
+            if entry.value and entry.value != record.pid and is_reference(key, entry.value):
+                found[entry.value] = None
+    return list(found)
+
+
+class PidGraph(NamedTuple):
+    """Outcome of `resolve_pid_graph`."""
+
+    records: Dict[str, PIDRecord]
+    """Resolved records by PID"""
+    edges: Dict[str, List[str]]
+    """PIDs referenced by each resolved record"""
+    depth: Dict[str, int]
+    """Distance of each PID from the nearest root, for resolved and
+    unresolved PIDs"""
+    unresolved: Set[str]
+    """Referenced PIDs not fetched because of `max_depth` or `max_requests`"""
+    errors: Dict[str, Exception]
+    """PIDs whose record could not be fetched, e.g. as they do not exist,
+    with the `ApiException` or the transport error of the request"""
+    requests: int
+    """Number of get requests sent"""
+
+
+def resolve_pid_graph(
+    api: PIDManagementApi,
+    roots: Iterable[str],
+    is_reference: Predicate,
+    max_depth: Optional[int] = None,
+    max_requests: Optional[int] = None,
+    cache: Optional[MutableMapping[str, PIDRecord]] = None,
+    workers: int = 8,
+    **kwargs: Any,
+) -> PidGraph:
+    """Fetch the records of `roots` and of the PIDs they reference,
+    recursively.
+
+    :param is_reference: Which entry values are PID references.
+    :param max_depth: Follow references at most this many levels deep from
+      the roots, without limit if None.
+    :param max_requests: Send at most this many requests; the PIDs left
+      are marked unresolved.
+    :param cache: Records already known, updated with the fetched ones.
+    :param workers: Number of requests sent in parallel.
+    :param kwargs: Further arguments of `get_pid_record`, e.g. `validation`.
+    """
+    records: Dict[str, PIDRecord] = {}
+    edges: Dict[str, List[str]] = {}
+    unresolved: Set[str] = set()
+    errors: Dict[str, Exception] = {}
+    level = list(dict.fromkeys(roots))
+    depth = dict.fromkeys(level, 0)
+    requests = 0
+
+    def fetch(pid: str) -> Tuple[str, Any]:
+        try:
+            return pid, api.get_pid_record(pid, **kwargs)
+        except (ApiException, OSError, urllib3.exceptions.HTTPError) as e:
+            return pid, e
+
+    with ThreadPoolExecutor(workers) as executor:
+        distance = 0
+        while level:
+            missing = [pid for pid in level if cache is None or pid not in cache]
+            if max_requests is not None:
+                unresolved.update(missing[max_requests - requests:])
+                missing = missing[:max_requests - requests]
+            fetched = dict(executor.map(fetch, missing))
+            requests += len(missing)
+            distance += 1
+            next_level = []
+            for pid in level:
+                if pid in fetched:
+                    result = fetched[pid]
+                    if isinstance(result, Exception):
+                        errors[pid] = result
+                        continue
+                    if cache is not None:
+                        cache[pid] = result
+                elif cache is not None and pid in cache:
+                    result = cache[pid]
+                else:
+                    continue  # over the budget
+                records[pid] = result
+                edges[pid] = references(result, is_reference)
+                for referenced in edges[pid]:
+                    if referenced in depth:
+                        continue
+                    depth[referenced] = distance
+                    if max_depth is not None and distance > max_depth:
+                        unresolved.add(referenced)
+                    else:
+                        next_level.append(referenced)
+            level = next_level
+    return PidGraph(records, edges, depth, unresolved, errors, requests)
@@ -0,0 +1,112 @@
+"""Latency histograms with bounded relative error, in the manner of
+HdrHistogram.
+
+Values are counted in buckets whose width grows with the value, so that
+every recorded value is known to `significant_digits` decimal digits,
+whatever its magnitude. Memory depends on the range of the values only, not
+on their number, and histograms of several threads can be merged.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, Tuple
+
+
+class LatencyHistogram:
+    """Thread-safe histogram of latencies in seconds.
+
+    :param significant_digits: Decimal digits to which recorded values are
+      kept, from 1 to 5.
+    :param resolution: Smallest latency distinguished from zero, in seconds.
+    """
+
+    def __init__(self, significant_digits: int = 3, resolution: float = 1e-6) -> None:
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.significant_digits = significant_digits
+        self.resolution = resolution
+        # HdrHistogram's layout: linear sub-buckets for the smallest values,
+        # then one half-filled set of sub-buckets per power of two
+        self._sub_bucket_count = 1 << math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_bucket_half = self._sub_bucket_count // 2
+        self._half_bits = self._sub_bucket_half.bit_length() - 1
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        """Sum of all recorded values"""
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, units: int) -> int:
+        if units < self._sub_bucket_count:
+            return units
+        shift = units.bit_length() - 1 - self._half_bits
+        return (shift + 1) * self._sub_bucket_half + (units >> shift) - self._sub_bucket_half
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Largest value counted in the bucket `index`, in units."""
+        if index < self._sub_bucket_count:
+            return index
+        shift = index // self._sub_bucket_half - 1
+        sub = index % self._sub_bucket_half + self._sub_bucket_half
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        """Count a latency `count` times."""
+        index = self._index(max(0, int(seconds / self.resolution)))
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + count
+            self.count += count
+            self.total += seconds * count
+            if seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the counts of a histogram with the same settings."""
+        if (other.significant_digits, other.resolution) != (
+            self.significant_digits, self.resolution
+        ):
+            raise ValueError("Histograms with different settings cannot be merged")
+        with other._lock:
+            counts = dict(other._counts)
+            count, total, low, high = other.count, other.total, other.min, other.max
+        with self._lock:
+            for index, n in counts.items():
+                self._counts[index] = self._counts.get(index, 0) + n
+            self.count += count
+            self.total += total
+            self.min = min(self.min, low)
+            self.max = max(self.max, high)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Smallest latency not exceeded by `percent` % of the recorded
+        ones, up to the precision of the histogram. 0 if empty."""
+        return self.percentiles((percent,))[0][1]
+
+    def percentiles(self, percents: Iterable[float]) -> Tuple[Tuple[float, float], ...]:
+        """Return (percent, latency) pairs, see `percentile`."""
+        with self._lock:
+            buckets = sorted(self._counts.items())
+            count, high = self.count, self.max
+        result = []
+        for percent in percents:
+            if not count:
+                result.append((percent, 0.0))
+                continue
+            rank = max(1, math.ceil(percent / 100 * count))
+            seen = 0
+            value = high
+            for index, n in buckets:
+                seen += n
+                if seen >= rank:
+                    value = min(high, self._highest_equivalent(index) * self.resolution)
+                    break
+            result.append((percent, value))
+        return tuple(result)
@@ -0,0 +1,93 @@
+"""Shared string objects for keys and values that repeat across records.
+
+Record entry keys are type PIDs, which occur in nearly every record, and
+many values (profiles, licenses, digital object types) repeat as well. The
+default `interner` makes all records share one string object per distinct
+key and value, which saves memory for large record sets and lets dict
+lookups on keys succeed by identity.
+"""
+
+import sys
+from typing import Any, Dict, Optional, Tuple, overload
+
+
+class Interner:
+    """Flyweight table for record keys and values.
+
+    Keys are interned with `sys.intern`. Values are shared through a bounded
+    table: values longer than `max_value_length` are never stored, and once
+    `max_values` distinct values are stored, new values are returned as they
+    are.
+
+    :param max_values: Maximum number of distinct values to share.
+    :param max_value_length: Maximum length of shared values.
+    """
+
+    def __init__(self, max_values: int = 65536, max_value_length: int = 128) -> None:
+        self.max_values = max_values
+        self.max_value_length = max_value_length
+        self._values: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def clear(self) -> None:
+        """Forget all shared values."""
+        self._values.clear()
+
+    def key(self, key: str) -> str:
+        """Return the shared object for a record key."""
+        return sys.intern(key)
+
+    @overload
+    def value(self, value: str) -> str: ...
+
+    @overload
+    def value(self, value: Optional[str]) -> Optional[str]: ...
+
+    def value(self, value: Optional[str]) -> Optional[str]:
+        """Return the shared object for a record value, if it is shared."""
+        if not isinstance(value, str) or len(value) > self.max_value_length:
+            return value
+        shared = self._values.get(value)
+        if shared is not None:
+            return shared
+        if len(self._values) < self.max_values:
+            return self._values.setdefault(value, value)
+        return value
+
+    def pair(self, key: str, value: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Return the shared objects for a key/value pair."""
+        return sys.intern(key), self.value(value)
+
+    def intern_json(self, data: Any) -> Any:
+        """Replace keys and values of records in decoded JSON, in place.
+
+        Covers the `key` and `value` properties of record entries and pairs,
+        and the keys of `entries` mappings, at any depth.
+
+        :return: `data`
+        """
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, (dict, list)):
+                    self.intern_json(item)
+        elif isinstance(data, dict):
+            for name, item in data.items():
+                if isinstance(item, str):
+                    if name == "key":
+                        data[name] = sys.intern(item)
+                    elif name == "value":
+                        data[name] = self.value(item)
+                elif isinstance(item, (dict, list)):
+                    self.intern_json(item)
+            entries = data.get("entries")
+            if isinstance(entries, dict):
+                data["entries"] = {
+                    sys.intern(k) if isinstance(k, str) else k: v for k, v in entries.items()
+                }
+        return data
+
+
+interner = Interner()
+"""Interner used by `pytypid` for deserialized and converted records"""
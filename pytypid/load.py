@@ -0,0 +1,352 @@
+"""Open-loop load generator for the Typed PID Maker API.
+
+Requests are started at a fixed arrival rate, whether or not earlier ones
+have completed, and every latency is measured from the time its request was
+due. Queueing in the client or the service therefore shows up in the
+latencies instead of lowering the request rate (no coordinated omission).
+
+Run ``pytypid-load --help`` for the options. Without ``--host``, the load
+goes to the in-memory `pytypid.stub.StubService`, which measures the client
+alone::
+
+    pytypid-load --host https://pid.example.org/preview --rate 50 --duration 60 \\
+        --mix get_record=8,create_pid=1,find_all=1
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pytypid_generated_client.exceptions import ApiException
+from pytypid_generated_client.models import PIDRecord
+
+from .api import PIDManagementApi
+from .client import ApiClient
+from .configuration import Configuration
+from .histogram import LatencyHistogram
+from .record import CompactRecord
+from .stub import StubService
+from .transport import WSGITransport
+
+OPERATIONS = ("create_pid", "create_pids", "get_record", "update_pid", "find_all")
+
+PREPARATIONS = {"update_pid": "fetch_etag"}
+"""Requests preparing an operation, e.g. fetching the ETag to update a record
+with; they are reported as operations of their own"""
+
+PERCENTILES = (50, 90, 99, 99.9, 99.99)
+
+_STUB_HOST = "http://stub"
+
+
+class Workload:
+    """The operations of a load test, performed on one API client.
+
+    :param template: Record to create and update; its PID is replaced.
+    :param pids: PIDs to read and update.
+    """
+
+    def __init__(
+        self,
+        api: PIDManagementApi,
+        template: PIDRecord,
+        pids: Sequence[str],
+        batch_size: int = 100,
+        page_size: int = 20,
+        dryrun: bool = True,
+    ) -> None:
+        self.api = api
+        self.template = template
+        self.pids = list(pids)
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.dryrun = dryrun
+        self._random = random.Random(0)
+
+    def _record(self, pid: str) -> PIDRecord:
+        return self.template.model_copy(update={"pid": pid})
+
+    def _pid(self) -> str:
+        if not self.pids:
+            raise LookupError("No PIDs to read or update; create some with --seed-records")
+        return self._random.choice(self.pids)
+
+    def create_pid(self) -> None:
+        self.api.create_pid(self._record("load/0"), dryrun=self.dryrun)
+
+    def create_pids(self) -> None:
+        records = [self._record("load/%d" % i) for i in range(self.batch_size)]
+        self.api.create_pids(records, dryrun=self.dryrun)
+
+    def get_record(self) -> None:
+        self.api.get_pid_record(self._pid())
+
+    def fetch_etag(self) -> Tuple[str, Optional[str]]:
+        """Pick a PID to update, and fetch the ETag of its record."""
+        pid = self._pid()
+        current = self.api.get_pid_record_with_http_info(pid)
+        return pid, (current.headers or {}).get("ETag")
+
+    def update_pid(self, prepared: Optional[Tuple[str, Optional[str]]] = None) -> None:
+        """Update a record, with the PID and ETag from `fetch_etag`, which is
+        called if they are not given."""
+        pid, etag = prepared or self.fetch_etag()
+        self.api.update_pid_record(
+            pid, self._record(pid), dryrun=self.dryrun,
+            _headers={"If-Match": etag} if etag else None,
+        )
+
+    def find_all(self) -> None:
+        self.api.find_all(size=self.page_size)
+
+
+class Results:
+    """Latencies and errors per operation."""
+
+    def __init__(self, operations: Sequence[str]) -> None:
+        self.latencies = {name: LatencyHistogram() for name in operations}
+        self.errors: Dict[str, Dict[str, int]] = {name: {} for name in operations}
+        self._lock = threading.Lock()
+
+    def error(self, operation: str, e: Exception) -> None:
+        if isinstance(e, ApiException):
+            kind = "HTTP %d" % e.status if e.status else str(e.reason).split("\n")[0]
+        else:
+            kind = type(e).__name__
+        with self._lock:
+            errors = self.errors[operation]
+            errors[kind] = errors.get(kind, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Summarize the results as JSON data."""
+        total = LatencyHistogram()
+        operations = {}
+        for name, histogram in self.latencies.items():
+            total.merge(histogram)
+            operations[name] = _summary(histogram, elapsed, self.errors[name])
+        errors: Dict[str, int] = {}
+        for by_kind in self.errors.values():
+            for kind, n in by_kind.items():
+                errors[kind] = errors.get(kind, 0) + n
+        return {
+            "elapsed": elapsed,
+            "total": _summary(total, elapsed, errors),
+            "operations": operations,
+        }
+
+
+def _summary(
+    histogram: LatencyHistogram, elapsed: float, errors: Dict[str, int]
+) -> Dict[str, Any]:
+    return {
+        "requests": histogram.count,
+        "throughput": histogram.count / elapsed if elapsed else 0.0,
+        "errors": dict(errors),
+        "mean": histogram.mean,
+        "max": histogram.max,
+        "percentiles": {"%g" % p: value for p, value in histogram.percentiles(PERCENTILES)},
+    }
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse an operation mix like ``get_record=8,create_pid=1``."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError("Unknown operation %r, expected one of %s" % (
+                name, ", ".join(OPERATIONS)
+            ))
+        mix[name] = float(weight or 1)
+        if mix[name] < 0:
+            raise ValueError("Negative weight for %s" % name)
+    if not sum(mix.values()):
+        raise ValueError("The mix has no operation with a positive weight")
+    return mix
+
+
+def schedule(
+    rate: float, duration: float, poisson: bool = False, seed: int = 0
+) -> List[float]:
+    """Due times of the requests, in seconds after the start."""
+    if not poisson:
+        return [i / rate for i in range(round(duration * rate))]
+    rng = random.Random(seed)
+    times: List[float] = []
+    t = rng.expovariate(rate)
+    while t < duration:
+        times.append(t)
+        t += rng.expovariate(rate)
+    return times
+
+
+def run(
+    workload: Workload,
+    mix: Dict[str, float],
+    rate: float,
+    duration: float,
+    workers: int = 64,
+    poisson: bool = False,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run a load test and return the `Results.report`.
+
+    :param mix: Relative weights of the operations.
+    :param rate: Requests started per second.
+    :param duration: Seconds during which requests are started.
+    :param workers: Maximum number of requests in flight. Requests due while
+      all workers are busy wait, and their waiting counts as latency.
+    :param poisson: If True, the requests arrive at random times (Poisson
+      process) instead of at regular intervals.
+
+    Operations in `PREPARATIONS` are preceded by their preparing request,
+    whose time and errors are reported under its own name. The latency of
+    the operation leaves out the time of the preparation; if it fails, the
+    operation is not performed.
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    operations: Dict[str, Callable[..., Any]] = {
+        name: getattr(workload, name) for name in names
+    }
+    preparations = {name: PREPARATIONS[name] for name in names if name in PREPARATIONS}
+    for preparation in preparations.values():
+        operations[preparation] = getattr(workload, preparation)
+    rng = random.Random(seed)
+    results = Results(names + list(preparations.values()))
+
+    def perform(name: str, due: float) -> None:
+        args = []
+        preparation = preparations.get(name)
+        if preparation is not None:
+            start = time.perf_counter()
+            try:
+                args.append(operations[preparation]())
+            except Exception as e:
+                results.error(preparation, e)
+                return
+            finally:
+                prepared = time.perf_counter() - start
+                results.latencies[preparation].record(prepared)
+            due += prepared
+        try:
+            operations[name](*args)
+        except Exception as e:
+            results.error(name, e)
+        results.latencies[name].record(time.perf_counter() - due)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        for offset in schedule(rate, duration, poisson, seed):
+            due = start + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(perform, rng.choices(names, weights)[0], due)
+    return results.report(time.perf_counter() - start)
+
+
+def _default_record() -> PIDRecord:
+    keys = ["21.T11148/%028x" % i for i in range(10)]
+    return CompactRecord("load/0", keys, ["value %d" % i for i in range(10)]).to_record()
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format a `Results.report` as a table."""
+    header = "%-12s %9s %9s %8s" % ("operation", "requests", "req/s", "errors") + "".join(
+        " %9s" % ("p" + p) for p in report["total"]["percentiles"]
+    ) + " %9s" % "max"
+    lines = [header]
+    rows: List[Tuple[str, Dict[str, Any]]] = list(report["operations"].items())
+    for name, summary in rows + [("total", report["total"])]:
+        lines.append("%-12s %9d %9.1f %8d" % (
+            name, summary["requests"], summary["throughput"], sum(summary["errors"].values())
+        ) + "".join(
+            " %7.2fms" % (value * 1e3) for value in summary["percentiles"].values()
+        ) + " %7.2fms" % (summary["max"] * 1e3))
+    for name, summary in rows:
+        for kind, n in sorted(summary["errors"].items()):
+            lines.append("  %s: %d x %s" % (name, n, kind))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pytypid-load", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--host", help="URL of the service; the in-memory stub if omitted")
+    parser.add_argument("--rate", type=float, default=100, help="requests per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument(
+        "--mix", default="get_record=5,create_pid=2,create_pids=1,update_pid=1,find_all=1",
+        help="operations and their relative weights; update_pid is preceded by a GET of "
+        "the record for its ETag, which is reported as fetch_etag",
+    )
+    parser.add_argument("--workers", type=int, default=64, help="maximum requests in flight")
+    parser.add_argument("--poisson", action="store_true", help="random (Poisson) arrivals")
+    parser.add_argument("--batch-size", type=int, default=100, help="records per create_pids")
+    parser.add_argument("--page-size", type=int, default=20, help="known PIDs per find_all")
+    parser.add_argument(
+        "--record", help="JSON file with the record to create and update (PIDRecord format)"
+    )
+    parser.add_argument(
+        "--seed-records", type=int, default=None,
+        help="records to create before the test, for get_record and update_pid "
+        "(default: 100 on the stub, 0 otherwise, then existing PIDs are used)",
+    )
+    parser.add_argument(
+        "--no-dryrun", dest="dryrun", action="store_false",
+        help="really create and update records during the test",
+    )
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.host:
+        configuration = Configuration(host=args.host, connection_pool_maxsize=args.workers)
+    else:
+        configuration = Configuration(
+            host=_STUB_HOST, transport=WSGITransport(StubService())
+        )
+    if args.record:
+        with open(args.record) as file:
+            record = PIDRecord.from_json(file.read())
+        if record is None:
+            parser.error("%s contains no record" % args.record)
+        template = record
+    else:
+        template = _default_record()
+    seed_records = args.seed_records
+    if seed_records is None:
+        seed_records = 0 if args.host else 100
+
+    with ApiClient(configuration) as client:
+        api = PIDManagementApi(client)
+        if seed_records:
+            records = [
+                template.model_copy(update={"pid": "seed/%d" % i}) for i in range(seed_records)
+            ]
+            mapping = api.create_pids(records).mapping or {}
+            pids = list(mapping.values())
+        else:
+            pids = [known.pid for known in api.find_all(size=1000)]
+        workload = Workload(
+            api, template, pids, args.batch_size, args.page_size, dryrun=args.dryrun
+        )
+        report = run(workload, mix, args.rate, args.duration, args.workers, args.poisson)
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
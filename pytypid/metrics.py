@@ -0,0 +1,72 @@
+import threading
+from typing import Dict
+
+
+class TransportMetrics:
+    """Thread-safe counters describing how the connection pools are used.
+
+    Counters:
+
+    * ``connections_created``: new connections opened by a pool.
+    * ``connections_reused``: requests served by an already open connection.
+    * ``connections_discarded``: connections closed because the pool was full.
+    * ``pool_exhausted``: requests that gave up waiting for a free connection.
+    * ``pool_waits``, ``pool_wait_seconds``, ``pool_wait_seconds_max``: time
+      spent obtaining a connection from a pool.
+    * ``request_bytes_uncompressed``, ``request_bytes_compressed``: size of
+      compressed request bodies before and after compression.
+    * ``response_bytes_received``, ``response_bytes_decoded``: size of the
+      response bodies read, as received and after decoding their
+      Content-Encoding.
+    """
+
+    COUNTERS = (
+        "connections_created",
+        "connections_reused",
+        "connections_discarded",
+        "pool_exhausted",
+        "pool_waits",
+        "pool_wait_seconds",
+        "pool_wait_seconds_max",
+        "request_bytes_uncompressed",
+        "request_bytes_compressed",
+        "response_bytes_received",
+        "response_bytes_decoded",
+    )
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[str, float] = dict.fromkeys(self.COUNTERS, 0)
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        """Add `amount` to the counter `name`."""
+        with self._lock:
+            self._values[name] += amount
+
+    def observe_pool_wait(self, seconds: float) -> None:
+        """Record the time a request waited for a pooled connection."""
+        with self._lock:
+            self._values["pool_waits"] += 1
+            self._values["pool_wait_seconds"] += seconds
+            if seconds > self._values["pool_wait_seconds_max"]:
+                self._values["pool_wait_seconds_max"] = seconds
+
+    def observe_body(self, received: int, decoded: int) -> None:
+        """Record the size of a response body, as received and decoded."""
+        with self._lock:
+            self._values["response_bytes_received"] += received
+            self._values["response_bytes_decoded"] += decoded
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return a consistent copy of all counters."""
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self) -> None:
+        """Set all counters back to zero."""
+        with self._lock:
+            self._values = dict.fromkeys(self._values, 0)
+
+    def __getitem__(self, name: str) -> float:
+        with self._lock:
+            return self._values[name]
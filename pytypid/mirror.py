@@ -0,0 +1,283 @@
+"""Incremental mirror of the known PIDs of a service.
+
+`KnownPidMirror` keeps a local copy of the known-PID index up to date. The
+first `sync` loads all known PIDs; later ones ask `find_all` only for the
+PIDs modified since the newest modification seen before (the watermark),
+so they take as long as there are changes, not as there are PIDs::
+
+    with KnownPidMirror(api, "known-pids.sqlite") as mirror:
+        result = mirror.sync()
+        table = mirror.table()
+
+Known PIDs are requested in the order of their modification and paged by
+that time, not by page number: PIDs modified during a scan move to its end
+instead of shifting the pages. Each sync starts `overlap` before the
+watermark again, which catches modifications committed late, e.g. by
+another node of the service, at the cost of re-reading a few PIDs. Applying
+a PID again is harmless, as the mirror keeps the newest modification.
+"""
+
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from types import TracebackType
+from typing import (
+    Any, Dict, Iterator, List, NamedTuple, Optional, Protocol, Tuple, Type, Union,
+)
+
+from pytypid_generated_client.models import KnownPid
+
+from .api import PIDManagementApi
+from .construct import construct
+from .table import KnownPidTable, from_microseconds, timestamp_converter
+
+Row = Tuple[str, int, int]
+"""PID, creation and modification time in microseconds since the epoch"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS known_pids (
+    pid TEXT PRIMARY KEY,
+    created INTEGER NOT NULL,
+    modified INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS mirror_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT = """
+INSERT INTO known_pids (pid, created, modified) VALUES (?, ?, ?)
+ON CONFLICT (pid) DO UPDATE SET created = excluded.created, modified = excluded.modified
+WHERE excluded.modified > known_pids.modified
+"""
+
+
+class MirrorStore(Protocol):
+    """Local storage of a `KnownPidMirror`."""
+
+    def get_state(self, name: str) -> Optional[str]:
+        """Value of a state variable, like the watermark."""
+
+    def apply(self, rows: List[Row], state: Dict[str, str]) -> int:
+        """Insert or update known PIDs and set state variables, atomically.
+        A known PID is only replaced by a newer modification.
+
+        :return: Number of inserted or updated PIDs.
+        """
+
+    def get(self, pid: str) -> Optional[Row]:
+        """Row of a PID, if mirrored."""
+
+    def rows(self) -> Iterator[Row]:
+        """All rows, ordered by PID."""
+
+    def __len__(self) -> int: ...
+
+    def close(self) -> None: ...
+
+
+class SqliteStore:
+    """`MirrorStore` in an SQLite database.
+
+    :param path: Path of the database file, created if missing, or
+      ":memory:".
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"] = ":memory:") -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def get_state(self, name: str) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT value FROM mirror_state WHERE name = ?", (name,)
+        ).fetchone()
+        return None if row is None else str(row[0])
+
+    def apply(self, rows: List[Row], state: Dict[str, str]) -> int:
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(_UPSERT, rows)
+            changed = self.connection.total_changes - before
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO mirror_state (name, value) VALUES (?, ?)", state.items()
+            )
+        return changed
+
+    def get(self, pid: str) -> Optional[Row]:
+        row = self.connection.execute(
+            "SELECT pid, created, modified FROM known_pids WHERE pid = ?", (pid,)
+        ).fetchone()
+        return None if row is None else (row[0], row[1], row[2])
+
+    def rows(self) -> Iterator[Row]:
+        for pid, created, modified in self.connection.execute(
+            "SELECT pid, created, modified FROM known_pids ORDER BY pid"
+        ):
+            yield pid, created, modified
+
+    def __len__(self) -> int:
+        return int(self.connection.execute("SELECT count(*) FROM known_pids").fetchone()[0])
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def modified_pages(
+    api: PIDManagementApi, since: Optional[int], page_size: int, **kwargs: Any
+) -> Iterator[List[Row]]:
+    """Pages of the known PIDs modified at or after `since`, ordered by
+    modification time and PID.
+
+    Each page is the response of one `find_all` request; the last one is
+    shorter than `page_size`, possibly empty. The next page starts at the
+    modification time of the last PID instead of at the next page number,
+    so modifications during the scan neither skip nor repeat PIDs, apart
+    from the ones at that time itself.
+
+    :param since: Microseconds since the epoch, or None for all known PIDs.
+    :param kwargs: Further arguments of `find_all`, e.g. `_request_timeout`.
+    """
+    cursor, page = since, 0
+    while True:
+        rows = _fetch(api, cursor, page, page_size, kwargs)
+        yield rows
+        if len(rows) < page_size:
+            return
+        newest = rows[-1][2]
+        if cursor is not None and newest <= cursor:
+            # a whole page modified at the same time: page within it
+            page += 1
+        else:
+            cursor, page = newest, 0
+
+
+def _fetch(
+    api: PIDManagementApi, cursor: Optional[int], page: int, size: int,
+    kwargs: Dict[str, Any],
+) -> List[Row]:
+    convert = timestamp_converter()
+    with api.find_all_stream(
+        modified_after=None if cursor is None else from_microseconds(cursor),
+        page=page,
+        size=size,
+        sort=["modified,asc", "pid,asc"],
+        **kwargs,
+    ) as known_pids:
+        return [
+            (item["pid"], convert(item["created"]), convert(item["modified"]))
+            for item in known_pids.iter_json()
+        ]
+
+
+class SyncResult(NamedTuple):
+    """Outcome of a `KnownPidMirror.sync`."""
+
+    fetched: int
+    """Known PIDs received, including the ones re-read in the overlap"""
+    changed: int
+    """Known PIDs inserted or updated in the mirror"""
+    requests: int
+    """Number of find_all requests"""
+    watermark: Optional[datetime]
+    """Newest modification time seen, where the next sync continues"""
+    elapsed: float
+    """Seconds taken"""
+
+
+class KnownPidMirror:
+    """Local copy of the known PIDs of a service, updated incrementally.
+
+    :param api: API of the service.
+    :param store: A `MirrorStore`, or the path of an SQLite database.
+    :param page_size: Known PIDs requested at once.
+    :param overlap: How far before the watermark a sync starts.
+    :raises ValueError: if the store mirrors another service.
+    """
+
+    def __init__(
+        self,
+        api: PIDManagementApi,
+        store: Union[str, "os.PathLike[str]", MirrorStore] = ":memory:",
+        page_size: int = 1000,
+        overlap: timedelta = timedelta(minutes=1),
+    ) -> None:
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+        self.api = api
+        self.store: MirrorStore = (
+            SqliteStore(store) if isinstance(store, (str, os.PathLike)) else store
+        )
+        self.page_size = page_size
+        self.overlap = overlap
+        self.host = str(api.api_client.configuration.host)
+        mirrored = self.store.get_state("host")
+        if mirrored is not None and mirrored != self.host:
+            raise ValueError("The store mirrors %s, not %s" % (mirrored, self.host))
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        """Newest modification time of the mirrored known PIDs, None before
+        the first sync."""
+        value = self.store.get_state("watermark")
+        return None if value is None else from_microseconds(int(value))
+
+    def sync(self, **kwargs: Any) -> SyncResult:
+        """Fetch the known PIDs modified since the last sync and apply them.
+
+        An interrupted sync keeps what it applied; the next one continues
+        from there.
+
+        :param kwargs: Further arguments of `find_all`, e.g. `_request_timeout`.
+        """
+        start = time.perf_counter()
+        watermark = self.store.get_state("watermark")
+        since = None
+        if watermark is not None:
+            since = int(watermark) - self.overlap // timedelta(microseconds=1)
+        fetched = changed = requests = 0
+        for rows in modified_pages(self.api, since, self.page_size, **kwargs):
+            requests += 1
+            fetched += len(rows)
+            if rows:
+                newest = rows[-1][2]
+                state = {"host": self.host}
+                if watermark is None or newest > int(watermark):
+                    watermark = state["watermark"] = str(newest)
+                changed += self.store.apply(rows, state)
+        return SyncResult(
+            fetched, changed, requests, self.watermark, time.perf_counter() - start
+        )
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def get(self, pid: str) -> Optional[KnownPid]:
+        """Mirrored known PID, without validation."""
+        row = self.store.get(pid)
+        if row is None:
+            return None
+        return construct(
+            KnownPid, pid=row[0], created=from_microseconds(row[1]),
+            modified=from_microseconds(row[2]),
+        )
+
+    def table(self, use_numpy: Optional[bool] = None) -> KnownPidTable:
+        """All mirrored known PIDs as a table, ordered by PID."""
+        return KnownPidTable.from_rows(self.store.rows(), use_numpy)
+
+    def __enter__(self) -> "KnownPidMirror":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the store."""
+        self.store.close()
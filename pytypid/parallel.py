@@ -0,0 +1,75 @@
+"""Process pools whose workers each own a warmed-up API client.
+
+Example::
+
+    from pytypid import Configuration, PIDManagementApi
+    from pytypid.parallel import worker_client, worker_pool
+
+    def validate(record):
+        api = PIDManagementApi(worker_client())
+        return api.create_pid(pid_record=record, dryrun=True)
+
+    with worker_pool(Configuration(host=...), max_workers=8) as pool:
+        results = list(pool.map(validate, records, chunksize=64))
+
+Functions passed to the pool must be importable by the workers, i.e. be
+defined at module level.
+"""
+
+import multiprocessing.context
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from pytypid_generated_client.configuration import Configuration
+
+from .client import ApiClient
+
+_worker_client: Optional[ApiClient] = None
+
+
+def init_worker(configuration: Configuration, warm_up: int = 1) -> None:
+    """Create the client of the current worker process.
+
+    Used as `initializer` of the pool by `worker_pool`; call it directly when
+    building a pool by other means.
+
+    :param configuration: Configuration of the worker client.
+    :param warm_up: Number of connections to open in advance.
+    """
+    global _worker_client
+    _worker_client = ApiClient(configuration)
+    if warm_up > 0:
+        _worker_client.rest_client.warm_up(configuration.host, connections=warm_up)
+
+
+def worker_client() -> ApiClient:
+    """Return the client of the current worker process."""
+    if _worker_client is None:
+        raise RuntimeError(
+            "No worker client in this process. Use worker_pool(), or init_worker() "
+            "as initializer of the process pool."
+        )
+    return _worker_client
+
+
+def worker_pool(
+    configuration: Configuration,
+    max_workers: Optional[int] = None,
+    warm_up: int = 1,
+    mp_context: Optional[multiprocessing.context.BaseContext] = None,
+) -> ProcessPoolExecutor:
+    """Create a process pool in which every worker owns a client for
+    `configuration`, with `warm_up` connections already established.
+
+    :param configuration: Configuration of the worker clients. Must be
+      picklable unless the "fork" start method is used.
+    :param max_workers: Number of worker processes, defaults to the CPU count.
+    :param warm_up: Number of connections each worker opens in advance.
+    :param mp_context: Multiprocessing context, e.g. to select a start method.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=mp_context,
+        initializer=init_worker,
+        initargs=(configuration, warm_up),
+    )
@@ -1,6 +1,12 @@
-from typing import Dict, List
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from pytypid_generated_client.models import PIDRecord, PIDRecordEntry, SimplePidRecord
+from pydantic import ConfigDict, TypeAdapter
+
+from pytypid_generated_client.models import PIDRecord, PIDRecordEntry, SimplePair, SimplePidRecord
+
+from .construct import construct, gc_paused
+from .interning import interner
 
 
 class SimpleRecord(SimplePidRecord):
@@ -9,10 +15,265 @@ class SimpleRecord(SimplePidRecord):
         entries: Dict[str, List[PIDRecordEntry]] = {}
         if self.record:
             for pair in self.record:
-                key = pair.key
-                if not key:
+                if not pair.key:
                     continue
+                key, value = interner.pair(pair.key, pair.value)
                 if key not in entries:
                     entries[key] = []
-                entries[key].append(PIDRecordEntry(key=key, value=pair.value))
+                entries[key].append(PIDRecordEntry(key=key, value=value))
         return PIDRecord(pid=self.pid, entries=entries)
+
+    @classmethod
+    def from_record(cls, record: PIDRecord) -> "SimpleRecord":
+        """Convert PIDRecord to SimpleRecord. Entry names are lost."""
+        return _record_to_simple(record)
+
+
+class CompactRecord:
+    """Memory-efficient form of a PID record, for holding many records at once.
+
+    Keys, values and entry names are kept in parallel tuples, in the order
+    of the record entries. Keys and values are shared between records
+    through `pytypid.interning.interner`. `names` is None if no entry has a
+    name.
+    Additional properties of records and entries are not kept.
+    """
+
+    __slots__ = ("pid", "keys", "values", "names")
+
+    pid: Optional[str]
+    keys: Tuple[str, ...]
+    values: Tuple[Optional[str], ...]
+    names: Optional[Tuple[Optional[str], ...]]
+
+    def __init__(
+        self,
+        pid: Optional[str],
+        keys: Sequence[str],
+        values: Sequence[Optional[str]],
+        names: Optional[Sequence[Optional[str]]] = None,
+    ) -> None:
+        if len(values) != len(keys) or (names is not None and len(names) != len(keys)):
+            raise ValueError("keys, values and names must have the same length")
+        self.pid = pid
+        self.keys = tuple(map(sys.intern, keys))
+        self.values = tuple(map(interner.value, values))
+        self.names = tuple(names) if names is not None and any(names) else None
+
+    @classmethod
+    def from_record(cls, record: PIDRecord) -> "CompactRecord":
+        """Convert a `PIDRecord`."""
+        keys: List[str] = []
+        values: List[Optional[str]] = []
+        names: List[Optional[str]] = []
+        for key, entries in (record.entries or {}).items():
+            for entry in entries:
+                keys.append(key)
+                values.append(entry.value)
+                names.append(entry.name)
+        return cls(record.pid, keys, values, names)
+
+    @classmethod
+    def from_simple_record(cls, record: SimplePidRecord) -> "CompactRecord":
+        """Convert a `SimplePidRecord`. Pairs without key are skipped."""
+        pairs = [pair for pair in record.record or () if pair.key]
+        return cls(record.pid, [pair.key for pair in pairs if pair.key], [p.value for p in pairs])
+
+    @classmethod
+    def from_dict(cls, obj: Dict[str, Any]) -> "CompactRecord":
+        """Read the JSON representation of a `PIDRecord`, without validation."""
+        keys: List[str] = []
+        values: List[Optional[str]] = []
+        names: List[Optional[str]] = []
+        for key, entries in (obj.get("entries") or {}).items():
+            for entry in entries:
+                keys.append(key)
+                values.append(entry.get("value"))
+                names.append(entry.get("name"))
+        return cls(obj.get("pid"), keys, values, names)
+
+    @classmethod
+    def from_model(
+        cls, record: Union[PIDRecord, SimplePidRecord, "CompactRecord"]
+    ) -> "CompactRecord":
+        """Convert any kind of record, returning compact records as they are."""
+        if isinstance(record, CompactRecord):
+            return record
+        if isinstance(record, SimplePidRecord):
+            return cls.from_simple_record(record)
+        return cls.from_record(record)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """Iterate over (key, value) pairs."""
+        return zip(self.keys, self.values)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactRecord):
+            return NotImplemented
+        return (
+            self.pid == other.pid
+            and self.keys == other.keys
+            and self.values == other.values
+            and self.names == other.names
+        )
+
+    # mutable, so not hashable
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return "CompactRecord(pid=%r, entries=%d)" % (self.pid, len(self.keys))
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return self.pid, self.keys, self.values, self.names
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        pid, keys, values, names = state
+        self.pid = pid
+        self.keys = tuple(map(sys.intern, keys))
+        self.values = tuple(map(interner.value, values))
+        self.names = names
+
+    def to_record(self) -> PIDRecord:
+        """Convert to a `PIDRecord`, without validation."""
+        entries: Dict[str, List[PIDRecordEntry]] = {}
+        names = self.names or (None,) * len(self.keys)
+        for key, value, name in zip(self.keys, self.values, names):
+            if name is None:
+                entry = construct(PIDRecordEntry, key=key, value=value)
+            else:
+                entry = construct(PIDRecordEntry, key=key, name=name, value=value)
+            if key in entries:
+                entries[key].append(entry)
+            else:
+                entries[key] = [entry]
+        return construct(PIDRecord, pid=self.pid, entries=entries)
+
+    def to_simple_record(self) -> SimpleRecord:
+        """Convert to a `SimpleRecord`, without validation. Names are lost."""
+        pairs = [construct(SimplePair, key=k, value=v) for k, v in self]
+        return construct(SimpleRecord, pid=self.pid, record=pairs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the JSON representation of the equivalent `PIDRecord`,
+        without building any models."""
+        entries: Dict[str, List[Dict[str, str]]] = {}
+        names = self.names or (None,) * len(self.keys)
+        for key, value, name in zip(self.keys, self.values, names):
+            entry = {"key": key}
+            if name is not None:
+                entry["name"] = name
+            if value is not None:
+                entry["value"] = value
+            if key in entries:
+                entries[key].append(entry)
+            else:
+                entries[key] = [entry]
+        if self.pid is None:
+            return {"entries": entries}
+        return {"pid": self.pid, "entries": entries}
+
+
+AnyRecord = Union[PIDRecord, SimplePidRecord, CompactRecord]
+
+# validators are built on first use, like those of the models
+_record_list = TypeAdapter(List[PIDRecord], config=ConfigDict(defer_build=True))
+_simple_record_list = TypeAdapter(List[SimpleRecord], config=ConfigDict(defer_build=True))
+
+
+def _simple_to_record(record: SimplePidRecord) -> PIDRecord:
+    entries: Dict[str, List[PIDRecordEntry]] = {}
+    pair_ = interner.pair
+    for pair in record.record or ():
+        if not pair.key:
+            continue
+        key, value = pair_(pair.key, pair.value)
+        entry = construct(PIDRecordEntry, key=key, value=value)
+        same_key = entries.get(key)
+        if same_key is None:
+            entries[key] = [entry]
+        else:
+            same_key.append(entry)
+    return construct(PIDRecord, pid=record.pid, entries=entries)
+
+
+def _record_to_simple(record: PIDRecord) -> SimpleRecord:
+    pairs = [
+        construct(SimplePair, key=key, value=entry.value)
+        for key, entries in (record.entries or {}).items()
+        for entry in entries
+    ]
+    return construct(SimpleRecord, pid=record.pid, record=pairs)
+
+
+def to_records(
+    records: Iterable[AnyRecord], trusted: bool = True, pause_gc: bool = False
+) -> List[PIDRecord]:
+    """Convert records of any kind to `PIDRecord`, preserving their order.
+
+    Pairs of simple records are grouped by key, in the order of the first
+    occurrence of each key. Instances of `PIDRecord` are returned as they are.
+
+    :param trusted: If True, build the models without validation. Use it
+      for records which stem from validated models or from the server. If
+      False, all converted records are validated in one pass.
+    :param pause_gc: If True, pause the garbage collector of the process
+      meanwhile (see `pytypid.construct.gc_paused`), which speeds up large
+      batches; do not use it while other threads allocate many objects.
+    """
+    with gc_paused(pause_gc):
+        if trusted:
+            return [
+                r if isinstance(r, PIDRecord)
+                else r.to_record() if isinstance(r, CompactRecord)
+                else _simple_to_record(r)
+                for r in records
+            ]
+        records = list(records)
+        validated = iter(_record_list.validate_python([
+            CompactRecord.from_model(r).to_dict()
+            for r in records if not isinstance(r, PIDRecord)
+        ]))
+        return [r if isinstance(r, PIDRecord) else next(validated) for r in records]
+
+
+def to_simple_records(
+    records: Iterable[AnyRecord], trusted: bool = True, pause_gc: bool = False
+) -> List[SimpleRecord]:
+    """Convert records of any kind to `SimpleRecord`, preserving their order.
+
+    Entries of a `PIDRecord` become pairs in the order of its keys, names are
+    lost. Instances of `SimpleRecord` are returned as they are.
+
+    :param trusted: If True, build the models without validation. If False,
+      all converted records are validated in one pass.
+    :param pause_gc: See `to_records`.
+    """
+    with gc_paused(pause_gc):
+        if trusted:
+            return [
+                r if isinstance(r, SimpleRecord)
+                else r.to_simple_record() if isinstance(r, CompactRecord)
+                else _record_to_simple(r) if isinstance(r, PIDRecord)
+                else construct(SimpleRecord, pid=r.pid, record=r.record)
+                for r in records
+            ]
+        records = list(records)
+        validated = iter(_simple_record_list.validate_python([
+            {"pid": c.pid, "record": [{"key": k, "value": v} for k, v in c]}
+            for c in to_compact_records(r for r in records if not isinstance(r, SimpleRecord))
+        ]))
+        return [r if isinstance(r, SimpleRecord) else next(validated) for r in records]
+
+
+def to_compact_records(
+    records: Iterable[AnyRecord], pause_gc: bool = False
+) -> List[CompactRecord]:
+    """Convert records of any kind to `CompactRecord`, preserving their order.
+
+    :param pause_gc: See `to_records`.
+    """
+    with gc_paused(pause_gc):
+        return [CompactRecord.from_model(r) for r in records]
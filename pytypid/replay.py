@@ -0,0 +1,240 @@
+"""Recording and replaying of HTTP traffic.
+
+`RecordingTransport` passes the requests of a client on to another
+transport and writes every exchange, with its timing, to a file.
+`ReplayTransport` answers requests from such a file, so the client-side
+cost of a workload (serialization, the generated API layer, decoding and
+deserialization) can be measured repeatably without the service::
+
+    configuration = Configuration(host="https://pid.example.org")
+    recorder = RecordingTransport("traffic.rec", SharedTransport(configuration))
+    configuration.transport = recorder
+    ...  # run the workload
+    recorder.close()
+
+    configuration = Configuration(transport=ReplayTransport("traffic.rec"))
+    ...  # run the same workload again
+
+Recordings are gzip-compressed sequences of marshal'ed tuples. Bodies are
+stored as they went over the wire, i.e. compressed if they were.
+Authorization and cookie headers are not recorded.
+"""
+
+import gzip
+import io
+import marshal
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from http import HTTPStatus
+from typing import (
+    IO, Any, Deque, Dict, Iterator, List, Mapping, NamedTuple, Optional, Protocol, Tuple, Union,
+)
+from urllib.parse import urlsplit
+
+import urllib3
+from urllib3._request_methods import RequestMethods
+
+from pytypid_generated_client.exceptions import ApiException
+
+from .metrics import TransportMetrics
+from .transport import Transport
+
+# same as for `pytypid.codec`: repeated strings are stored once
+_MARSHAL_VERSION = 4
+
+_UNRECORDED_HEADERS = frozenset(("authorization", "cookie", "proxy-authorization"))
+
+
+class Exchange(NamedTuple):
+    """A recorded request and its response."""
+
+    method: str
+    url: str
+    request_headers: Tuple[Tuple[str, str], ...]
+    request_body: Optional[bytes]
+    status: int
+    response_headers: Tuple[Tuple[str, str], ...]
+    response_body: bytes
+    start: float
+    """Seconds since the start of the recording when the request was sent"""
+    elapsed: float
+    """Seconds until the response was read completely"""
+
+    @property
+    def target(self) -> str:
+        """Path and query of the URL."""
+        return _target(self.url)
+
+
+def _target(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.path + ("?" + parts.query if parts.query else "")
+
+
+def read_exchanges(source: Union[str, "os.PathLike[str]", IO[bytes]]) -> Iterator[Exchange]:
+    """Read the exchanges of a recording, in the order they were recorded."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield from read_exchanges(file)
+        return
+    with gzip.GzipFile(fileobj=source, mode="rb") as file:
+        while True:
+            try:
+                data = marshal.load(file)
+            except EOFError:
+                return
+            yield Exchange(*data)
+
+
+def _response(exchange: Exchange, **kw: Any) -> urllib3.HTTPResponse:
+    return urllib3.HTTPResponse(
+        body=io.BytesIO(exchange.response_body),
+        headers=urllib3.HTTPHeaderDict(exchange.response_headers),
+        status=exchange.status,
+        reason=HTTPStatus(exchange.status).phrase,
+        preload_content=kw.get("preload_content", True),
+        decode_content=kw.get("decode_content", True),
+        request_method=exchange.method,
+        request_url=exchange.url,
+    )
+
+
+class _Inner(Protocol):
+    @property
+    def pool_manager(self) -> RequestMethods: ...
+
+    @property
+    def metrics(self) -> TransportMetrics: ...
+
+    def close(self) -> None: ...
+
+
+class RecordingTransport(Transport):
+    """Transport recording the requests it passes on to another transport.
+
+    Responses are read completely before they are returned, so streamed
+    responses are held in memory while recording.
+
+    :param target: Path of the recording to create, or a binary file object,
+      which is not closed.
+    :param inner: Transport sending the requests, e.g. a
+      `pytypid.rest.SharedTransport`. Closed with this transport.
+    """
+
+    def __init__(
+        self, target: Union[str, "os.PathLike[str]", IO[bytes]], inner: _Inner
+    ) -> None:
+        super().__init__()
+        self.inner = inner
+        self.metrics = inner.metrics
+        self._target: Optional[IO[bytes]] = None
+        if isinstance(target, (str, os.PathLike)):
+            target = self._target = open(target, "wb")
+        self._file = gzip.GzipFile(fileobj=target, mode="wb")
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Any] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        encode_multipart: bool = True,
+        multipart_boundary: Optional[str] = None,
+        **kw: Any,
+    ) -> urllib3.BaseHTTPResponse:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        start = time.perf_counter()
+        kw["preload_content"] = False
+        response = self.inner.pool_manager.urlopen(method, url, body=body, headers=headers, **kw)
+        try:
+            content = response.read(decode_content=False)
+        finally:
+            response.release_conn()
+        exchange = Exchange(
+            method,
+            url,
+            tuple(
+                (name, value) for name, value in (headers or {}).items()
+                if name.lower() not in _UNRECORDED_HEADERS
+            ),
+            body,
+            response.status,
+            tuple(response.headers.items()),
+            content,
+            start - self._started,
+            time.perf_counter() - start,
+        )
+        with self._lock:
+            marshal.dump(tuple(exchange), self._file, _MARSHAL_VERSION)
+        return _response(exchange, **kw)
+
+    def close(self) -> None:
+        """Finish the recording and close the inner transport."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                if self._target is not None:
+                    self._target.close()
+        self.inner.close()
+
+
+class ReplayTransport(Transport):
+    """Transport answering requests with the responses of a recording.
+
+    Requests are matched by method, path and query; the host and the body
+    are not compared. Repeated requests get the recorded responses in
+    their recorded order.
+
+    :param source: Path of a recording, or a binary file object.
+    :param latency: Factor of the recorded response times to wait before
+      answering. 0 answers immediately, 1 as fast as the server did.
+    """
+
+    def __init__(
+        self, source: Union[str, "os.PathLike[str]", IO[bytes]], latency: float = 0.0
+    ) -> None:
+        super().__init__()
+        self.latency = latency
+        self.exchanges: List[Exchange] = list(read_exchanges(source))
+        """All exchanges of the recording"""
+        self._lock = threading.Lock()
+        self.rewind()
+
+    def rewind(self) -> None:
+        """Make all recorded responses available again."""
+        queues: Dict[Tuple[str, str], Deque[Exchange]] = defaultdict(deque)
+        for exchange in self.exchanges:
+            queues[(exchange.method, exchange.target)].append(exchange)
+        with self._lock:
+            self._queues = queues
+
+    @property
+    def remaining(self) -> int:
+        """Number of recorded responses not replayed yet."""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Any] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        encode_multipart: bool = True,
+        multipart_boundary: Optional[str] = None,
+        **kw: Any,
+    ) -> urllib3.BaseHTTPResponse:
+        target = _target(url)
+        with self._lock:
+            queue = self._queues.get((method.upper(), target))
+            exchange = queue.popleft() if queue else None
+        if exchange is None:
+            raise ApiException(status=0, reason="No recorded response to %s %s" % (method, target))
+        if self.latency:
+            time.sleep(exchange.elapsed * self.latency)
+        return _response(exchange, **kw)
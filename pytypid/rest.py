@@ -0,0 +1,505 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import socket
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional, Type, Union, cast
+from urllib.parse import urlsplit
+
+import urllib3
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.exceptions import EmptyPoolError
+from urllib3.util.ssl_ import create_urllib3_context
+
+from pytypid_generated_client import rest
+from pytypid_generated_client.configuration import Configuration
+from pytypid_generated_client.exceptions import ApiException
+
+from .encoding import ACCEPT_ENCODING, encode_body
+from .metrics import TransportMetrics
+from .transport import Transport, http2_connection_class, unix_socket_connection_class
+
+if TYPE_CHECKING:
+    from urllib3._base_connection import BaseHTTPConnection
+
+logger = logging.getLogger(__name__)
+
+_BODY_METHODS = ("POST", "PUT", "PATCH", "OPTIONS", "DELETE")
+
+
+def _timeout(request_timeout: Any) -> Optional[urllib3.Timeout]:
+    """Convert a `_request_timeout` argument like the generated client."""
+    if not request_timeout:
+        return None
+    if isinstance(request_timeout, (int, float)):
+        return urllib3.Timeout(total=request_timeout)
+    if isinstance(request_timeout, tuple) and len(request_timeout) == 2:
+        return urllib3.Timeout(connect=request_timeout[0], read=request_timeout[1])
+    return None
+
+
+class _InstrumentedPool(HTTPConnectionPool):
+    """Connection pool reporting connection churn to a `TransportMetrics`.
+
+    Only used as a base in `_instrument_pool_class`, which mixes it into the
+    pool class urllib3 would otherwise use for a scheme.
+    """
+
+    metrics: TransportMetrics
+    pool_timeout: Optional[float] = None
+
+    def _get_conn(self, timeout: Optional[float] = None) -> BaseHTTPConnection:
+        if timeout is None:
+            timeout = self.pool_timeout
+        start = time.perf_counter()
+        try:
+            conn = super()._get_conn(timeout=timeout)
+        except EmptyPoolError:
+            self.metrics.increment("pool_exhausted")
+            raise
+        finally:
+            self.metrics.observe_pool_wait(time.perf_counter() - start)
+        # fresh and dropped connections both have to (re)connect
+        if getattr(conn, "sock", None) is not None:
+            self.metrics.increment("connections_reused")
+        else:
+            self.metrics.increment("connections_created")
+        return conn
+
+    def _put_conn(self, conn: Optional[BaseHTTPConnection]) -> None:
+        sock = getattr(conn, "sock", None)
+        context = getattr(conn, "ssl_context", None)
+        if isinstance(context, _SessionReusingContext) and isinstance(sock, ssl.SSLSocket):
+            context.remember_session(sock)
+        was_open = sock is not None
+        try:
+            super()._put_conn(conn)
+        finally:
+            # urllib3 closes connections it cannot return to a full pool
+            if was_open and getattr(conn, "sock", None) is None:
+                self.metrics.increment("connections_discarded")
+
+
+def _instrument_pool_class(
+    pool_cls: Type[HTTPConnectionPool],
+    metrics: TransportMetrics,
+    pool_timeout: Optional[float],
+    connection_cls: Optional[Type[HTTPConnection]] = None,
+) -> Type[HTTPConnectionPool]:
+    """Derive a variant of `pool_cls` that reports to `metrics`, and opens
+    connections of `connection_cls` if given."""
+    attributes: Dict[str, Any] = {"metrics": metrics, "pool_timeout": pool_timeout}
+    if connection_cls is not None:
+        attributes["ConnectionCls"] = connection_cls
+    return cast(
+        Type[HTTPConnectionPool],
+        type(
+            "Instrumented" + pool_cls.__name__,
+            (_InstrumentedPool, pool_cls),
+            attributes,
+        ),
+    )
+
+
+class _SessionReusingContext(ssl.SSLContext):
+    """SSL context resuming the most recent TLS session of a server when
+    opening another connection to it, which saves a full handshake.
+
+    urllib3 does not pass sessions to `wrap_socket`, so the context remembers
+    them itself: right after the handshake and, as TLS 1.3 tickets only
+    arrive with the first response, again when a connection is returned to
+    its pool.
+    """
+
+    def __init__(self, protocol: int = ssl.PROTOCOL_TLS_CLIENT) -> None:
+        super().__init__()
+        self._sessions: Dict[Optional[str], ssl.SSLSession] = {}
+
+    def remember_session(self, ssl_socket: ssl.SSLSocket) -> None:
+        """Offer the session of `ssl_socket` to future connections."""
+        try:
+            session = ssl_socket.session
+        except (OSError, ValueError, AttributeError):
+            return
+        if session is not None:
+            self._sessions[ssl_socket.server_hostname] = session
+
+    def wrap_socket(  # type: ignore[override]
+        self,
+        sock: socket.socket,
+        server_side: bool = False,
+        do_handshake_on_connect: bool = True,
+        suppress_ragged_eofs: bool = True,
+        server_hostname: Optional[str] = None,
+        session: Optional[ssl.SSLSession] = None,
+    ) -> ssl.SSLSocket:
+        if session is None and not server_side:
+            session = self._sessions.get(server_hostname)
+        ssl_socket = super().wrap_socket(
+            sock,
+            server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname,
+            session=session,
+        )
+        if not server_side and do_handshake_on_connect:
+            self.remember_session(ssl_socket)
+        return ssl_socket
+
+
+def _shared_ssl_context(configuration: Configuration) -> ssl.SSLContext:
+    """Build one SSL context for all connections of a transport, configured
+    like the per-connection contexts urllib3 would create otherwise."""
+    cert_reqs = ssl.CERT_REQUIRED if configuration.verify_ssl else ssl.CERT_NONE
+    defaults = create_urllib3_context(cert_reqs=cert_reqs)
+    context = _SessionReusingContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.options = defaults.options
+    context.minimum_version = defaults.minimum_version
+    context.maximum_version = defaults.maximum_version
+    context.check_hostname = defaults.check_hostname
+    context.verify_mode = defaults.verify_mode
+    context.post_handshake_auth = defaults.post_handshake_auth
+    if defaults.keylog_filename:
+        context.keylog_filename = defaults.keylog_filename
+
+    if configuration.ssl_ca_cert or configuration.ca_cert_data:
+        context.load_verify_locations(
+            cafile=configuration.ssl_ca_cert, cadata=configuration.ca_cert_data
+        )
+    else:
+        context.load_default_certs()
+    if configuration.cert_file:
+        context.load_cert_chain(configuration.cert_file, configuration.key_file)
+    return context
+
+
+def _connection_class(
+    configuration: Configuration, pool_cls: Type[HTTPConnectionPool]
+) -> Optional[Type[HTTPConnection]]:
+    """Connection class for the pools of `pool_cls` if the configuration
+    asks for a different one than urllib3's."""
+    connection_cls = cast(Type[HTTPConnection], pool_cls.ConnectionCls)
+    changed = False
+    if getattr(configuration, "http2", False) and pool_cls.scheme == "https":
+        connection_cls = http2_connection_class()
+        changed = True
+    socket_path = getattr(configuration, "unix_socket", None)
+    if socket_path:
+        connection_cls = unix_socket_connection_class(connection_cls, socket_path)
+        changed = True
+    return connection_cls if changed else None
+
+
+def transport_key(configuration: Configuration) -> Hashable:
+    """Key of the configuration fields which determine how connections are
+    established. Clients with equal keys can share one transport."""
+    host = urlsplit(configuration.host)
+    return (
+        host.scheme,
+        host.netloc,
+        configuration.verify_ssl,
+        configuration.ssl_ca_cert,
+        configuration.ca_cert_data,
+        configuration.cert_file,
+        configuration.key_file,
+        configuration.assert_hostname,
+        configuration.tls_server_name,
+        configuration.proxy,
+        repr(configuration.proxy_headers),
+        repr(configuration.retries),
+        repr(configuration.socket_options),
+        configuration.connection_pool_maxsize,
+        getattr(configuration, "connection_pool_block", False),
+        getattr(configuration, "connection_pool_timeout", None),
+        getattr(configuration, "unix_socket", None),
+        getattr(configuration, "http2", False),
+    )
+
+
+class SharedTransport:
+    """Connection pools, SSL context and metrics shared by all clients with
+    the same `transport_key`."""
+
+    def __init__(self, configuration: Configuration) -> None:
+        self.key = transport_key(configuration)
+        self.references = 0
+        self.metrics = TransportMetrics()
+        self.ssl_context: Optional[ssl.SSLContext] = None
+        # the generated client knows how to translate the configuration
+        self.pool_manager: urllib3.PoolManager = (
+            rest.RESTClientObject(configuration).pool_manager
+        )
+
+        pool_kw = self.pool_manager.connection_pool_kw
+        pool_kw["block"] = getattr(configuration, "connection_pool_block", False)
+        if urlsplit(configuration.host).scheme == "https":
+            self.ssl_context = _shared_ssl_context(configuration)
+            if getattr(configuration, "http2", False):
+                self.ssl_context.set_alpn_protocols(["h2"])
+            pool_kw["ssl_context"] = self.ssl_context
+            # already loaded into the shared context, instead of once per connection
+            for name in ("ca_certs", "ca_cert_data", "cert_file", "key_file"):
+                pool_kw.pop(name, None)
+
+        pool_timeout = getattr(configuration, "connection_pool_timeout", None)
+        pool_classes: Dict[str, Any] = self.pool_manager.pool_classes_by_scheme
+        self.pool_manager.pool_classes_by_scheme = {
+            scheme: _instrument_pool_class(
+                pool_cls, self.metrics, pool_timeout, _connection_class(configuration, pool_cls)
+            )
+            for scheme, pool_cls in pool_classes.items()
+        }
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.pool_manager.clear()
+
+
+class TransportRegistry:
+    """Process-wide registry of `SharedTransport` objects.
+
+    Transports are reference counted. Released transports stay open, so
+    clients created later with compatible settings find warm connections,
+    but only the `max_idle` most recently released ones are kept.
+    """
+
+    def __init__(self, max_idle: int = 8) -> None:
+        self.max_idle = max_idle
+        self.generation = 0
+        """Incremented whenever all transports are abandoned after a fork
+        """
+        self._lock = threading.Lock()
+        self._transports: Dict[Hashable, SharedTransport] = {}
+        self._idle: "OrderedDict[Hashable, SharedTransport]" = OrderedDict()
+
+    def acquire(self, configuration: Configuration) -> SharedTransport:
+        """Return the transport for `configuration`, creating it if needed."""
+        key = transport_key(configuration)
+        with self._lock:
+            transport = self._transports.get(key)
+            if transport is None:
+                transport = SharedTransport(configuration)
+                self._transports[key] = transport
+            self._idle.pop(key, None)
+            transport.references += 1
+            return transport
+
+    def release(self, transport: SharedTransport) -> None:
+        """Give up one reference to `transport`."""
+        evicted = []
+        with self._lock:
+            transport.references -= 1
+            if transport.references > 0 or self._transports.get(transport.key) is not transport:
+                return
+            self._idle[transport.key] = transport
+            while len(self._idle) > self.max_idle:
+                key, idle = self._idle.popitem(last=False)
+                del self._transports[key]
+                evicted.append(idle)
+        for idle in evicted:
+            idle.close()
+
+    def clear(self) -> None:
+        """Close and forget all transports."""
+        with self._lock:
+            transports = list(self._transports.values())
+            self._transports.clear()
+            self._idle.clear()
+        for transport in transports:
+            transport.close()
+
+    def reset_after_fork(self) -> None:
+        """Forget all transports inherited from the parent process.
+
+        Their sockets belong to the parent, so they are neither closed nor
+        shut down here, only dropped. The lock is replaced, as it may have
+        been held by another thread of the parent while forking.
+        """
+        self._lock = threading.Lock()
+        self._transports = {}
+        self._idle = OrderedDict()
+        self.generation += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._transports)
+
+
+transports = TransportRegistry()
+"""Registry used by all `RESTClientObject` instances of this process."""
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=transports.reset_after_fork)
+
+
+class RESTResponse(rest.RESTResponse):
+    """Generated response, counting the size of the body in `metrics` when
+    it is read."""
+
+    def __init__(self, resp: urllib3.BaseHTTPResponse, metrics: TransportMetrics) -> None:
+        super().__init__(resp)
+        self.metrics = metrics
+
+    def read(self) -> bytes:
+        if self.data is None:
+            data: bytes = super().read()  # type: ignore[no-untyped-call]
+            self.metrics.observe_body(self.response.tell(), len(data or b""))
+        return cast(bytes, self.data)
+
+
+class RESTClientObject(rest.RESTClientObject):
+    """Generated REST client with governed, instrumented connection pools.
+
+    With `connection_pool_block` set in the configuration, at most
+    `connection_pool_maxsize` connections per host are opened and further
+    requests wait up to `connection_pool_timeout` seconds for one to become
+    free, instead of opening connections that are discarded afterwards.
+    Connection churn is reported in `metrics`. With `request_compression`
+    set in the configuration, large JSON request bodies are compressed, and
+    with `response_compression`, compressed responses are requested and
+    decoded as they are read.
+
+    Pools, SSL context and metrics are taken from the `transports` registry
+    and thus shared with every client of compatible configuration. Call
+    `close` to give them back. A client inherited through `fork()` acquires
+    a fresh transport in the child before its first request, so parent and
+    child never share sockets. A `pytypid.transport.Transport` set as
+    `transport` in the configuration is used instead of the registry.
+    """
+
+    def __init__(self, configuration: Configuration) -> None:
+        # Deliberately not calling the generated constructor, which would
+        # build a private pool manager.
+        self.configuration = configuration
+        self._acquire()
+
+    def _acquire(self) -> None:
+        self.transport: Union[SharedTransport, Transport]
+        custom = getattr(self.configuration, "transport", None)
+        if custom is not None:
+            self.transport = custom
+        else:
+            self.transport = transports.acquire(self.configuration)
+        # custom transports implement only the request methods of a pool manager
+        self.pool_manager = self.transport.pool_manager  # type: ignore[assignment]
+        self.metrics = self.transport.metrics
+        self._generation = transports.generation
+        self._closed = False
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Any = None,
+        post_params: Any = None,
+        _request_timeout: Any = None,
+    ) -> rest.RESTResponse:
+        if self._generation != transports.generation:
+            self._acquire()
+        if getattr(self.configuration, "response_compression", False):
+            headers = dict(headers or {})
+            headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        encoding = getattr(self.configuration, "request_compression", None)
+        if (
+            encoding
+            and body is not None
+            and not post_params
+            and method.upper() in _BODY_METHODS
+            and re.search("json", (headers or {}).get("Content-Type") or "json", re.IGNORECASE)
+        ):
+            response = self._request_json(
+                method, url, headers or {}, body, encoding, _request_timeout
+            )
+        else:
+            response = super().request(  # type: ignore[no-untyped-call]
+                method, url, headers, body, post_params, _request_timeout
+            )
+        return RESTResponse(response.response, self.metrics)
+
+    def _request_json(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Any,
+        encoding: str,
+        _request_timeout: Any,
+    ) -> rest.RESTResponse:
+        """Send a JSON body like the generated client, compressed if it is
+        large enough."""
+        data = json.dumps(body).encode("utf-8")
+        payload, compressed = encode_body(
+            data,
+            encoding,
+            getattr(self.configuration, "request_compression_threshold", 0),
+            getattr(self.configuration, "request_compression_level", 6),
+        )
+        if compressed:
+            headers = dict(headers, **{"Content-Encoding": encoding})
+            self.metrics.increment("request_bytes_uncompressed", len(data))
+            self.metrics.increment("request_bytes_compressed", len(payload))
+        try:
+            response = self.pool_manager.request(
+                method.upper(),
+                url,
+                body=payload,
+                timeout=_timeout(_request_timeout),
+                headers=headers,
+                preload_content=False,
+            )
+        except urllib3.exceptions.SSLError as e:
+            raise ApiException(status=0, reason="\n".join([type(e).__name__, str(e)]))
+        return rest.RESTResponse(response)
+
+    def warm_up(self, url: str, connections: int = 1) -> int:
+        """Open up to `connections` connections to the server of `url` and
+        put them into the pool, so the first requests skip TCP and TLS setup.
+
+        Best effort: connection errors are logged, not raised. At most the
+        pool size is opened, and connections in use are not waited for.
+
+        :return: The number of connections opened.
+        """
+        if self._generation != transports.generation:
+            self._acquire()
+        if not isinstance(self.pool_manager, urllib3.PoolManager):
+            return 0
+        pool = self.pool_manager.connection_from_url(url)
+        maxsize = int(self.pool_manager.connection_pool_kw.get("maxsize") or 1)
+        conns = []
+        opened = 0
+        try:
+            for _ in range(min(connections, maxsize)):
+                try:
+                    conn = pool._get_conn(timeout=0)
+                except EmptyPoolError:
+                    break  # the other connections are in use
+                conns.append(conn)
+                if not conn.is_connected:
+                    conn.connect()
+                opened += 1
+        except (OSError, urllib3.exceptions.HTTPError) as e:
+            logger.warning("Warming up connections to %s failed: %s", url, e)
+        finally:
+            for conn in conns:
+                pool._put_conn(conn)
+        return opened
+
+    def close(self) -> None:
+        """Release the shared transport. Idempotent."""
+        if not self._closed:
+            self._closed = True
+            if (
+                isinstance(self.transport, SharedTransport)
+                and self._generation == transports.generation
+            ):
+                transports.release(self.transport)
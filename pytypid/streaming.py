@@ -0,0 +1,459 @@
+"""Streaming of large responses.
+
+The generated API methods read the whole response body before decoding it,
+so memory peaks at several times the size of a large `find_all` page or
+`create_pids` batch. `ModelStream` instead decodes the items of a JSON array
+in the response one by one, while the body arrives, and `ResponseBody`
+passes the raw body on in chunks, e.g. into a file. Compressed bodies are
+decoded chunk by chunk on the way.
+"""
+
+import codecs
+import json
+import os
+import re
+from types import TracebackType
+from typing import (
+    IO, Any, Callable, Dict, Generator, Generic, Iterable, Iterator, Optional, Sequence, Type,
+    TypeVar, Union,
+)
+
+import urllib3
+
+from pytypid_generated_client import rest
+from pytypid_generated_client.api_client import ApiClient
+from pytypid_generated_client.models import PIDRecord
+
+from .metrics import TransportMetrics
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[\s,:\]}]")
+
+
+class _ValueScanner:
+    """Finds the end of a JSON value that arrives in pieces, looking at every
+    character once. Does not check the syntax: decoding the value does."""
+
+    def __init__(self, first: str) -> None:
+        self.scalar = first not in '"[{'
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str, pos: int) -> int:
+        """Scan `text` from `pos` on.
+
+        :return: The index after the value in `text`, or -1 if the value
+          continues in the next piece.
+        """
+        if self.scalar:
+            match = _SCALAR_END.search(text, pos)
+            return -1 if match is None else match.start()
+        while True:
+            if self.escaped:
+                if pos >= len(text):
+                    return -1
+                pos += 1
+                self.escaped = False
+            match = (_STRING if self.in_string else _STRUCTURE).search(text, pos)
+            if match is None:
+                return -1
+            pos = match.end()
+            char = match.group()
+            if self.in_string:
+                if char == "\\":
+                    self.escaped = True
+                    continue
+                self.in_string = False
+                if self.depth == 0:
+                    return pos
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return pos
+
+
+class JsonArrayReader:
+    """Decodes the items of a JSON array from a stream of byte chunks.
+
+    Only the current item and the undecoded rest of the current chunk are
+    held in memory.
+
+    :param chunks: The JSON document, in UTF-8.
+    :param path: Names of the object properties leading to the array, e.g.
+      ``("pidRecords",)``. Empty if the document is the array.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], path: Sequence[str] = ()) -> None:
+        self.path = tuple(path)
+        self.members: Dict[str, Any] = {}
+        """Other properties of the objects on the path, as far as read"""
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the decoded items."""
+        return self._items(self._value)
+
+    def texts(self) -> Iterator[str]:
+        """Iterate over the JSON texts of the items, without decoding them."""
+        return self._items(self._text)
+
+    def _items(self, item: Callable[[], Any]) -> Iterator[Any]:
+        yield from self._array(self.path, item)
+        if self._skip_whitespace():
+            self._error("Unexpected data after JSON document")
+
+    def _read(self) -> Optional[str]:
+        """Decode the next chunk. None at the end of the data."""
+        if self._eof:
+            return None
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                return text
+        self._eof = True
+        return self._decoder.decode(b"", final=True) or None
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer. False at the end of the data."""
+        text = self._read()
+        if text is None:
+            return False
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self) -> str:
+        """Return the next non-whitespace character, or "" at the end."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        if self._skip_whitespace() != char:
+            self._error("Expected %r" % char)
+        self._pos += 1
+
+    def _complete(self) -> int:
+        """Read until the buffer holds the next value completely.
+
+        The chunks of a value are scanned once and joined once, so large
+        values take linear time.
+
+        :return: The index after the value, or the end of the buffer at the
+          end of the data.
+        """
+        if not self._skip_whitespace():
+            return self._pos
+        scanner = _ValueScanner(self._buffer[self._pos])
+        end = scanner.feed(self._buffer, self._pos)
+        if end >= 0:
+            return end
+        pieces = [self._buffer[self._pos:]]
+        length = len(pieces[0])
+        while end < 0:
+            text = self._read()
+            if text is None:
+                break
+            end = scanner.feed(text, 0)
+            if end >= 0:
+                end += length
+            pieces.append(text)
+            length += len(text)
+        self._buffer = "".join(pieces)
+        self._pos = 0
+        return end if end >= 0 else length
+
+    def _value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self._complete()
+        value, self._pos = self._json.raw_decode(self._buffer, self._pos)
+        return value
+
+    def _text(self) -> str:
+        """Return the text of the next complete JSON value."""
+        end = self._complete()
+        if end == self._pos:
+            self._error("Expecting value")
+        text = self._buffer[self._pos:end]
+        self._pos = end
+        return text
+
+    def _array(self, path: Sequence[str], item: Callable[[], Any]) -> Iterator[Any]:
+        if not path:
+            self._expect("[")
+            if self._skip_whitespace() == "]":
+                self._pos += 1
+                return
+            while True:
+                yield item()
+                if not self._next_member("]"):
+                    return
+        self._expect("{")
+        if self._skip_whitespace() == "}":
+            self._pos += 1
+            return
+        while True:
+            name = self._value()
+            self._expect(":")
+            if name == path[0] and self._skip_whitespace() == "[":
+                yield from self._array(path[1:], item)
+            else:
+                self.members[name] = self._value()
+            if not self._next_member("}"):
+                return
+
+    def _next_member(self, closing: str) -> bool:
+        """Consume the separator after an array item or object member.
+
+        :return: False if the array or object ended.
+        """
+        char = self._skip_whitespace()
+        self._pos += 1
+        if char == ",":
+            return True
+        if char != closing:
+            self._error("Expected ',' or %r" % closing)
+        return False
+
+    def _error(self, message: str) -> None:
+        raise json.JSONDecodeError(message, self._buffer, self._pos)
+
+
+class ModelStream(Generic[T]):
+    """Iterates over the models in a JSON array of a response, decoding them
+    as the response arrives.
+
+    The connection goes back to the pool when the iteration is complete.
+    Use the stream as a context manager, or call `close`, to release it
+    earlier.
+
+    :param api_client: Client whose deserialization settings apply.
+    :param response: Response obtained with `_preload_content=False`, e.g.
+      by a `*_without_preload_content` method.
+    :param klass: Name of the model type of the items, e.g. "KnownPid".
+    :param path: Names of the object properties leading to the array.
+    :param chunk_size: Number of bytes to read at once.
+    :param response_types_map: Response types of the API method, used for
+      errors.
+    :raises ApiException: if the server answered with an error status.
+    """
+
+    def __init__(
+        self,
+        api_client: ApiClient,
+        response: urllib3.BaseHTTPResponse,
+        klass: str,
+        path: Sequence[str] = (),
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        response_types_map: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None:
+        self.response = response
+        check_status(api_client, response, response_types_map)
+        self.klass = klass
+        self.api_client = api_client
+        self._chunks = counted(response, chunk_size, getattr(api_client, "metrics", None))
+        self._reader = JsonArrayReader(self._chunks, path)
+        self._done = False
+
+    @property
+    def members(self) -> Dict[str, Any]:
+        """Other properties of the objects containing the array, as far as
+        read."""
+        return self._reader.members
+
+    def __iter__(self) -> Iterator[T]:
+        deserialize = self.api_client.deserialize
+        for text in self._consume(self._reader.texts()):
+            yield deserialize(text, self.klass, "application/json")
+
+    def iter_json(self) -> Iterator[Any]:
+        """Iterate over the items as decoded JSON, without building models."""
+        return self._consume(iter(self._reader))
+
+    def _consume(self, items: Iterator[Any]) -> Iterator[Any]:
+        try:
+            yield from items
+            self._done = True
+        finally:
+            self.close()
+
+    def __enter__(self) -> "ModelStream[T]":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the connection. A connection with unread data is closed."""
+        self._chunks.close()
+        release(self.response, complete=self._done)
+
+
+class BatchRecordStream(ModelStream[PIDRecord]):
+    """Streamed `BatchRecordResponse`: iterates over the created records."""
+
+    @property
+    def mapping(self) -> Dict[str, str]:
+        """Mapping from placeholder to actual PIDs, complete once all
+        records were read."""
+        mapping: Dict[str, str] = self.members.get("mapping") or {}
+        return mapping
+
+
+class ResponseBody:
+    """Body of a response, read in chunks and passed on without keeping it
+    in memory.
+
+    Iterating yields the chunks of the body; `write_to` copies it into a
+    file. The connection goes back to the pool when the body was read
+    completely. Use the body as a context manager, or call `close`, to
+    release it earlier.
+
+    :param response: Response obtained with `_preload_content=False`, e.g.
+      by a `*_without_preload_content` method.
+    :param chunk_size: Default number of bytes to read at once.
+    :param api_client: If given, error statuses raise the `ApiException` the
+      client raises for them, and the size of the body is counted in its
+      metrics.
+    :param response_types_map: Response types of the API method, used for
+      errors.
+    :raises ApiException: if `api_client` is given and the server answered
+      with an error status.
+    """
+
+    def __init__(
+        self,
+        response: urllib3.BaseHTTPResponse,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        api_client: Optional[ApiClient] = None,
+        response_types_map: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None:
+        self.response = response
+        self.chunk_size = chunk_size
+        self.metrics: Optional[TransportMetrics] = getattr(api_client, "metrics", None)
+        if api_client is not None:
+            check_status(api_client, response, response_types_map)
+        self._done = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.iter_chunks()
+
+    def iter_chunks(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the body in chunks of up to `chunk_size` bytes, decoded
+        according to its Content-Encoding."""
+        try:
+            yield from counted(self.response, chunk_size or self.chunk_size, self.metrics)
+            self._done = True
+        finally:
+            self.close()
+
+    def write_to(
+        self,
+        target: Union[str, "os.PathLike[str]", IO[bytes]],
+        chunk_size: Optional[int] = None,
+    ) -> int:
+        """Write the body to a file.
+
+        :param target: Path of the file to create or overwrite, or a binary
+          file object, which is not closed.
+        :param chunk_size: Number of bytes to read and write at once.
+        :return: Number of bytes written.
+        """
+        if isinstance(target, (str, os.PathLike)):
+            with open(target, "wb") as file:
+                return self.write_to(file, chunk_size)
+        written = 0
+        for chunk in self.iter_chunks(chunk_size):
+            target.write(chunk)
+            written += len(chunk)
+        return written
+
+    def __enter__(self) -> "ResponseBody":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the connection. A connection with unread data is closed."""
+        release(self.response, complete=self._done)
+
+
+def counted(
+    response: urllib3.BaseHTTPResponse,
+    chunk_size: int,
+    metrics: Optional[TransportMetrics] = None,
+) -> Generator[bytes, None, None]:
+    """Yield the body of a response in decoded chunks, and count its size in
+    `metrics` once the generator is exhausted or closed."""
+    decoded = 0
+    try:
+        for chunk in response.stream(chunk_size):
+            decoded += len(chunk)
+            yield chunk
+    finally:
+        if metrics is not None:
+            metrics.observe_body(response.tell(), decoded)
+
+
+def check_status(
+    api_client: ApiClient,
+    response: urllib3.BaseHTTPResponse,
+    response_types_map: Optional[Dict[str, Optional[str]]] = None,
+) -> None:
+    """Raise the `ApiException` for an error status of a response requested
+    without preloading, like the API methods do. The connection is released.
+    """
+    if 200 <= response.status <= 299:
+        return
+    error = rest.RESTResponse(response)
+    try:
+        error.read()  # type: ignore[no-untyped-call]
+    finally:
+        release(response, complete=True)
+    api_client.response_deserialize(error, response_types_map or {})
+
+
+def release(response: urllib3.BaseHTTPResponse, complete: bool = False) -> None:
+    """Return the connection of a response to its pool.
+
+    :param complete: True if the body was read completely. Otherwise the
+      connection is closed, since unread data would break the next request.
+    """
+    if not complete:
+        response.close()
+    response.release_conn()
@@ -0,0 +1,225 @@
+"""In-memory stand-in of the Typed PID Maker API, for tests and load tests
+without a running instance.
+
+`StubService` is a WSGI application. Call it in-process through
+`pytypid.transport.WSGITransport`, or serve it with any WSGI server.
+"""
+
+import gzip
+import hashlib
+import itertools
+import json
+import operator
+import threading
+import zlib
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from .timestamps import parse_datetime
+
+StartResponse = Callable[[str, List[Tuple[str, str]]], Any]
+
+_API = "/api/v1/pit"
+
+# query parameters of find_all filtering the known PIDs; bounds are inclusive
+_FILTERS = (
+    ("created_after", "created", operator.ge),
+    ("created_before", "created", operator.le),
+    ("modified_after", "modified", operator.ge),
+    ("modified_before", "modified", operator.le),
+)
+
+
+class StubService:
+    """WSGI application serving a tiny stand-in of the Typed PID Maker API.
+
+    * ``POST .../pid/`` and ``POST .../pids`` assign sandboxed PIDs, replace
+      placeholder PIDs in entry values, and keep the records unless `dryrun`
+      is set. Records with an entry "invalid" are rejected with status 400.
+    * ``GET .../pid/<pid>`` and ``PUT .../pid/<pid>`` read and replace kept
+      records. Records are sent with an ETag; updates with an ``If-Match``
+      header not matching it are rejected with status 412.
+    * ``GET .../known-pid`` lists the PIDs of the kept records, with the
+      time of their creation and last modification, filtered, sorted and
+      paged like the service does. As long as no record is kept, it lists
+      `size` generated known PIDs instead.
+    * Any other ``GET`` reports the health status.
+
+    Request bodies may be compressed with gzip or deflate.
+
+    :param compress_responses: If True, responses are gzip-compressed for
+      clients accepting it.
+    :param clock: Function returning the current time, for the timestamps
+      of known PIDs. Defaults to the system clock (UTC).
+    :param require_if_match: If True, updates without ``If-Match`` header
+      are rejected with status 428, like the service does.
+    """
+
+    def __init__(
+        self,
+        compress_responses: bool = False,
+        clock: Optional[Callable[[], datetime]] = None,
+        require_if_match: bool = False,
+    ) -> None:
+        self.compress_responses = compress_responses
+        self.require_if_match = require_if_match
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.records: Dict[str, Dict[str, Any]] = {}
+        """Kept records by PID"""
+        self.known_pids: Dict[str, Dict[str, datetime]] = {}
+        """Creation ("created") and modification ("modified") times of the
+        kept records by PID"""
+        self._pids = itertools.count()
+        self._lock = threading.Lock()
+
+    def __call__(self, environ: Dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        method = environ["REQUEST_METHOD"]
+        path = environ.get("PATH_INFO", "")
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        if method in ("POST", "PUT"):
+            status, content = self._write(
+                method, path, query, self._read_json(environ), environ.get("HTTP_IF_MATCH")
+            )
+        elif path.endswith("/known-pid"):
+            status, content = self._find_all(query)
+        elif _API + "/pid/" in path:
+            status, content = self._get(path)
+        else:
+            status, content = 200, {"status": "UP"}
+
+        body = b"" if content is None else json.dumps(content).encode("utf-8")
+        headers = [("Content-Type", "application/json")]
+        if status in (200, 201) and _API + "/pid/" in path:
+            headers.append(("ETag", _etag(content)))
+        if self.compress_responses and "gzip" in environ.get("HTTP_ACCEPT_ENCODING", ""):
+            body = gzip.compress(body)
+            headers.append(("Content-Encoding", "gzip"))
+        headers.append(("Content-Length", str(len(body))))
+        start_response("%d %s" % (status, HTTPStatus(status).phrase), headers)
+        return [body]
+
+    def _read_json(self, environ: Dict[str, Any]) -> Any:
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        body = environ["wsgi.input"].read(length)
+        encoding = environ.get("HTTP_CONTENT_ENCODING")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        return json.loads(body)
+
+    def _write(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, List[str]],
+        content: Any,
+        if_match: Optional[str] = None,
+    ) -> Tuple[int, Any]:
+        records = content if isinstance(content, list) else [content]
+        if any("invalid" in (r.get("entries") or {}) for r in records):
+            return 400, {"detail": "record is invalid"}
+        dryrun = query.get("dryrun", ["false"])[0] == "true"
+        if method == "PUT":
+            pid = self._pid(path)
+            if if_match is None and self.require_if_match:
+                return 428, {"detail": "If-Match header required"}
+            content["pid"] = pid
+            with self._lock:
+                if pid not in self.records:
+                    return 404, {"detail": "PID not found"}
+                if if_match is not None and if_match != _etag(self.records[pid]):
+                    return 412, {"detail": "Record was modified"}
+                if not dryrun:
+                    self.records[pid] = content
+                    self.known_pids[pid]["modified"] = self.clock()
+            return 200, content
+        mapping = self._assign_pids(records)
+        if not dryrun:
+            with self._lock:
+                now = self.clock()
+                for record in records:
+                    self.records[record["pid"]] = record
+                    self.known_pids[record["pid"]] = {"created": now, "modified": now}
+        if path.endswith("/pids"):
+            return 201, {"pidRecords": records, "mapping": mapping}
+        return 201, records[0]
+
+    def _get(self, path: str) -> Tuple[int, Any]:
+        record = self.records.get(self._pid(path))
+        if record is None:
+            return 404, {"detail": "PID not found"}
+        return 200, record
+
+    def _find_all(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        try:
+            page = int(query.get("page", ["0"])[0])
+            size = int(query.get("size", ["20"])[0])
+            bounds = [
+                (field, compare, parse_datetime(query[name][0]))
+                for name, field, compare in _FILTERS if name in query
+            ]
+        except ValueError as e:
+            return 400, {"detail": str(e)}
+        if size < 0 or page < 0:
+            return 400, {"detail": "page and size must not be negative"}
+        with self._lock:
+            known: List[Dict[str, Any]] = [
+                dict(times, pid=pid) for pid, times in self.known_pids.items()
+            ]
+        if not known:
+            known = [
+                {
+                    "pid": "sandboxed/known/%d" % i,
+                    "created": datetime(2024, 5, 1, 10, tzinfo=timezone.utc),
+                    "modified": datetime(2024, 5, 1, 10, 0, i % 60, tzinfo=timezone.utc),
+                }
+                for i in range(size)
+            ]
+        known = [
+            k for k in known if all(compare(k[field], bound) for field, compare, bound in bounds)
+        ]
+        for criterion in reversed(query.get("sort", [])):
+            field, _, direction = criterion.partition(",")
+            if field not in ("pid", "created", "modified"):
+                return 400, {"detail": "cannot sort by %s" % field}
+            known.sort(key=lambda k: k[field], reverse=direction.lower() == "desc")
+        return 200, [
+            {
+                "pid": k["pid"],
+                "created": _timestamp(k["created"]),
+                "modified": _timestamp(k["modified"]),
+            }
+            for k in known[page * size:(page + 1) * size]
+        ]
+
+    def _assign_pids(self, records: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Replace (placeholder) PIDs like the service and its sandbox
+        generator do."""
+        mapping = {}
+        with self._lock:
+            pids = ["sandboxed/%d" % next(self._pids) for _ in records]
+        for record, pid in zip(records, pids):
+            if record.get("pid"):
+                mapping[record["pid"]] = pid
+            record["pid"] = pid
+        for record in records:
+            for entries in (record.get("entries") or {}).values():
+                for entry in entries:
+                    entry["value"] = mapping.get(entry.get("value"), entry.get("value"))
+        return mapping
+
+    @staticmethod
+    def _pid(path: str) -> str:
+        return path.split(_API + "/pid/", 1)[1]
+
+
+def _etag(record: Any) -> str:
+    digest = hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+    return '"%s"' % digest
+
+
+def _timestamp(value: datetime) -> str:
+    return value.isoformat(timespec="microseconds").replace("+00:00", "Z")
@@ -0,0 +1,384 @@
+"""Known PIDs in columns, for filtering and comparing large listings.
+
+A `KnownPidTable` keeps the PIDs of a `find_all` listing in one contiguous
+UTF-8 buffer with offsets, and the `created` and `modified` timestamps as
+arrays of microseconds since the epoch (UTC). With NumPy installed, the
+timestamps are `datetime64[us]` arrays and filtering, sorting and set
+operations are vectorized; otherwise the standard `array` module holds them.
+`PIDManagementApi.find_all_table` fills a table while the response arrives,
+without building a `KnownPid` per row::
+
+    table = api.find_all_table(size=100000)
+    recent = table.filter(modified_after=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    for pid in recent.difference(previous).pids:
+        ...
+"""
+
+import importlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from pytypid_generated_client.models import KnownPid
+
+from .construct import construct
+from .timestamps import parse_datetime
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_MICROSECOND = timedelta(microseconds=1)
+
+_SORT_KEYS = ("pid", "created", "modified")
+
+_numpy: Any = None
+
+
+def numpy_module() -> Any:
+    """Return the `numpy` module, or None if it is not installed. Imported on
+    first use, as it takes long to import."""
+    global _numpy
+    if _numpy is None:
+        try:
+            _numpy = importlib.import_module("numpy")
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+def to_microseconds(value: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // _MICROSECOND
+
+
+def from_microseconds(value: int) -> datetime:
+    """Inverse of `to_microseconds`, as a UTC datetime."""
+    return EPOCH + timedelta(microseconds=value)
+
+
+def timestamp_converter() -> Callable[[str], int]:
+    """Return a function converting ISO-8601 timestamps to microseconds
+    since the epoch. It converts each distinct timestamp once, as equal
+    timestamps are frequent in listings."""
+    micros: Dict[str, int] = {}
+
+    def convert(text: str) -> int:
+        value = micros.get(text)
+        if value is None:
+            value = micros[text] = to_microseconds(parse_datetime(text))
+        return value
+    return convert
+
+
+def _resolve(use_numpy: Optional[bool]) -> Any:
+    if use_numpy is False:
+        return None
+    np = numpy_module()
+    if np is None and use_numpy:
+        raise ImportError("KnownPidTable(use_numpy=True) needs the 'numpy' package")
+    return np
+
+
+class KnownPidTable:
+    """Columns of known PIDs.
+
+    Tables are immutable: filtering, sorting and set operations return new
+    tables. Build them with `from_json`, `from_known_pids` or `concat`.
+
+    :param use_numpy: True to require NumPy, False to use the `array`
+      module, None to use NumPy if it is installed.
+    """
+
+    def __init__(
+        self,
+        pid_data: bytes = b"",
+        pid_offsets: Optional[Sequence[int]] = None,
+        created: Iterable[int] = (),
+        modified: Iterable[int] = (),
+        use_numpy: Optional[bool] = None,
+    ) -> None:
+        self._np = _resolve(use_numpy)
+        self._data = pid_data
+        """PIDs, UTF-8 encoded and concatenated"""
+        self._offsets = array("q", pid_offsets if pid_offsets is not None else (0,))
+        """Start of every PID in `_data`, and the end of the last one"""
+        self.created: Any = self._column(created)
+        """Creation times, as microseconds since the epoch in an `array`, or
+        as a `datetime64[us]` NumPy array"""
+        self.modified: Any = self._column(modified)
+        """Modification times, like `created`"""
+        if not len(self.created) == len(self.modified) == len(self._offsets) - 1:
+            raise ValueError("The columns of a KnownPidTable must have the same length")
+
+    def _column(self, values: Iterable[int]) -> Any:
+        np = self._np
+        if np is not None and isinstance(values, np.ndarray):
+            return values.astype("datetime64[us]", copy=False)
+        column = values if isinstance(values, array) else array("q", values)
+        if np is None:
+            return column
+        return np.frombuffer(column, dtype=np.int64).view("datetime64[us]")
+
+    @classmethod
+    def from_json(
+        cls, items: Iterable[Dict[str, Any]], use_numpy: Optional[bool] = None
+    ) -> "KnownPidTable":
+        """Build a table from decoded JSON objects of known PIDs, e.g. from
+        `ModelStream.iter_json`.
+
+        :raises ValueError: if an item lacks a property or has an invalid
+          timestamp.
+        """
+        data = bytearray()
+        offsets = array("q", (0,))
+        created = array("q")
+        modified = array("q")
+        convert = timestamp_converter()
+        try:
+            for item in items:
+                data += item["pid"].encode()
+                offsets.append(len(data))
+                created.append(convert(item["created"]))
+                modified.append(convert(item["modified"]))
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError("Not a known PID: %r" % (item,)) from e
+        return cls(bytes(data), offsets, created, modified, use_numpy)
+
+    @classmethod
+    def from_known_pids(
+        cls, known_pids: Iterable[KnownPid], use_numpy: Optional[bool] = None
+    ) -> "KnownPidTable":
+        """Build a table from `KnownPid` models."""
+        return cls.from_rows(
+            ((k.pid, k.created, k.modified) for k in known_pids), use_numpy
+        )
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Tuple[str, Union[datetime, int], Union[datetime, int]]],
+        use_numpy: Optional[bool] = None,
+    ) -> "KnownPidTable":
+        """Build a table from (pid, created, modified) tuples. The times are
+        datetimes or microseconds since the epoch."""
+        data = bytearray()
+        offsets = array("q", (0,))
+        created = array("q")
+        modified = array("q")
+        for pid, created_at, modified_at in rows:
+            data += pid.encode()
+            offsets.append(len(data))
+            created.append(
+                created_at if isinstance(created_at, int) else to_microseconds(created_at)
+            )
+            modified.append(
+                modified_at if isinstance(modified_at, int) else to_microseconds(modified_at)
+            )
+        return cls(bytes(data), offsets, created, modified, use_numpy)
+
+    @classmethod
+    def concat(
+        cls, tables: Iterable["KnownPidTable"], use_numpy: Optional[bool] = None
+    ) -> "KnownPidTable":
+        """Concatenate tables, e.g. of several pages."""
+        data = bytearray()
+        offsets = array("q", (0,))
+        created = array("q")
+        modified = array("q")
+        for table in tables:
+            start = len(data)
+            data += table._data
+            offsets.extend(start + o for o in table._offsets[1:])
+            created.extend(table._microseconds(table.created))
+            modified.extend(table._microseconds(table.modified))
+        return cls(bytes(data), offsets, created, modified, use_numpy)
+
+    @property
+    def uses_numpy(self) -> bool:
+        """Whether the timestamps are NumPy arrays."""
+        return self._np is not None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def pid(self, index: int) -> str:
+        """PID of a row."""
+        if index < 0:
+            index += len(self)
+        offsets = self._offsets
+        return self._data[offsets[index]:offsets[index + 1]].decode()
+
+    @property
+    def pids(self) -> List[str]:
+        """All PIDs, in the order of the rows."""
+        data = self._data
+        offsets = self._offsets
+        return [data[offsets[i]:offsets[i + 1]].decode() for i in range(len(self))]
+
+    def _microseconds(self, column: Any) -> array:  # type: ignore[type-arg]
+        if self._np is None:
+            return column  # type: ignore[no-any-return]
+        return array("q", column.view(self._np.int64).tobytes())
+
+    def _at(self, column: Any, index: int) -> datetime:
+        value = column[index]
+        if self._np is not None:
+            value = value.astype(self._np.int64)
+        return from_microseconds(int(value))
+
+    def __getitem__(self, index: int) -> KnownPid:
+        return construct(
+            KnownPid,
+            pid=self.pid(index),
+            created=self._at(self.created, index),
+            modified=self._at(self.modified, index),
+        )
+
+    def __iter__(self) -> Iterator[KnownPid]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def rows(self) -> Iterator[Tuple[str, datetime, datetime]]:
+        """Iterate over (pid, created, modified) tuples."""
+        created = self._microseconds(self.created)
+        modified = self._microseconds(self.modified)
+        for index, pid in enumerate(self.pids):
+            yield pid, from_microseconds(created[index]), from_microseconds(modified[index])
+
+    def to_known_pids(self) -> List[KnownPid]:
+        """Build a `KnownPid` per row, without validation."""
+        return list(self)
+
+    def take(self, indices: Iterable[int]) -> "KnownPidTable":
+        """Table of the given rows, in the given order."""
+        if self._np is not None:
+            order = self._np.asarray(indices, dtype=self._np.intp)
+            positions: List[int] = order.tolist()
+            created: Any = self.created[order]
+            modified: Any = self.modified[order]
+        else:
+            positions = list(indices)
+            created = array("q", [self.created[i] for i in positions])
+            modified = array("q", [self.modified[i] for i in positions])
+        data = self._data
+        offsets = self._offsets
+        pids = [data[offsets[i]:offsets[i + 1]] for i in positions]
+        return KnownPidTable(
+            b"".join(pids),
+            array("q", accumulate((len(p) for p in pids), initial=0)),
+            created,
+            modified,
+            self._np is not None,
+        )
+
+    def select(self, mask: Iterable[bool]) -> "KnownPidTable":
+        """Table of the rows where `mask` is true, e.g. a NumPy boolean array."""
+        if self._np is not None:
+            return self.take(self._np.flatnonzero(self._np.asarray(mask, dtype=bool)))
+        return self.take(i for i, keep in enumerate(mask) if keep)
+
+    def mask(
+        self,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None,
+    ) -> Any:
+        """Rows within the given time windows, as a NumPy boolean array or a
+        list of bools. The bounds are inclusive, like those of `find_all`, so
+        a table filtered like the request it was filled from keeps all rows."""
+        bounds = (
+            (self.created, created_after, created_before),
+            (self.modified, modified_after, modified_before),
+        )
+        np = self._np
+        if np is not None:
+            result = np.ones(len(self), dtype=bool)
+            for column, low, high in bounds:
+                if low is not None:
+                    result &= column >= np.datetime64(to_microseconds(low), "us")
+                if high is not None:
+                    result &= column <= np.datetime64(to_microseconds(high), "us")
+            return result
+        keep = [True] * len(self)
+        for column, low, high in bounds:
+            if low is None and high is None:
+                continue
+            lo = to_microseconds(low) if low is not None else -(1 << 63)
+            hi = to_microseconds(high) if high is not None else (1 << 63) - 1
+            keep = [k and lo <= value <= hi for k, value in zip(keep, column)]
+        return keep
+
+    def filter(
+        self,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None,
+    ) -> "KnownPidTable":
+        """Table of the rows within the given time windows, see `mask`."""
+        return self.select(
+            self.mask(created_after, created_before, modified_after, modified_before)
+        )
+
+    def sort(self, by: str = "pid", descending: bool = False) -> "KnownPidTable":
+        """Table sorted by "pid", "created" or "modified". The sort is stable."""
+        if by not in _SORT_KEYS:
+            raise ValueError("Cannot sort by %r, expected one of %s" % (by, ", ".join(_SORT_KEYS)))
+        np = self._np
+        if np is None:
+            keys: Any = self.pids if by == "pid" else getattr(self, by)
+            return self.take(sorted(range(len(self)), key=keys.__getitem__, reverse=descending))
+        if by == "pid":
+            pids = np.asarray(self.pids)
+            if not descending:
+                return self.take(np.argsort(pids, kind="stable"))
+            # sorting the reversed column and reversing the result keeps
+            # equal PIDs in their order
+            return self.take(len(self) - 1 - np.argsort(pids[::-1], kind="stable")[::-1])
+        times = getattr(self, by).view(np.int64)
+        return self.take(np.argsort(-times if descending else times, kind="stable"))
+
+    def isin(self, pids: Union["KnownPidTable", Iterable[str]]) -> Any:
+        """Rows whose PID is in `pids`, as a NumPy boolean array or a list of
+        bools."""
+        others = pids.pids if isinstance(pids, KnownPidTable) else list(pids)
+        if self._np is not None:
+            return self._np.isin(
+                self._np.asarray(self.pids, dtype=object), self._np.asarray(others, dtype=object)
+            )
+        contained = set(others)
+        return [pid in contained for pid in self.pids]
+
+    def intersection(self, other: Union["KnownPidTable", Iterable[str]]) -> "KnownPidTable":
+        """Rows of this table whose PID is in `other`."""
+        return self.select(self.isin(other))
+
+    def difference(self, other: Union["KnownPidTable", Iterable[str]]) -> "KnownPidTable":
+        """Rows of this table whose PID is not in `other`."""
+        mask = self.isin(other)
+        return self.select(~mask if self._np is not None else [not c for c in mask])
+
+    def union(self, other: "KnownPidTable") -> "KnownPidTable":
+        """Rows of this table, followed by the rows of `other` with a PID not
+        in this table."""
+        return KnownPidTable.concat(
+            (self, other.difference(self)), use_numpy=self._np is not None
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, KnownPidTable):
+            return NotImplemented
+        return (
+            self._data == other._data
+            and self._offsets == other._offsets
+            and self._microseconds(self.created) == other._microseconds(other.created)
+            and self._microseconds(self.modified) == other._microseconds(other.modified)
+        )
+
+    def __repr__(self) -> str:
+        return "<KnownPidTable of %d known PIDs%s>" % (
+            len(self), " (NumPy)" if self._np is not None else ""
+        )
@@ -0,0 +1,75 @@
+"""Fast parsing of the ISO-8601 timestamps in responses.
+
+Listings of known PIDs carry two timestamps per PID, and PIDs created or
+modified together share them. `parse_datetime` keeps recently parsed
+timestamps in a cache, parses the formats emitted by the server with
+`datetime.fromisoformat`, and falls back to `dateutil` for other forms
+only: first to its ISO-8601 parser, then to `dateutil.parser.parse`, which
+the generated client uses.
+"""
+
+import re
+from datetime import datetime
+from typing import Dict
+
+CACHE_SIZE = 1 << 16
+"""Number of distinct timestamps kept; the cache is emptied when full"""
+
+_cache: Dict[str, datetime] = {}
+
+# the forms `datetime.fromisoformat` accepts from Python 3.11 on only
+_ISO_TIMESTAMP = re.compile(
+    r"(\d{4}-\d\d-\d\d[T ]\d\d:\d\d(?::\d\d)?)(?:[.,](\d+))?(Z|[+-]\d\d(?::?\d\d)?)?",
+    re.ASCII,
+)
+
+
+def _normalized(value: str) -> str:
+    """Rewrite the timestamp `value` into a form that
+    `datetime.fromisoformat` accepts on all Python versions."""
+    match = _ISO_TIMESTAMP.fullmatch(value)
+    if match is None:
+        return value
+    base, fraction, offset = match.groups()
+    if fraction:
+        base += "." + fraction[:6].ljust(6, "0")
+    if offset == "Z":
+        base += "+00:00"
+    elif offset:
+        base += offset[:3] + ":" + (offset[-2:] if len(offset) > 3 else "00")
+    return base
+
+
+def _parse(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(_normalized(value))
+    except ValueError:
+        pass
+    # imported here, dateutil is slow to import
+    from dateutil.parser import isoparse, parse
+    try:
+        return isoparse(value)
+    except ValueError:
+        return parse(value)
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parse a timestamp, usually in ISO-8601 form.
+
+    Equal strings give the same (immutable) `datetime` instance while they
+    are in the cache.
+
+    :raises ValueError: if `value` is no timestamp `dateutil` understands.
+    """
+    parsed = _cache.get(value)
+    if parsed is not None:
+        return parsed
+    parsed = _parse(value)
+    if len(_cache) >= CACHE_SIZE:
+        _cache.clear()
+    _cache[value] = parsed
+    return parsed
@@ -0,0 +1,211 @@
+"""Transports below `pytypid.rest.RESTClientObject`.
+
+By default, clients send requests through urllib3 connection pools shared
+per configuration (`pytypid.rest.SharedTransport`). The configuration can
+change how these pools connect: `unix_socket` reaches a local sidecar proxy
+through a Unix domain socket instead of TCP loopback, and `http2` speaks
+HTTP/2 to HTTPS servers. A `Transport` given as `transport` in the
+configuration replaces the pools completely, e.g. a `WSGITransport` which
+calls a stub application in-process.
+
+Everything from `ApiClient.call_api` upwards works the same on all
+transports.
+"""
+
+import abc
+import io
+import socket
+import sys
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Type
+from urllib.parse import unquote, urlsplit
+
+import urllib3
+from urllib3._request_methods import RequestMethods
+from urllib3.connection import HTTPConnection
+
+from .metrics import TransportMetrics
+
+WSGIApplication = Callable[[Dict[str, Any], Callable[..., Any]], Iterable[bytes]]
+
+
+class Transport(RequestMethods, abc.ABC):
+    """Base class of custom transports.
+
+    A transport takes the place of the urllib3 pool manager of a client:
+    subclasses implement `urlopen` and return a urllib3 response. Transports
+    are shared by the clients using them, also when their configuration is
+    copied, and closed by their owner.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.metrics = TransportMetrics()
+
+    @property
+    def pool_manager(self) -> RequestMethods:
+        return self
+
+    @abc.abstractmethod
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Any] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        encode_multipart: bool = True,
+        multipart_boundary: Optional[str] = None,
+        **kw: Any,
+    ) -> urllib3.BaseHTTPResponse:
+        """Send a request and return its response, like
+        `urllib3.PoolManager.urlopen`."""
+
+    def close(self) -> None:
+        """Release the resources of the transport."""
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "Transport":
+        return self
+
+
+class WSGITransport(Transport):
+    """Transport calling a WSGI application in-process, without any socket,
+    e.g. a `pytypid.stub.StubService`.
+
+    :param app: The WSGI application.
+    """
+
+    def __init__(self, app: WSGIApplication) -> None:
+        super().__init__()
+        self.app = app
+
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Any] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        encode_multipart: bool = True,
+        multipart_boundary: Optional[str] = None,
+        **kw: Any,
+    ) -> urllib3.BaseHTTPResponse:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        status, response_headers, content = call_wsgi(
+            self.app, wsgi_environ(method, url, headers or {}, body or b"")
+        )
+        return urllib3.HTTPResponse(
+            body=io.BytesIO(content),
+            headers=urllib3.HTTPHeaderDict(response_headers),
+            status=status,
+            reason=HTTPStatus(status).phrase,
+            preload_content=kw.get("preload_content", True),
+            decode_content=kw.get("decode_content", True),
+            request_method=method,
+            request_url=url,
+        )
+
+
+def wsgi_environ(
+    method: str, url: str, headers: Mapping[str, str], body: bytes
+) -> Dict[str, Any]:
+    """Build the WSGI environment of a request."""
+    parts = urlsplit(url)
+    environ: Dict[str, Any] = {
+        "REQUEST_METHOD": method.upper(),
+        "SCRIPT_NAME": "",
+        # WSGI passes the path as latin-1 decoded bytes
+        "PATH_INFO": unquote(parts.path, "latin-1"),
+        "QUERY_STRING": parts.query,
+        "SERVER_NAME": parts.hostname or "localhost",
+        "SERVER_PORT": str(parts.port or (443 if parts.scheme == "https" else 80)),
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": parts.scheme or "http",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in headers.items():
+        key = name.upper().replace("-", "_")
+        if key == "CONTENT_TYPE":
+            environ[key] = value
+        elif key != "CONTENT_LENGTH":
+            environ["HTTP_" + key] = value
+    return environ
+
+
+def call_wsgi(
+    app: WSGIApplication, environ: Dict[str, Any]
+) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """Call a WSGI application.
+
+    :return: Status, headers and body of the response.
+    """
+    started: List[Any] = []
+
+    def start_response(
+        status: str, headers: List[Tuple[str, str]], exc_info: Any = None
+    ) -> Callable[[bytes], None]:
+        started[:] = [status, headers]
+        return chunks.append
+
+    chunks: List[bytes] = []
+    result = app(environ, start_response)
+    try:
+        chunks.extend(result)
+    finally:
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+    status, headers = started
+    return int(status.split(" ", 1)[0]), headers, b"".join(chunks)
+
+
+class UnixSocketConnection(HTTPConnection):
+    """Connection to a Unix domain socket instead of a TCP port.
+
+    Only used as a base in `unix_socket_connection_class`, which sets
+    `socket_path`. The host of the URL is still sent in the Host header.
+    """
+
+    socket_path: str
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            if isinstance(self.timeout, (int, float)):
+                sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise urllib3.exceptions.NewConnectionError(
+                self, "Failed to connect to %s: %s" % (self.socket_path, e)
+            ) from e
+        return sock
+
+
+def unix_socket_connection_class(
+    connection_cls: Type[HTTPConnection], socket_path: str
+) -> Type[HTTPConnection]:
+    """Derive a variant of `connection_cls` that connects to `socket_path`.
+    TLS, if any, is established on top of the socket."""
+    return type(
+        "Unix" + connection_cls.__name__,
+        (UnixSocketConnection, connection_cls),
+        {"socket_path": socket_path},
+    )
+
+
+def http2_connection_class() -> Type[HTTPConnection]:
+    """Return urllib3's (experimental) HTTP/2 connection class.
+
+    :raises ImportError: if the `h2` package is not installed.
+    """
+    try:
+        from urllib3.http2.connection import HTTP2Connection
+    except ImportError as e:
+        raise ImportError("HTTP/2 needs the 'h2' package: %s" % e) from e
+    return HTTP2Connection
@@ -0,0 +1,234 @@
+"""Updating PID records only where they changed.
+
+Every `update_pid` makes the service validate the whole record against its
+profile, also if nothing changed. `reconcile_records` compares the desired
+records with the current ones first, and only updates the records that
+differ::
+
+    results = reconcile_records(api, desired, cache=cache)
+    updated = [result.pid for result in results if result.status == "updated"]
+
+Records are compared per key, regardless of the order of the entries; an
+entry is its value and name. The current records are taken from `cache`,
+any mutable mapping from PID to record, or fetched if missing there.
+
+`update_records` changes records by a function instead, without losing
+concurrent updates: each record is fetched with its ETag and sent back with
+``If-Match``, so that the service rejects the update if the record changed
+in between. The record is then fetched and changed again::
+
+    def add_license(record):
+        record.entries[LICENSE] = [PIDRecordEntry(key=LICENSE, value=url)]
+        return record
+
+    results = update_records(api, add_license, pids)
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any, Callable, Dict, Iterable, List, MutableMapping, NamedTuple, Optional, Tuple,
+)
+
+import urllib3
+
+from pytypid_generated_client.exceptions import ApiException
+from pytypid_generated_client.models import PIDRecord, PIDRecordEntry
+
+from .api import PIDManagementApi
+from .construct import construct
+
+# statuses of update_pid telling that the record changed since it was fetched
+_CONFLICTS = (409, 412)
+
+# errors of a request failing a single record instead of the whole batch
+_REQUEST_ERRORS = (ApiException, OSError, urllib3.exceptions.HTTPError)
+
+UNCHANGED = "unchanged"
+UPDATED = "updated"
+FAILED = "failed"
+
+
+class RecordDiff(NamedTuple):
+    """Entries to add to and remove from a record, by key."""
+
+    added: Dict[str, List[PIDRecordEntry]]
+    removed: Dict[str, List[PIDRecordEntry]]
+
+    @property
+    def changed(self) -> bool:
+        """Whether the records differ."""
+        return bool(self.added or self.removed)
+
+
+class UpdateResult(NamedTuple):
+    """Outcome of updating one record."""
+
+    pid: str
+    status: str
+    """`UNCHANGED`, `UPDATED` or `FAILED`"""
+    diff: Optional[RecordDiff]
+    """Changes from the current record, None if it could not be fetched"""
+    record: Optional[PIDRecord]
+    """The record as stored by the service, None on failure"""
+    error: Optional[Exception] = None
+    """`ApiException` of a failed request, or another error, e.g. of the
+    mutator of `update_records`"""
+    attempts: int = 1
+    """Number of times the record was fetched"""
+
+
+def _entries(record: PIDRecord) -> Dict[str, "Counter[Tuple[Optional[str], Optional[str]]]"]:
+    return {
+        key: Counter((entry.value, entry.name) for entry in entries)
+        for key, entries in (record.entries or {}).items()
+        if entries
+    }
+
+
+def _entry(key: str, value: Optional[str], name: Optional[str]) -> PIDRecordEntry:
+    if name is None:
+        return construct(PIDRecordEntry, key=key, value=value)
+    return construct(PIDRecordEntry, key=key, name=name, value=value)
+
+
+def diff_records(current: PIDRecord, desired: PIDRecord) -> RecordDiff:
+    """Changes turning `current` into `desired`. The order of entries does
+    not matter; repeated entries count."""
+    before, after = _entries(current), _entries(desired)
+    added: Dict[str, List[PIDRecordEntry]] = {}
+    removed: Dict[str, List[PIDRecordEntry]] = {}
+    for key in dict.fromkeys([*before, *after]):
+        old, new = before.get(key, Counter()), after.get(key, Counter())
+        for target, difference in ((added, new - old), (removed, old - new)):
+            if difference:
+                target[key] = [
+                    _entry(key, value, name)
+                    for (value, name), count in difference.items()
+                    for _ in range(count)
+                ]
+    return RecordDiff(added, removed)
+
+
+def reconcile_records(
+    api: PIDManagementApi,
+    records: Iterable[PIDRecord],
+    cache: Optional[MutableMapping[str, PIDRecord]] = None,
+    workers: int = 8,
+    dryrun: bool = False,
+    **kwargs: Any,
+) -> List[UpdateResult]:
+    """Bring the records of the service to the state of `records`, updating
+    only the ones that differ.
+
+    :param records: Desired records, with their PIDs.
+    :param cache: Current records by PID, used instead of fetching them and
+      updated with the stored records. A stale cache makes records be
+      skipped or updated wrongly.
+    :param workers: Number of records fetched or updated in parallel.
+    :param dryrun: If true, only validate the updates.
+    :param kwargs: `_request_timeout` or `_headers` of the requests.
+    :return: A result per record, in the order of `records`; records whose
+      requests failed, also for transport errors, carry the error.
+    :raises ValueError: if a record has no PID.
+    """
+    records = list(records)
+    if any(not record.pid for record in records):
+        raise ValueError("Every record needs a PID")
+
+    def reconcile(desired: PIDRecord) -> UpdateResult:
+        pid = str(desired.pid)
+        try:
+            current = cache.get(pid) if cache is not None else None
+            if current is None:
+                current = api.get_pid_record(pid, **kwargs)
+                if cache is not None:
+                    cache[pid] = current
+        except _REQUEST_ERRORS as e:
+            return UpdateResult(pid, FAILED, None, None, e)
+        diff = diff_records(current, desired)
+        if not diff.changed:
+            return UpdateResult(pid, UNCHANGED, diff, current)
+        try:
+            stored = api.update_pid_record(pid, desired, dryrun or None, **kwargs)
+        except _REQUEST_ERRORS as e:
+            return UpdateResult(pid, FAILED, diff, None, e)
+        if cache is not None and not dryrun:
+            cache[pid] = stored
+        return UpdateResult(pid, UPDATED, diff, stored)
+
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(reconcile, records))
+
+
+def update_records(
+    api: PIDManagementApi,
+    mutator: Callable[[PIDRecord], PIDRecord],
+    pids: Iterable[str],
+    attempts: int = 5,
+    workers: int = 8,
+    dryrun: bool = False,
+    **kwargs: Any,
+) -> List[UpdateResult]:
+    """Change the records of `pids` by `mutator`, with optimistic locking.
+
+    Records `mutator` does not change are not updated. If the service
+    reports a conflict (status 409 or 412), the record is fetched and
+    changed again, up to `attempts` times in all. Records without ETag are
+    not updated, as the update could overwrite a concurrent one, and fail
+    with a `ValueError`. Errors raised by `mutator`, and transport errors
+    of the requests, fail the record too.
+
+    :param mutator: Function returning the desired record for the current
+      one. It may change and return the record given to it, and is called
+      again for each attempt.
+    :param attempts: Maximum number of times a record is fetched.
+    :param workers: Number of records updated in parallel.
+    :param dryrun: If true, only validate the updates.
+    :param kwargs: `_request_timeout` or `_headers` of the requests; the
+      headers are sent along with ``If-Match``.
+    :return: A result per PID, in the order of `pids`; failed updates carry
+      the error of the last attempt.
+    """
+    if attempts < 1:
+        raise ValueError("attempts must be positive")
+    headers = dict(kwargs.pop("_headers", None) or {})
+
+    def update(pid: str) -> UpdateResult:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = api.get_pid_record_with_http_info(
+                    pid, _headers=headers or None, **kwargs
+                )
+            except _REQUEST_ERRORS as e:
+                return UpdateResult(pid, FAILED, None, None, e, attempt)
+            current = response.data
+            try:
+                desired = mutator(current.model_copy(deep=True))
+            except Exception as e:
+                return UpdateResult(pid, FAILED, None, None, e, attempt)
+            diff = diff_records(current, desired)
+            if not diff.changed:
+                return UpdateResult(pid, UNCHANGED, diff, current, None, attempt)
+            etag = (response.headers or {}).get("ETag")
+            if not etag:
+                error = ValueError("The record of %s has no ETag" % pid)
+                return UpdateResult(pid, FAILED, diff, None, error, attempt)
+            try:
+                stored = api.update_pid_record(
+                    pid, desired, dryrun or None,
+                    _headers=dict(headers, **{"If-Match": etag}), **kwargs,
+                )
+            except _REQUEST_ERRORS as e:
+                if (
+                    isinstance(e, ApiException) and e.status in _CONFLICTS
+                    and attempt < attempts
+                ):
+                    continue
+                return UpdateResult(pid, FAILED, diff, None, e, attempt)
+            return UpdateResult(pid, UPDATED, diff, stored, None, attempt)
+
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(update, pids))
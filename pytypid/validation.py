@@ -0,0 +1,182 @@
+"""Dry-run validation of PID records, remembered by record content.
+
+Validating a record with `create_pid(dryrun=True)` costs a round trip and
+a full validation by the service. Records often only differ in their PID,
+so `ValidationCache` remembers the outcome by `record_hash`, which ignores
+the PID and the order of keys and entries, and by the profiles the record
+claims::
+
+    cache = ValidationCache(ttl=600)
+    errors = cache.validate_many(api, records)
+
+Only outcomes that depend on the record are kept: success, and rejections
+as invalid (status 400 or 422). Other errors are raised and not kept.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pytypid_generated_client.exceptions import ApiException
+
+from .api import PIDManagementApi
+from .record import AnyRecord, CompactRecord, to_records
+
+PROFILE_KEY = "21.T11148/076759916209e5d62bd5"
+"""Key of the Kernel Information Profile entry, in the default
+configuration of the Typed PID Maker"""
+
+# statuses of a dry run telling that the record itself is invalid
+_INVALID = (400, 422)
+
+CacheKey = Tuple[Tuple[str, ...], str]
+
+
+def record_hash(record: AnyRecord, include_pid: bool = False) -> str:
+    """Hash of the content of a record, the same for any order of its keys
+    and entries.
+
+    :param include_pid: If False, records differing only in the PID have
+      the same hash.
+    """
+    compact = CompactRecord.from_model(record)
+    names = compact.names or (None,) * len(compact.keys)
+    # None sorts before any string, and differs from ""
+    entries = sorted(
+        (key, value is not None, value or "", name is not None, name or "")
+        for key, value, name in zip(compact.keys, compact.values, names)
+    )
+    content = json.dumps(
+        [compact.pid if include_pid else None, entries], separators=(",", ":")
+    )
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ValidationCache:
+    """Outcomes of dry runs of `create_pid`, by record content and profile.
+
+    Thread-safe.
+
+    :param ttl: Seconds an outcome is used for.
+    :param max_size: Number of outcomes kept; the oldest are dropped first.
+    :param profile_keys: Keys of the entries naming the profiles of a
+      record.
+    :param clock: Function returning the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_size: int = 100_000,
+        profile_keys: Sequence[str] = (PROFILE_KEY,),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.profile_keys = frozenset(profile_keys)
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._outcomes: "OrderedDict[CacheKey, Tuple[float, Optional[ApiException]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def key(self, record: AnyRecord) -> CacheKey:
+        """Profiles and content hash of a record."""
+        compact = CompactRecord.from_model(record)
+        profiles = sorted({
+            value for key, value in compact if key in self.profile_keys and value
+        })
+        return tuple(profiles), record_hash(compact)
+
+    def __len__(self) -> int:
+        return len(self._outcomes)
+
+    def get(self, key: CacheKey) -> Tuple[bool, Optional[ApiException]]:
+        """Whether an outcome is known for `key`, and the outcome: None if
+        the record is valid, else the error."""
+        with self._lock:
+            found = self._outcomes.get(key)
+            if found is not None and found[0] > self.clock():
+                self.hits += 1
+                return True, found[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: CacheKey, outcome: Optional[ApiException]) -> None:
+        """Remember the outcome of validating a record."""
+        with self._lock:
+            self._outcomes.pop(key, None)
+            self._outcomes[key] = (self.clock() + self.ttl, outcome)
+            while len(self._outcomes) > self.max_size:
+                self._outcomes.popitem(last=False)
+
+    def invalidate(self, profile: Optional[str] = None) -> None:
+        """Forget the outcomes for records of `profile`, e.g. after it
+        changed, or all outcomes if None."""
+        with self._lock:
+            if profile is None:
+                self._outcomes.clear()
+                return
+            for key in [key for key in self._outcomes if profile in key[0]]:
+                del self._outcomes[key]
+
+    def validate(
+        self, api: PIDManagementApi, record: AnyRecord, **kwargs: Any
+    ) -> Optional[ApiException]:
+        """Validate a record, unless an equivalent one was validated before.
+
+        :param kwargs: Further arguments of `create_pid`.
+        :return: None if the record is valid, else the error.
+        :raises ApiException: if the service failed for other reasons.
+        """
+        key = self.key(record)
+        known, outcome = self.get(key)
+        if known:
+            return outcome
+        return self._validate(api, key, record, kwargs)
+
+    def validate_many(
+        self, api: PIDManagementApi, records: Iterable[AnyRecord], workers: int = 8,
+        **kwargs: Any,
+    ) -> List[Optional[ApiException]]:
+        """Validate records, each distinct content once, in parallel.
+
+        :return: For each record in input order, None if it is valid, or the
+          error.
+        """
+        records = list(records)
+        keys = [self.key(record) for record in records]
+        outcomes: Dict[CacheKey, Optional[ApiException]] = {}
+        pending: Dict[CacheKey, AnyRecord] = {}
+        for key, record in zip(keys, records):
+            if key in outcomes or key in pending:
+                continue
+            known, outcome = self.get(key)
+            if known:
+                outcomes[key] = outcome
+            else:
+                pending[key] = record
+        with ThreadPoolExecutor(workers) as executor:
+            outcomes.update(zip(pending, executor.map(
+                lambda item: self._validate(api, item[0], item[1], kwargs), pending.items()
+            )))
+        return [outcomes[key] for key in keys]
+
+    def _validate(
+        self, api: PIDManagementApi, key: CacheKey, record: AnyRecord, kwargs: Dict[str, Any]
+    ) -> Optional[ApiException]:
+        try:
+            api.create_pid(to_records([record])[0], dryrun=True, **kwargs)
+            outcome = None
+        except ApiException as e:
+            if e.status not in _INVALID:
+                raise
+            outcome = e
+        self.put(key, outcome)
+        return outcome
@@ -0,0 +1,162 @@
+"""Watching the known PIDs of a service for changes.
+
+The service has no push channel, so `KnownPidWatcher` polls `find_all` for
+the PIDs modified since the newest modification seen (the watermark) and
+reports every creation or modification once::
+
+    for known_pid in watch_known_pids(api, cursor="watch.json"):
+        print(known_pid.pid, known_pid.modified)
+
+The poll interval follows the changes: it is divided by `backoff` after a
+poll that found changes, down to `min_interval`, and multiplied by it after
+an idle one, up to `max_interval`. Like `KnownPidMirror`, each poll starts
+`overlap` before the watermark to catch modifications committed late; the
+changes already reported in that overlap are remembered and skipped.
+
+With a `cursor` file, the watermark and the changes in the overlap are saved
+once the changes of a poll have been handled, and a restarted watcher
+continues from there. Changes handled just before a crash may be reported
+again, but none are lost.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator, List, Optional, Set, Tuple, Union
+
+from pytypid_generated_client.models import KnownPid
+
+from .api import PIDManagementApi
+from .construct import construct
+from .mirror import Row, modified_pages
+from .table import from_microseconds, to_microseconds
+
+
+class KnownPidWatcher:
+    """Polls a service for created and modified known PIDs.
+
+    :param api: API of the service.
+    :param cursor: Path of a file to keep the position in, or None to start
+      anew each time.
+    :param start: Report changes from this time on, now by default. Ignored
+      when continuing from a cursor file.
+    :param page_size: Known PIDs requested at once.
+    :param overlap: How far before the watermark a poll starts.
+    :param min_interval: Shortest time between polls, in seconds.
+    :param max_interval: Longest time between polls, in seconds.
+    :param backoff: Factor the interval changes by after each poll.
+    :raises ValueError: if the cursor belongs to another service.
+    """
+
+    def __init__(
+        self,
+        api: PIDManagementApi,
+        cursor: Union[str, "os.PathLike[str]", None] = None,
+        start: Optional[datetime] = None,
+        page_size: int = 1000,
+        overlap: timedelta = timedelta(seconds=10),
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
+        backoff: float = 2.0,
+    ) -> None:
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+        if not 0 <= min_interval <= max_interval:
+            raise ValueError("min_interval must be between 0 and max_interval")
+        if backoff < 1:
+            raise ValueError("backoff must be at least 1")
+        self.api = api
+        self.cursor = cursor
+        self.page_size = page_size
+        self.overlap = overlap
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        """Seconds until the next poll"""
+        self.host = str(api.api_client.configuration.host)
+        self._stopped = threading.Event()
+        self._seen: Set[Tuple[str, int]] = set()
+        if cursor is not None and os.path.exists(cursor):
+            with open(cursor, encoding="utf-8") as file:
+                state = json.load(file)
+            if state["host"] != self.host:
+                raise ValueError("The cursor watches %s, not %s" % (state["host"], self.host))
+            self._watermark = int(state["watermark"])
+            self._seen = {(pid, modified) for pid, modified in state["seen"]}
+        else:
+            self._watermark = to_microseconds(start or datetime.now(timezone.utc))
+
+    @property
+    def watermark(self) -> datetime:
+        """Newest modification time seen."""
+        return from_microseconds(self._watermark)
+
+    def poll(self, **kwargs: Any) -> List[KnownPid]:
+        """Fetch the changes since the last poll and adapt the interval.
+
+        :param kwargs: Further arguments of `find_all`, e.g. `_request_timeout`.
+        :return: The known PIDs created or modified since, without validation,
+          ordered by modification time.
+        """
+        since = self._watermark - self.overlap // timedelta(microseconds=1)
+        changes: List[Row] = []
+        for rows in modified_pages(self.api, since, self.page_size, **kwargs):
+            for row in rows:
+                key = (row[0], row[2])
+                if key not in self._seen:
+                    self._seen.add(key)
+                    changes.append(row)
+            if rows:
+                self._watermark = max(self._watermark, rows[-1][2])
+        # only the overlap of the next poll can bring a change again
+        horizon = self._watermark - self.overlap // timedelta(microseconds=1)
+        self._seen = {key for key in self._seen if key[1] >= horizon}
+        if changes:
+            self.interval = max(self.min_interval, self.interval / self.backoff)
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return [
+            construct(
+                KnownPid, pid=pid, created=from_microseconds(created),
+                modified=from_microseconds(modified),
+            )
+            for pid, created, modified in changes
+        ]
+
+    def save(self) -> None:
+        """Write the position to the cursor file, if any."""
+        if self.cursor is None:
+            return
+        state = {"host": self.host, "watermark": self._watermark, "seen": sorted(self._seen)}
+        temporary = "%s.tmp" % os.fspath(self.cursor)
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(temporary, self.cursor)
+
+    def __iter__(self) -> Iterator[KnownPid]:
+        """Poll until `stop` is called, yielding the changes. The position is
+        saved after the last change of each poll has been taken."""
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            yield from self.poll()
+            self.save()
+            self._stopped.wait(self.interval)
+
+    def run(self, callback: Callable[[KnownPid], Any]) -> None:
+        """Poll until `stop` is called, passing each change to `callback`."""
+        for known_pid in self:
+            callback(known_pid)
+
+    def stop(self) -> None:
+        """Stop watching after the current poll, also from another thread."""
+        self._stopped.set()
+
+
+def watch_known_pids(api: PIDManagementApi, **kwargs: Any) -> Iterator[KnownPid]:
+    """Created and modified known PIDs of a service, as they come.
+
+    :param kwargs: Arguments of `KnownPidWatcher`.
+    """
+    return iter(KnownPidWatcher(api, **kwargs))
@@ -42,29 +42,69 @@ __all__ = [
     "TabulatorPaginationFormatKnownPid",
 ]
 
-# import apis into sdk package
-from pytypid_generated_client.api.actuator_api import ActuatorApi as ActuatorApi
-from pytypid_generated_client.api.pid_management_api import PIDManagementApi as PIDManagementApi
+# import the members lazily, on first access, so that importing one
+# module does not import (and build) all of them
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
-# import ApiClient
-from pytypid_generated_client.api_response import ApiResponse as ApiResponse
-from pytypid_generated_client.api_client import ApiClient as ApiClient
-from pytypid_generated_client.configuration import Configuration as Configuration
-from pytypid_generated_client.exceptions import OpenApiException as OpenApiException
-from pytypid_generated_client.exceptions import ApiTypeError as ApiTypeError
-from pytypid_generated_client.exceptions import ApiValueError as ApiValueError
-from pytypid_generated_client.exceptions import ApiKeyError as ApiKeyError
-from pytypid_generated_client.exceptions import ApiAttributeError as ApiAttributeError
-from pytypid_generated_client.exceptions import ApiException as ApiException
+if TYPE_CHECKING:
+    from pytypid_generated_client.api.actuator_api import ActuatorApi as ActuatorApi
+    from pytypid_generated_client.api.pid_management_api import PIDManagementApi as PIDManagementApi
+    from pytypid_generated_client.api_response import ApiResponse as ApiResponse
+    from pytypid_generated_client.api_client import ApiClient as ApiClient
+    from pytypid_generated_client.configuration import Configuration as Configuration
+    from pytypid_generated_client.exceptions import OpenApiException as OpenApiException
+    from pytypid_generated_client.exceptions import ApiTypeError as ApiTypeError
+    from pytypid_generated_client.exceptions import ApiValueError as ApiValueError
+    from pytypid_generated_client.exceptions import ApiKeyError as ApiKeyError
+    from pytypid_generated_client.exceptions import ApiAttributeError as ApiAttributeError
+    from pytypid_generated_client.exceptions import ApiException as ApiException
+    from pytypid_generated_client.models.batch_record_response import BatchRecordResponse as BatchRecordResponse
+    from pytypid_generated_client.models.find_all200_response import FindAll200Response as FindAll200Response
+    from pytypid_generated_client.models.known_pid import KnownPid as KnownPid
+    from pytypid_generated_client.models.link import Link as Link
+    from pytypid_generated_client.models.pid_record import PIDRecord as PIDRecord
+    from pytypid_generated_client.models.pid_record_entry import PIDRecordEntry as PIDRecordEntry
+    from pytypid_generated_client.models.simple_pair import SimplePair as SimplePair
+    from pytypid_generated_client.models.simple_pid_record import SimplePidRecord as SimplePidRecord
+    from pytypid_generated_client.models.tabulator_pagination_format import TabulatorPaginationFormat as TabulatorPaginationFormat
+    from pytypid_generated_client.models.tabulator_pagination_format_known_pid import TabulatorPaginationFormatKnownPid as TabulatorPaginationFormatKnownPid
 
-# import models into sdk package
-from pytypid_generated_client.models.batch_record_response import BatchRecordResponse as BatchRecordResponse
-from pytypid_generated_client.models.find_all200_response import FindAll200Response as FindAll200Response
-from pytypid_generated_client.models.known_pid import KnownPid as KnownPid
-from pytypid_generated_client.models.link import Link as Link
-from pytypid_generated_client.models.pid_record import PIDRecord as PIDRecord
-from pytypid_generated_client.models.pid_record_entry import PIDRecordEntry as PIDRecordEntry
-from pytypid_generated_client.models.simple_pair import SimplePair as SimplePair
-from pytypid_generated_client.models.simple_pid_record import SimplePidRecord as SimplePidRecord
-from pytypid_generated_client.models.tabulator_pagination_format import TabulatorPaginationFormat as TabulatorPaginationFormat
-from pytypid_generated_client.models.tabulator_pagination_format_known_pid import TabulatorPaginationFormatKnownPid as TabulatorPaginationFormatKnownPid
+_LAZY_IMPORTS = {
+    "ActuatorApi": "pytypid_generated_client.api.actuator_api",
+    "PIDManagementApi": "pytypid_generated_client.api.pid_management_api",
+    "ApiResponse": "pytypid_generated_client.api_response",
+    "ApiClient": "pytypid_generated_client.api_client",
+    "Configuration": "pytypid_generated_client.configuration",
+    "OpenApiException": "pytypid_generated_client.exceptions",
+    "ApiTypeError": "pytypid_generated_client.exceptions",
+    "ApiValueError": "pytypid_generated_client.exceptions",
+    "ApiKeyError": "pytypid_generated_client.exceptions",
+    "ApiAttributeError": "pytypid_generated_client.exceptions",
+    "ApiException": "pytypid_generated_client.exceptions",
+    "BatchRecordResponse": "pytypid_generated_client.models.batch_record_response",
+    "FindAll200Response": "pytypid_generated_client.models.find_all200_response",
+    "KnownPid": "pytypid_generated_client.models.known_pid",
+    "Link": "pytypid_generated_client.models.link",
+    "PIDRecord": "pytypid_generated_client.models.pid_record",
+    "PIDRecordEntry": "pytypid_generated_client.models.pid_record_entry",
+    "SimplePair": "pytypid_generated_client.models.simple_pair",
+    "SimplePidRecord": "pytypid_generated_client.models.simple_pid_record",
+    "TabulatorPaginationFormat": "pytypid_generated_client.models.tabulator_pagination_format",
+    "TabulatorPaginationFormatKnownPid": "pytypid_generated_client.models.tabulator_pagination_format_known_pid",
+}
+
+
+def __getattr__(name: str) -> Any:
+    # import the module defining `name` on first access only
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name)) from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
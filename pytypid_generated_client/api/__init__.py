@@ -1,6 +1,30 @@
 # flake8: noqa
 
-# import apis into api package
-from pytypid_generated_client.api.actuator_api import ActuatorApi
-from pytypid_generated_client.api.pid_management_api import PIDManagementApi
+# import the members lazily, on first access, so that importing one
+# module does not import (and build) all of them
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
+if TYPE_CHECKING:
+    from pytypid_generated_client.api.actuator_api import ActuatorApi
+    from pytypid_generated_client.api.pid_management_api import PIDManagementApi
+
+_LAZY_IMPORTS = {
+    "ActuatorApi": "pytypid_generated_client.api.actuator_api",
+    "PIDManagementApi": "pytypid_generated_client.api.pid_management_api",
+}
+
+
+def __getattr__(name: str) -> Any:
+    # import the module defining `name` on first access only
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name)) from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -12,7 +12,7 @@
 
 
 import warnings
-from pydantic import validate_call, Field, StrictFloat, StrictStr, StrictInt
+from pydantic import ConfigDict, validate_call, Field, StrictFloat, StrictStr, StrictInt
 from typing import Any, Dict, List, Optional, Tuple, Union
 from typing_extensions import Annotated
 
@@ -23,6 +23,9 @@ from pytypid_generated_client.api_client import ApiClient, RequestSerialized
 from pytypid_generated_client.api_response import ApiResponse
 from pytypid_generated_client.rest import RESTResponseType
 
+# build the validators of the methods on their first call, not on import
+_DEFERRED = ConfigDict(defer_build=True)
+
 
 class ActuatorApi:
     """NOTE: This class is auto generated by OpenAPI Generator
@@ -37,7 +40,7 @@ class ActuatorApi:
         self.api_client = api_client
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def health(
         self,
         _request_timeout: Union[
@@ -100,7 +103,7 @@ class ActuatorApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def health_with_http_info(
         self,
         _request_timeout: Union[
@@ -163,7 +166,7 @@ class ActuatorApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def health_without_preload_content(
         self,
         _request_timeout: Union[
@@ -285,7 +288,7 @@ class ActuatorApi:
 
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def info(
         self,
         _request_timeout: Union[
@@ -348,7 +351,7 @@ class ActuatorApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def info_with_http_info(
         self,
         _request_timeout: Union[
@@ -411,7 +414,7 @@ class ActuatorApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def info_without_preload_content(
         self,
         _request_timeout: Union[
@@ -533,7 +536,7 @@ class ActuatorApi:
 
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def links(
         self,
         _request_timeout: Union[
@@ -596,7 +599,7 @@ class ActuatorApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def links_with_http_info(
         self,
         _request_timeout: Union[
@@ -659,7 +662,7 @@ class ActuatorApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def links_without_preload_content(
         self,
         _request_timeout: Union[
@@ -12,7 +12,7 @@
 
 
 import warnings
-from pydantic import validate_call, Field, StrictFloat, StrictStr, StrictInt
+from pydantic import ConfigDict, validate_call, Field, StrictFloat, StrictStr, StrictInt
 from typing import Any, Dict, List, Optional, Tuple, Union
 from typing_extensions import Annotated
 
@@ -28,6 +28,9 @@ from pytypid_generated_client.api_client import ApiClient, RequestSerialized
 from pytypid_generated_client.api_response import ApiResponse
 from pytypid_generated_client.rest import RESTResponseType
 
+# build the validators of the methods on their first call, not on import
+_DEFERRED = ConfigDict(defer_build=True)
+
 
 class PIDManagementApi:
     """NOTE: This class is auto generated by OpenAPI Generator
@@ -42,7 +45,7 @@ class PIDManagementApi:
         self.api_client = api_client
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def create_pid(
         self,
         pid_record: Annotated[PIDRecord, Field(description="The body containing all PID record values as they should be in the new PIDs record.")],
@@ -119,7 +122,7 @@ class PIDManagementApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def create_pid_with_http_info(
         self,
         pid_record: Annotated[PIDRecord, Field(description="The body containing all PID record values as they should be in the new PIDs record.")],
@@ -196,7 +199,7 @@ class PIDManagementApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def create_pid_without_preload_content(
         self,
         pid_record: Annotated[PIDRecord, Field(description="The body containing all PID record values as they should be in the new PIDs record.")],
@@ -352,7 +355,7 @@ class PIDManagementApi:
 
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def create_pids(
         self,
         pid_record: Annotated[List[PIDRecord], Field(description="The body containing a list of all PID record values as they should be in the new PID records. To connect records, the PID fields must be specified. This placeholder PID value may then be used in the value fields of other PID Record entries. During creation, these placeholder PIDs whose sole purpose is to connect records will be overwritten with actual, resolvable PIDs as defined by the PID generator strategy.")],
@@ -429,7 +432,7 @@ class PIDManagementApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def create_pids_with_http_info(
         self,
         pid_record: Annotated[List[PIDRecord], Field(description="The body containing a list of all PID record values as they should be in the new PID records. To connect records, the PID fields must be specified. This placeholder PID value may then be used in the value fields of other PID Record entries. During creation, these placeholder PIDs whose sole purpose is to connect records will be overwritten with actual, resolvable PIDs as defined by the PID generator strategy.")],
@@ -506,7 +509,7 @@ class PIDManagementApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def create_pids_without_preload_content(
         self,
         pid_record: Annotated[List[PIDRecord], Field(description="The body containing a list of all PID record values as they should be in the new PID records. To connect records, the PID fields must be specified. This placeholder PID value may then be used in the value fields of other PID Record entries. During creation, these placeholder PIDs whose sole purpose is to connect records will be overwritten with actual, resolvable PIDs as defined by the PID generator strategy.")],
@@ -661,7 +664,7 @@ class PIDManagementApi:
 
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def find_all(
         self,
         created_after: Annotated[Optional[datetime], Field(description="The UTC time of the earliest creation timestamp of a returned PID.")] = None,
@@ -758,7 +761,7 @@ class PIDManagementApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def find_all_with_http_info(
         self,
         created_after: Annotated[Optional[datetime], Field(description="The UTC time of the earliest creation timestamp of a returned PID.")] = None,
@@ -855,7 +858,7 @@ class PIDManagementApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def find_all_without_preload_content(
         self,
         created_after: Annotated[Optional[datetime], Field(description="The UTC time of the earliest creation timestamp of a returned PID.")] = None,
@@ -1085,7 +1088,7 @@ class PIDManagementApi:
 
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def find_by_pid(
         self,
         _request_timeout: Union[
@@ -1151,7 +1154,7 @@ class PIDManagementApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def find_by_pid_with_http_info(
         self,
         _request_timeout: Union[
@@ -1217,7 +1220,7 @@ class PIDManagementApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def find_by_pid_without_preload_content(
         self,
         _request_timeout: Union[
@@ -1340,7 +1343,7 @@ class PIDManagementApi:
 
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def get_record(
         self,
         validation: Annotated[Optional[StrictBool], Field(description="If true, validation will be run on the resolved PID. On failure, an error will be returned. On success, the PID will be resolved.")] = None,
@@ -1411,7 +1414,7 @@ class PIDManagementApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def get_record_with_http_info(
         self,
         validation: Annotated[Optional[StrictBool], Field(description="If true, validation will be run on the resolved PID. On failure, an error will be returned. On success, the PID will be resolved.")] = None,
@@ -1482,7 +1485,7 @@ class PIDManagementApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def get_record_without_preload_content(
         self,
         validation: Annotated[Optional[StrictBool], Field(description="If true, validation will be run on the resolved PID. On failure, an error will be returned. On success, the PID will be resolved.")] = None,
@@ -1615,7 +1618,7 @@ class PIDManagementApi:
 
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def update_pid(
         self,
         pid_record: Annotated[PIDRecord, Field(description="The body containing all PID record values as they should be after the update.")],
@@ -1693,7 +1696,7 @@ class PIDManagementApi:
         ).data
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def update_pid_with_http_info(
         self,
         pid_record: Annotated[PIDRecord, Field(description="The body containing all PID record values as they should be after the update.")],
@@ -1771,7 +1774,7 @@ class PIDManagementApi:
         )
 
 
-    @validate_call
+    @validate_call(config=_DEFERRED)
     def update_pid_without_preload_content(
         self,
         pid_record: Annotated[PIDRecord, Field(description="The body containing all PID record values as they should be after the update.")],
@@ -13,7 +13,6 @@
 
 
 import datetime
-from dateutil.parser import parse
 from enum import Enum
 import decimal
 import json
@@ -746,6 +745,7 @@ class ApiClient:
         :return: date.
         """
         try:
+            from dateutil.parser import parse
             return parse(string).date()
         except ImportError:
             return string
@@ -764,6 +764,7 @@ class ApiClient:
         :return: datetime.
         """
         try:
+            from dateutil.parser import parse
             return parse(string)
         except ImportError:
             return string
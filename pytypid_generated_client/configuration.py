@@ -15,7 +15,6 @@ import copy
 import http.client as httplib
 import logging
 from logging import FileHandler
-import multiprocessing
 import sys
 from typing import Any, ClassVar, Dict, List, Literal, Optional, TypedDict, Union
 from typing_extensions import NotRequired, Self
@@ -306,7 +305,11 @@ class Configuration:
            Set this to the SNI value expected by the server.
         """
 
-        self.connection_pool_maxsize = connection_pool_maxsize if connection_pool_maxsize is not None else multiprocessing.cpu_count() * 5
+        if connection_pool_maxsize is None:
+            # imported here, multiprocessing is slow to import
+            import multiprocessing
+            connection_pool_maxsize = multiprocessing.cpu_count() * 5
+        self.connection_pool_maxsize = connection_pool_maxsize
         """urllib3 connection pool's maximum number of connections saved
            per pool. None in the constructor is coerced to cpu_count * 5.
         """
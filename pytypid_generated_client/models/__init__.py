@@ -13,15 +13,47 @@
     Do not edit the class manually.
 """  # noqa: E501
 
-# import models into model package
-from pytypid_generated_client.models.batch_record_response import BatchRecordResponse
-from pytypid_generated_client.models.find_all200_response import FindAll200Response
-from pytypid_generated_client.models.known_pid import KnownPid
-from pytypid_generated_client.models.link import Link
-from pytypid_generated_client.models.pid_record import PIDRecord
-from pytypid_generated_client.models.pid_record_entry import PIDRecordEntry
-from pytypid_generated_client.models.simple_pair import SimplePair
-from pytypid_generated_client.models.simple_pid_record import SimplePidRecord
-from pytypid_generated_client.models.tabulator_pagination_format import TabulatorPaginationFormat
-from pytypid_generated_client.models.tabulator_pagination_format_known_pid import TabulatorPaginationFormatKnownPid
+# import the members lazily, on first access, so that importing one
+# module does not import (and build) all of them
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
+if TYPE_CHECKING:
+    from pytypid_generated_client.models.batch_record_response import BatchRecordResponse
+    from pytypid_generated_client.models.find_all200_response import FindAll200Response
+    from pytypid_generated_client.models.known_pid import KnownPid
+    from pytypid_generated_client.models.link import Link
+    from pytypid_generated_client.models.pid_record import PIDRecord
+    from pytypid_generated_client.models.pid_record_entry import PIDRecordEntry
+    from pytypid_generated_client.models.simple_pair import SimplePair
+    from pytypid_generated_client.models.simple_pid_record import SimplePidRecord
+    from pytypid_generated_client.models.tabulator_pagination_format import TabulatorPaginationFormat
+    from pytypid_generated_client.models.tabulator_pagination_format_known_pid import TabulatorPaginationFormatKnownPid
+
+_LAZY_IMPORTS = {
+    "BatchRecordResponse": "pytypid_generated_client.models.batch_record_response",
+    "FindAll200Response": "pytypid_generated_client.models.find_all200_response",
+    "KnownPid": "pytypid_generated_client.models.known_pid",
+    "Link": "pytypid_generated_client.models.link",
+    "PIDRecord": "pytypid_generated_client.models.pid_record",
+    "PIDRecordEntry": "pytypid_generated_client.models.pid_record_entry",
+    "SimplePair": "pytypid_generated_client.models.simple_pair",
+    "SimplePidRecord": "pytypid_generated_client.models.simple_pid_record",
+    "TabulatorPaginationFormat": "pytypid_generated_client.models.tabulator_pagination_format",
+    "TabulatorPaginationFormatKnownPid": "pytypid_generated_client.models.tabulator_pagination_format_known_pid",
+}
+
+
+def __getattr__(name: str) -> Any:
+    # import the module defining `name` on first access only
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name)) from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -40,6 +40,7 @@ class FindAll200Response(BaseModel):
     model_config = ConfigDict(
         validate_assignment=True,
         protected_namespaces=(),
+        defer_build=True,
     )
 
 
@@ -41,6 +41,7 @@ class KnownPid(BaseModel):
         validate_by_alias=True,
         validate_assignment=True,
         protected_namespaces=(),
+        defer_build=True,
     )
 
 
@@ -44,6 +44,7 @@ class Link(BaseModel):
         validate_by_alias=True,
         validate_assignment=True,
         protected_namespaces=(),
+        defer_build=True,
     )
 
 
@@ -39,6 +39,7 @@ class PIDRecord(BaseModel):
         validate_by_alias=True,
         validate_assignment=True,
         protected_namespaces=(),
+        defer_build=True,
     )
 
 
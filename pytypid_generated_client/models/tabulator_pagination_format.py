@@ -38,6 +38,7 @@ class TabulatorPaginationFormat(BaseModel):
         validate_by_alias=True,
         validate_assignment=True,
         protected_namespaces=(),
+        defer_build=True,
     )
 
 
@@ -0,0 +1,83 @@
+"""Clients of an in-process `StubService`, for hand-written tests that need
+neither a running Typed PID Maker instance nor a local server."""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from urllib3.exceptions import MaxRetryError
+
+from pytypid import ApiClient, CompactRecord, Configuration, PIDManagementApi
+from pytypid.rest import transports
+from pytypid.stub import StubService
+from pytypid.transport import WSGIApplication, WSGITransport
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+class Clock:
+    """Settable clock of a `StubService`, starting at a fixed time."""
+
+    def __init__(self) -> None:
+        self.now = datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+def stub_client(app: WSGIApplication, host: str = "http://stub.invalid") -> ApiClient:
+    """Return a client sending its requests to the WSGI application `app`."""
+    return ApiClient(Configuration(host=host, transport=WSGITransport(app)))
+
+
+class StubTestCase(unittest.TestCase):
+    """Test case whose `api` talks to `service` through `app`.
+
+    Requests for paths ending in `broken` fail with a transport error.
+    """
+
+    broken: Optional[str] = None
+
+    def setUp(self) -> None:
+        self.service = self.stub_service()
+        self.client = stub_client(self.app)
+        self.api = PIDManagementApi(self.client)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        transports.clear()
+
+    def stub_service(self) -> StubService:
+        return StubService()
+
+    def app(self, environ: Dict[str, Any], start_response: Any) -> Iterable[bytes]:
+        """Pass a request on to `service`; override to observe or alter it."""
+        if self.broken and environ["PATH_INFO"].endswith(self.broken):
+            pool: Any = None
+            raise MaxRetryError(pool, environ["PATH_INFO"], ConnectionRefusedError())
+        return self.service(environ, start_response)
+
+
+class KnownPidTestCase(StubTestCase):
+    """`StubTestCase` with a `clock` for the times of the known PIDs."""
+
+    def setUp(self) -> None:
+        self.clock = Clock()
+        super().setUp()
+
+    def stub_service(self) -> StubService:
+        return StubService(clock=self.clock)
+
+    def create(self, count: int) -> List[str]:
+        """Create `count` records and return their PIDs."""
+        records = [
+            CompactRecord("p%d" % i, [KEY], ["value"]).to_record() for i in range(count)
+        ]
+        mapping = self.api.create_pids(records).mapping or {}
+        return list(mapping.values())
+
+    def update(self, pid: str) -> None:
+        self.api.update_pid_record(pid, CompactRecord(pid, [KEY], ["new"]).to_record())
@@ -0,0 +1,91 @@
+"""Minimal local HTTP server for hand-written tests that must not depend on a
+running Typed PID Maker instance."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+from types import TracebackType
+from typing import Dict, List, NamedTuple, Optional, Type, Union
+
+from pytypid.stub import StubService
+from pytypid.transport import call_wsgi, wsgi_environ
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+class _Server(ThreadingHTTPServer):
+    requests: List[Request]
+    app: StubService
+
+
+class _UnixServer(ThreadingUnixStreamServer):
+    requests: List[Request]
+    app: StubService
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: Union[_Server, _UnixServer]
+
+    def handle_request(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        headers = dict(self.headers)
+        self.server.requests.append(Request(self.command, self.path, headers, body))
+        status, response_headers, content = call_wsgi(
+            self.server.app,
+            wsgi_environ(self.command, "http://localhost" + self.path, headers, body),
+        )
+        self.send_response(status)
+        for name, value in response_headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = handle_request
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class StubServer:
+    """Serves a `pytypid.stub.StubService` on a random local port, or on the
+    Unix domain socket `unix_socket`, with keep-alive. Received requests are
+    kept in `requests`."""
+
+    def __init__(
+        self, compress_responses: bool = False, unix_socket: Optional[str] = None
+    ) -> None:
+        self.app = StubService(compress_responses=compress_responses)
+        self.server: Union[_Server, _UnixServer]
+        if unix_socket is None:
+            self.server = _Server(("127.0.0.1", 0), _Handler)
+            self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+        else:
+            self.server = _UnixServer(unix_socket, _Handler)
+            self.url = "http://localhost"
+        self.server.daemon_threads = True
+        self.server.requests = []
+        self.server.app = self.app
+        self.requests = self.server.requests
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.server.shutdown()
+        self.server.server_close()
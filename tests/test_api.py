@@ -0,0 +1,99 @@
+# coding: utf-8
+
+import unittest
+
+from pytypid import ApiClient, Configuration, PIDManagementApi, SimpleRecord
+from pytypid.api import unvalidated
+from pytypid.rest import transports
+from pytypid_generated_client.api.actuator_api import ActuatorApi
+from pytypid_generated_client.exceptions import ApiException, NotFoundException
+from pytypid_generated_client.models import PIDRecord, PIDRecordEntry
+
+from stub_server import StubServer
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+class TestFastApi(unittest.TestCase):
+    """API methods without argument validation"""
+
+    def setUp(self) -> None:
+        self.server = StubServer().__enter__()
+        self.api = PIDManagementApi(ApiClient(Configuration(host=self.server.url)))
+        simple = SimpleRecord.from_dict({"pid": "a", "record": [{"key": KEY, "value": "b"}]})
+        assert simple is not None
+        self.record = simple.to_record()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        transports.clear()
+
+    def test_same_request(self) -> None:
+        validated = self.api.create_pid(pid_record=self.record, dryrun=True)
+        fast = self.api.fast.create_pid(pid_record=self.record, dryrun=True)
+
+        assert isinstance(fast, PIDRecord)
+        assert fast.to_dict()["entries"] == validated.to_dict()["entries"]
+        first, second = self.server.requests
+        assert first == second
+        assert first.path == "/api/v1/pit/pid/?dryrun=true"
+
+    def test_same_batch_request(self) -> None:
+        self.api.create_pids(pid_record=[self.record, self.record], _headers={"X-A": "1"})
+        self.api.fast.create_pids(pid_record=[self.record, self.record], _headers={"X-A": "1"})
+
+        first, second = self.server.requests
+        assert first == second
+
+    def test_fast_class(self) -> None:
+        fast_cls = unvalidated(ActuatorApi)
+
+        assert issubclass(fast_cls, ActuatorApi)
+        assert unvalidated(ActuatorApi) is fast_cls
+        assert not hasattr(fast_cls.health, "__wrapped__")
+        assert self.api.fast is self.api.fast
+
+
+class TestSinglePidMethods(unittest.TestCase):
+    """Reading and updating the record of a given PID"""
+
+    def setUp(self) -> None:
+        self.server = StubServer().__enter__()
+        self.api = PIDManagementApi(ApiClient(Configuration(host=self.server.url)))
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        transports.clear()
+
+    def test_get_and_update(self) -> None:
+        simple = SimpleRecord.from_dict({"pid": "a", "record": [{"key": KEY, "value": "b"}]})
+        assert simple is not None
+        pid = self.api.create_pid(simple.to_record()).pid
+        assert pid is not None
+
+        current = self.api.get_pid_record_with_http_info(pid)
+        record = current.data
+        assert record.pid == pid
+        assert self.server.requests[-1].path == "/api/v1/pit/pid/" + pid
+        etag = (current.headers or {})["ETag"]
+
+        record.entries = {KEY: [PIDRecordEntry(key=KEY, value="c")]}
+        response = self.api.update_pid_record_with_http_info(
+            pid, record, _headers={"If-Match": etag}
+        )
+        assert response.status_code == 200
+        assert self.server.requests[-1].method == "PUT"
+        assert self.server.requests[-1].headers["If-Match"] == etag
+        assert (self.api.get_pid_record(pid).entries or {})[KEY][0].value == "c"
+        # the record changed since
+        with self.assertRaises(ApiException) as raised:
+            self.api.update_pid_record(pid, record, _headers={"If-Match": etag})
+        assert raised.exception.status == 412
+
+    def test_unknown_pid(self) -> None:
+        with self.assertRaises(NotFoundException):
+            self.api.get_pid_record("sandboxed/unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
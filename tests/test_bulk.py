@@ -0,0 +1,120 @@
+# coding: utf-8
+
+import multiprocessing
+import os
+import unittest
+
+from pytypid import CompactRecord, Configuration, SimpleRecord
+from pytypid.bulk import BulkRunner
+from pytypid.codec import decode_records, encode_records
+from pytypid.rest import transports
+from pytypid_generated_client.exceptions import BadRequestException
+from pytypid_generated_client.models import PIDRecord
+
+from stub_server import StubServer
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+def make_record(pid: str, value: str) -> PIDRecord:
+    simple = SimpleRecord.from_dict({
+        "pid": pid, "record": [{"key": KEY, "value": value}]
+    })
+    assert simple is not None
+    return simple.to_record()
+
+
+class TestCodec(unittest.TestCase):
+    """Compact binary form of records"""
+
+    def test_roundtrip(self) -> None:
+        record = PIDRecord.from_dict({
+            "pid": "a",
+            "entries": {
+                KEY: [
+                    {"key": KEY, "name": "name", "value": "1"},
+                    {"key": KEY, "value": "2"},
+                ],
+                "other": [{"key": "other", "value": "3"}],
+            },
+            "extra": {"x": 1},
+        })
+        assert record is not None
+
+        decoded = decode_records(encode_records([record]))
+
+        assert [r.to_dict() for r in decoded] == [record.to_dict()]
+
+    def test_accepts_simple_records(self) -> None:
+        simple = SimpleRecord.from_dict({
+            "pid": "a", "record": [{"key": KEY, "value": "b"}, {"key": KEY, "value": "c"}]
+        })
+        assert simple is not None
+
+        decoded = decode_records(encode_records([simple]))
+
+        assert decoded[0].to_dict() == simple.to_record().to_dict()
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires fork()")
+class TestBulkRunner(unittest.TestCase):
+    """Bulk creation and validation on worker processes"""
+
+    def setUp(self) -> None:
+        self.server = StubServer().__enter__()
+        self.runner = BulkRunner(
+            Configuration(host=self.server.url),
+            max_workers=2,
+            chunk_size=2,
+            mp_context=multiprocessing.get_context("fork"),
+        )
+
+    def tearDown(self) -> None:
+        self.runner.shutdown()
+        self.server.__exit__(None, None, None)
+        transports.clear()
+
+    def test_create_pids_keeps_order(self) -> None:
+        records = [make_record("p%d" % i, "p%d" % (i ^ 1)) for i in range(6)]
+
+        response = self.runner.create_pids(records)
+
+        assert response.pid_records is not None and response.mapping is not None
+        assert len(response.pid_records) == 6
+        assert [r.pid for r in response.pid_records] == [
+            response.mapping["p%d" % i] for i in range(6)
+        ]
+        # records linked within a chunk point at each other's new PIDs
+        first, second = response.pid_records[:2]
+        assert first.entries is not None and second.entries is not None
+        assert first.entries[KEY][0].value == second.pid
+        assert second.entries[KEY][0].value == first.pid
+
+    def test_create_pids_accepts_compact_records(self) -> None:
+        records = [CompactRecord("p%d" % i, [KEY], ["p%d" % (i ^ 1)]) for i in range(4)]
+
+        response = self.runner.create_pids(records)
+
+        assert response.pid_records is not None and response.mapping is not None
+        assert [r.pid for r in response.pid_records] == [
+            response.mapping["p%d" % i] for i in range(4)
+        ]
+        assert response.pid_records[0].to_dict()["entries"][KEY] == [
+            {"key": KEY, "value": response.pid_records[1].pid}
+        ]
+
+    def test_validate_reports_errors_in_order(self) -> None:
+        records = [make_record("a", "b") for _ in range(5)]
+        invalid = PIDRecord.from_dict({"entries": {"invalid": [{"key": "invalid"}]}})
+        assert invalid is not None
+        records.insert(3, invalid)
+
+        errors = self.runner.validate(records)
+
+        assert len(errors) == 6
+        assert [e is None for e in errors] == [True, True, True, False, True, True]
+        assert isinstance(errors[3], BadRequestException)
+
+
+if __name__ == '__main__':
+    unittest.main()
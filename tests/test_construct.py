@@ -0,0 +1,123 @@
+# coding: utf-8
+
+import gc
+import json
+import unittest
+from datetime import datetime, timezone
+from typing import Any, List
+from unittest import mock
+
+from pytypid import ApiClient, Configuration
+from pytypid.construct import from_json_data, gc_paused
+from pytypid.rest import transports
+from pytypid_generated_client.exceptions import ApiValueError
+from pytypid_generated_client.models import BatchRecordResponse, KnownPid
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+KNOWN_PIDS = [
+    {"pid": "a", "created": "2024-05-01T10:00:00Z", "modified": "2024-05-02T10:00:00.5+02:00"},
+    {"pid": "b", "created": "2024-05-01T10:00:00Z", "modified": "2024-05-01T10:00:00Z", "x": 1},
+]
+
+BATCH = {
+    "pidRecords": [
+        {"pid": "a", "entries": {KEY: [{"key": KEY, "name": "n", "value": "b"}]}, "extra": True},
+    ],
+    "mapping": {"tmp": "a"},
+}
+
+
+class TestFromJsonData(unittest.TestCase):
+    """Building models from trusted JSON"""
+
+    def test_matches_from_dict(self) -> None:
+        for check in (False, True):
+            built = from_json_data(BatchRecordResponse, BATCH, check=check)
+            expected = BatchRecordResponse.from_dict(BATCH)
+            assert expected is not None
+
+            assert built.to_dict() == expected.to_dict() == BATCH
+            assert built == expected
+
+    def test_parses_datetimes(self) -> None:
+        known = from_json_data(KnownPid, KNOWN_PIDS[0])
+
+        assert known.created == datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+        assert known.modified.microsecond == 500000
+
+    def test_interning(self) -> None:
+        records = [
+            from_json_data(BatchRecordResponse, json.loads(json.dumps(BATCH)), intern=True)
+            for _ in range(2)
+        ]
+
+        entries = [(r.pid_records or [])[0].entries or {} for r in records]
+        assert next(iter(entries[0])) is next(iter(entries[1]))
+        assert entries[0][KEY][0].key is entries[1][KEY][0].key
+        assert entries[0][KEY][0].value is entries[1][KEY][0].value
+
+    def test_structural_check(self) -> None:
+        data = {"pidRecords": [{"pid": "a", "entries": [KEY]}]}
+
+        with self.assertRaises(ApiValueError):
+            from_json_data(BatchRecordResponse, data, check=True)
+        with self.assertRaises(ApiValueError):
+            from_json_data(KnownPid, {"pid": 1, "created": "", "modified": ""}, check=True)
+
+
+class TestGcPaused(unittest.TestCase):
+    """Pausing the garbage collector on request"""
+
+    def test_pause(self) -> None:
+        with gc_paused(False):
+            assert gc.isenabled()
+        with gc_paused():
+            assert not gc.isenabled()
+        assert gc.isenabled()
+        gc.disable()
+        try:
+            with gc_paused():
+                pass
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
+
+class TestResponseValidation(unittest.TestCase):
+    """Configuration.response_validation"""
+
+    def tearDown(self) -> None:
+        transports.clear()
+
+    def _deserialize(self, validation: str, data: Any, response_type: str) -> Any:
+        client = ApiClient(Configuration(response_validation=validation))
+        return client.deserialize(json.dumps(data), response_type, "application/json")
+
+    def test_modes_agree(self) -> None:
+        results: List[Any] = [
+            self._deserialize(validation, KNOWN_PIDS, "List[KnownPid]")
+            for validation in Configuration.RESPONSE_VALIDATION
+        ]
+
+        full, structural, none = results
+        assert all(isinstance(k, KnownPid) for k in none)
+        assert [k.to_dict() for k in structural] == [k.to_dict() for k in full]
+        assert [k.to_dict() for k in none] == [k.to_dict() for k in full]
+
+    def test_hook(self) -> None:
+        # fails if the generated client stops calling the overridden method
+        with mock.patch.object(
+            ApiClient, "_deserialize_model", autospec=True, side_effect=lambda s, d, k: d
+        ) as hook:
+            result = self._deserialize("none", KNOWN_PIDS, "List[KnownPid]")
+        assert result == KNOWN_PIDS
+        assert hook.call_count == len(KNOWN_PIDS)
+
+    def test_invalid_mode(self) -> None:
+        with self.assertRaises(ValueError):
+            Configuration(response_validation="some")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# coding: utf-8
+
+import unittest
+from typing import Dict, List
+
+import urllib3
+
+from pytypid import CompactRecord
+from pytypid.graph import references, references_with_prefix, resolve_pid_graph
+from pytypid_generated_client.exceptions import ApiException
+from pytypid_generated_client.models import PIDRecord
+
+from stub_client import StubTestCase
+
+NAME = "21.T11148/name"
+LINK = "21.T11148/link"
+is_reference = references_with_prefix("sandboxed/")
+
+
+class TestResolvePidGraph(StubTestCase):
+    """Breadth-first resolution of linked records"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        # root -> a, b; a -> c, root; b -> c, a missing PID; c -> d; d -> c
+        links = {
+            "root": ["a", "b"], "a": ["c", "root"], "b": ["c", "sandboxed/missing"],
+            "c": ["d"], "d": ["c"],
+        }
+        records = [
+            CompactRecord(
+                name, [NAME] + [LINK] * len(targets), [name + " record"] + targets
+            ).to_record()
+            for name, targets in links.items()
+        ]
+        self.pids: Dict[str, str] = self.api.create_pids(records).mapping or {}
+
+    def names(self, pids: List[str]) -> List[str]:
+        names = {pid: name for name, pid in self.pids.items()}
+        return sorted(names.get(pid, pid) for pid in pids)
+
+    def test_resolve(self) -> None:
+        root = self.pids["root"]
+        graph = resolve_pid_graph(self.api, [root, root], is_reference, workers=2)
+        assert self.names(list(graph.records)) == ["a", "b", "c", "d", "root"]
+        assert self.names(graph.edges[root]) == ["a", "b"]
+        assert self.names(graph.edges[self.pids["d"]]) == ["c"]
+        assert graph.depth[self.pids["c"]] == 2
+        assert graph.depth[self.pids["d"]] == 3
+        assert list(graph.errors) == ["sandboxed/missing"]
+        error = graph.errors["sandboxed/missing"]
+        assert isinstance(error, ApiException) and error.status == 404
+        assert graph.unresolved == set()
+        # every PID is requested once
+        assert graph.requests == 6
+
+    def test_transport_error(self) -> None:
+        self.broken = self.pids["b"]
+        graph = resolve_pid_graph(self.api, [self.pids["root"]], is_reference)
+        assert self.names(list(graph.records)) == ["a", "c", "d", "root"]
+        assert isinstance(graph.errors[self.broken], urllib3.exceptions.MaxRetryError)
+
+    def test_limits(self) -> None:
+        root = self.pids["root"]
+        graph = resolve_pid_graph(self.api, [root], is_reference, max_depth=1)
+        assert self.names(list(graph.records)) == ["a", "b", "root"]
+        assert self.names(list(graph.unresolved)) == ["c", "sandboxed/missing"]
+        graph = resolve_pid_graph(self.api, [root], is_reference, max_requests=2)
+        assert self.names(list(graph.records)) == ["a", "root"]
+        assert self.names(list(graph.unresolved)) == ["b", "c"]
+        assert graph.requests == 2
+
+    def test_cache(self) -> None:
+        cache: Dict[str, PIDRecord] = {}
+        roots = [self.pids["c"]]
+        first = resolve_pid_graph(self.api, roots, is_reference, cache=cache)
+        assert first.requests == 2
+        assert sorted(cache) == sorted(first.records)
+        second = resolve_pid_graph(self.api, roots, is_reference, cache=cache)
+        assert second.requests == 0
+        assert second.edges == first.edges
+
+    def test_references(self) -> None:
+        values = ["sandboxed/2", "sandboxed/1", "sandboxed/2", "sandboxed/3"]
+        record = CompactRecord("sandboxed/1", [LINK, LINK, LINK, NAME], values).to_record()
+        assert references(record, is_reference) == ["sandboxed/2", "sandboxed/3"]
+        assert references(record, lambda key, value: key == LINK) == ["sandboxed/2"]
+
+
+if __name__ == '__main__':
+    unittest.main()
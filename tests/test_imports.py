@@ -0,0 +1,66 @@
+# coding: utf-8
+
+import os
+import subprocess
+import sys
+import unittest
+from typing import List
+
+import pytypid
+import pytypid_generated_client
+
+
+def imported_after(statement: str) -> List[str]:
+    """Modules imported by `statement` in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", statement + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return output.split()
+
+
+class TestLazyImports(unittest.TestCase):
+    """Import time of pytypid and the generated client"""
+
+    def test_import_pytypid(self) -> None:
+        modules = imported_after("import pytypid")
+        self.assertNotIn("pydantic", modules)
+        self.assertNotIn("urllib3", modules)
+        self.assertNotIn("pytypid_generated_client", modules)
+
+    def test_import_model(self) -> None:
+        modules = imported_after("from pytypid_generated_client import PIDRecord")
+        self.assertIn("pytypid_generated_client.models.pid_record", modules)
+        self.assertNotIn("pytypid_generated_client.models.known_pid", modules)
+        self.assertNotIn("pytypid_generated_client.api.pid_management_api", modules)
+        self.assertNotIn("pytypid_generated_client.api_client", modules)
+
+    def test_import_client(self) -> None:
+        modules = imported_after("from pytypid import ApiClient, PIDManagementApi")
+        self.assertNotIn("pytypid_generated_client.api.actuator_api", modules)
+        self.assertNotIn("dateutil", modules)
+        self.assertNotIn("multiprocessing", modules)
+        self.assertNotIn("numpy", modules)
+
+    def test_members(self) -> None:
+        for name in pytypid.__all__:
+            self.assertIn(name, dir(pytypid))
+            self.assertIsNotNone(getattr(pytypid, name))
+        for name in pytypid_generated_client.__all__:
+            self.assertIsNotNone(getattr(pytypid_generated_client, name))
+        with self.assertRaises(AttributeError):
+            getattr(pytypid, "missing")
+        with self.assertRaises(AttributeError):
+            getattr(pytypid_generated_client.models, "Missing")
+
+    def test_generated_client_postprocessed(self) -> None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, os.path.join(root, "postprocess_generated.py"), "--check", root],
+            capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# coding: utf-8
+
+import json
+import unittest
+from typing import Any, Dict, List
+
+from pytypid import ApiClient, Configuration, SimpleRecord
+from pytypid.interning import Interner
+from pytypid.rest import transports
+from pytypid_generated_client.models import PIDRecord
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+def fresh(s: str) -> str:
+    """Return a copy of s which is not the same object."""
+    return "".join(list(s))
+
+
+class TestInterner(unittest.TestCase):
+    """Shared keys and values"""
+
+    def test_pair(self) -> None:
+        interner = Interner()
+        key, value = interner.pair(fresh(KEY), fresh("value"))
+
+        assert interner.pair(fresh(KEY), fresh("value")) == (key, value)
+        assert interner.pair(fresh(KEY), fresh("value"))[0] is key
+        assert interner.pair(fresh(KEY), fresh("value"))[1] is value
+        assert interner.value(None) is None
+
+    def test_value_table_is_bounded(self) -> None:
+        interner = Interner(max_values=2, max_value_length=5)
+        long_value = "x" * 6
+
+        assert interner.value(long_value) is long_value
+        interner.value("a")
+        interner.value("b")
+        interner.value("c")
+
+        assert len(interner) == 2
+        assert interner.value(fresh("a")) == "a"
+
+    def test_intern_json(self) -> None:
+        interner = Interner()
+        data: List[Dict[str, Any]] = [
+            {"pid": "p%d" % i, "entries": {fresh(KEY): [{"key": fresh(KEY), "value": fresh("v")}]}}
+            for i in range(2)
+        ]
+
+        interner.intern_json(data)
+
+        first, second = (next(iter(record["entries"])) for record in data)
+        assert first is second
+        assert data[0]["entries"][KEY][0]["key"] is data[1]["entries"][KEY][0]["key"]
+        assert data[0]["entries"][KEY][0]["value"] is data[1]["entries"][KEY][0]["value"]
+
+
+class TestInterningInModels(unittest.TestCase):
+    """Interning when deserializing and converting records"""
+
+    def tearDown(self) -> None:
+        transports.clear()
+
+    def _deserialize(self, configuration: Configuration) -> PIDRecord:
+        client = ApiClient(configuration)
+        text = json.dumps({"pid": "a", "entries": {KEY: [{"key": KEY, "value": "value"}]}})
+        record: PIDRecord = client.deserialize(text, "PIDRecord", "application/json")
+        return record
+
+    def test_responses_share_keys(self) -> None:
+        records = [self._deserialize(Configuration()) for _ in range(2)]
+
+        keys = [next(iter(r.entries or {})) for r in records]
+        entries = [(r.entries or {})[KEY][0] for r in records]
+        assert keys[0] is keys[1]
+        assert entries[0].key is entries[1].key
+        assert entries[0].value is entries[1].value
+
+    def test_interning_can_be_disabled(self) -> None:
+        records = [self._deserialize(Configuration(intern_strings=False)) for _ in range(2)]
+
+        entries = [(r.entries or {})[KEY][0] for r in records]
+        assert entries[0].value is not entries[1].value
+
+    def test_to_record_shares_keys(self) -> None:
+        records = []
+        for _ in range(2):
+            simple = SimpleRecord.from_dict({
+                "pid": "a", "record": [{"key": fresh(KEY), "value": fresh("v")}]
+            })
+            assert simple is not None
+            records.append(simple.to_record())
+
+        first, second = ((r.entries or {})[KEY][0] for r in records)
+        assert first.key is second.key
+        assert first.value is second.value
+
+
+if __name__ == '__main__':
+    unittest.main()
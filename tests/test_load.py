@@ -0,0 +1,98 @@
+# coding: utf-8
+
+import contextlib
+import io
+import json
+import time
+import unittest
+
+from pytypid import ApiClient, Configuration, PIDManagementApi
+from pytypid.histogram import LatencyHistogram
+from pytypid.load import Workload, main, parse_mix, run
+from pytypid.stub import StubService
+from pytypid.transport import WSGITransport
+from pytypid_generated_client.models import PIDRecord
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """HdrHistogram-like latency recording"""
+
+    def test_percentiles(self) -> None:
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        assert histogram.count == 1000
+        assert histogram.max == 1.0
+        for percent, exact in ((50, 0.5), (90, 0.9), (99, 0.99), (100, 1.0)):
+            assert abs(histogram.percentile(percent) - exact) <= exact * 1e-3
+
+    def test_merge(self) -> None:
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.001, count=99)
+        second.record(2.5)
+        first.merge(second)
+
+        assert first.count == 100
+        assert first.percentile(99) < 0.0011
+        assert first.percentile(100) == 2.5
+        with self.assertRaises(ValueError):
+            first.merge(LatencyHistogram(significant_digits=2))
+
+
+class SlowWorkload(Workload):
+    def find_all(self) -> None:
+        time.sleep(0.02)
+
+
+class TestLoad(unittest.TestCase):
+    """Open-loop load generation"""
+
+    def test_parse_mix(self) -> None:
+        assert parse_mix("get_record=3, find_all") == {"get_record": 3.0, "find_all": 1.0}
+        with self.assertRaises(ValueError):
+            parse_mix("delete_pid=1")
+        with self.assertRaises(ValueError):
+            parse_mix("find_all=0")
+
+    def test_queueing_counts_as_latency(self) -> None:
+        api = PIDManagementApi(ApiClient(Configuration(transport=WSGITransport(StubService()))))
+        workload = SlowWorkload(api, PIDRecord(), [])
+
+        # one worker serving 100 requests/s of 20 ms each falls behind
+        report = run(workload, {"find_all": 1}, rate=100, duration=0.2, workers=1)
+
+        summary = report["total"]
+        assert summary["requests"] == 20
+        assert summary["max"] >= 20 * 0.02 - 0.2
+        assert summary["percentiles"]["50"] > 0.05
+
+    def test_cli_against_stub(self) -> None:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["--rate", "200", "--duration", "0.3", "--batch-size", "5", "--json"])
+
+        report = json.loads(output.getvalue())
+        assert status == 0
+        operations = report["operations"]
+        assert set(operations) == {
+            "get_record", "create_pid", "create_pids", "update_pid", "find_all", "fetch_etag"
+        }
+        assert operations["fetch_etag"]["requests"] == operations["update_pid"]["requests"]
+        assert report["total"]["requests"] == 60 + operations["fetch_etag"]["requests"]
+        assert report["total"]["errors"] == {}
+
+    def test_failed_preparation(self) -> None:
+        api = PIDManagementApi(ApiClient(Configuration(transport=WSGITransport(StubService()))))
+        workload = Workload(api, PIDRecord(), ["sandboxed/missing"])
+
+        report = run(workload, {"update_pid": 1}, rate=100, duration=0.1)
+
+        operations = report["operations"]
+        assert operations["fetch_etag"]["errors"] == {"HTTP 404": 10}
+        assert operations["update_pid"]["requests"] == 0
+        assert operations["update_pid"]["errors"] == {}
+
+
+if __name__ == '__main__':
+    unittest.main()
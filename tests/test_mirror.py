@@ -0,0 +1,103 @@
+# coding: utf-8
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable
+
+from pytypid import PIDManagementApi
+from pytypid.mirror import KnownPidMirror, SqliteStore
+
+from stub_client import KnownPidTestCase, stub_client
+
+
+class TestKnownPidMirror(KnownPidTestCase):
+    """Incremental mirroring of the known PIDs"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.finds = 0
+        self.on_find: Callable[[int], None] = lambda finds: None
+
+    def app(self, environ: Dict[str, Any], start_response: Any) -> Iterable[bytes]:
+        if environ["PATH_INFO"].endswith("/known-pid"):
+            self.finds += 1
+            self.on_find(self.finds)
+        return self.service(environ, start_response)
+
+    def test_incremental_sync(self) -> None:
+        pids = self.create(25)
+        self.clock.advance(1)
+        self.create(5)
+        self.clock.advance(600)
+        with KnownPidMirror(self.api, page_size=10, overlap=timedelta(0)) as mirror:
+            assert mirror.watermark is None
+            result = mirror.sync()
+            assert len(mirror) == 30
+            assert result.changed == 30
+            # 25 PIDs share their modification time, so pages continue within it
+            assert result.requests >= 4
+            assert result.watermark == datetime(2024, 5, 1, 10, 0, 1, tzinfo=timezone.utc)
+
+            assert mirror.sync().changed == 0
+            self.update(pids[3])
+            result = mirror.sync()
+            # the PIDs modified at the watermark itself are read again
+            assert (result.fetched, result.changed, result.requests) == (6, 1, 1)
+            known = mirror.get(pids[3])
+            assert known is not None
+            assert known.modified == self.clock.now
+            assert mirror.get("missing") is None
+            assert mirror.table().pids == sorted(mirror.table().pids)
+
+    def test_overlap(self) -> None:
+        self.create(3)
+        self.clock.advance(600)
+        with KnownPidMirror(self.api, overlap=timedelta(seconds=30)) as mirror:
+            mirror.sync()
+            # a modification committed late, with an earlier time than the watermark
+            late = self.create(1)[0]
+            self.service.known_pids[late]["modified"] -= timedelta(seconds=10)
+            result = mirror.sync()
+            assert result.changed == 1
+            assert len(mirror) == 4
+
+    def test_modified_during_scan(self) -> None:
+        pids = []
+        for _ in range(10):
+            pids += self.create(2)
+            self.clock.advance(1)
+
+        def modify(finds: int) -> None:
+            if finds == 2:
+                self.clock.advance(1)
+                self.update(pids[0])
+        self.on_find = modify
+        with KnownPidMirror(self.api, page_size=4) as mirror:
+            mirror.sync()
+            known = mirror.get(pids[0])
+            assert known is not None
+            assert known.modified == self.clock.now
+            assert len(mirror) == 20
+
+    def test_persistence(self) -> None:
+        self.create(5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mirror.sqlite")
+            with KnownPidMirror(self.api, path) as mirror:
+                mirror.sync()
+                watermark = mirror.watermark
+            self.clock.advance(600)
+            self.create(2)
+            with KnownPidMirror(self.api, SqliteStore(path)) as mirror:
+                assert mirror.watermark == watermark
+                assert mirror.sync().changed == 2
+                assert len(mirror) == 7
+            other = PIDManagementApi(stub_client(self.app, "http://other.invalid"))
+            with self.assertRaises(ValueError):
+                KnownPidMirror(other, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
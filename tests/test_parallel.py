@@ -0,0 +1,77 @@
+# coding: utf-8
+
+import multiprocessing
+import os
+import unittest
+from typing import Dict, Tuple
+
+from pytypid import ApiClient, Configuration
+from pytypid.parallel import worker_client, worker_pool
+from pytypid.rest import transports
+
+from stub_server import StubServer
+
+
+def _worker_state(_: int) -> Tuple[int, Dict[str, float]]:
+    client = worker_client()
+    client.rest_client.request("GET", client.configuration.host + "/").read()
+    return os.getpid(), client.metrics.snapshot()
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires fork()")
+class TestForkSafety(unittest.TestCase):
+    """Transports of pytypid clients across fork()"""
+
+    def setUp(self) -> None:
+        self.server = StubServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        transports.clear()
+
+    def test_child_does_not_use_parent_connections(self) -> None:
+        client = ApiClient(Configuration(host=self.server.url))
+        client.rest_client.request("GET", self.server.url + "/").read()
+        parent_pool_manager = client.rest_client.pool_manager
+
+        pid = os.fork()
+        if pid == 0:  # child
+            ok = False
+            try:
+                client.rest_client.request("GET", self.server.url + "/").read()
+                metrics = client.metrics.snapshot()
+                ok = (
+                    client.rest_client.pool_manager is not parent_pool_manager
+                    and metrics["connections_created"] == 1
+                    and metrics["connections_reused"] == 0
+                )
+            finally:
+                os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        # the parent keeps its pool and connection
+        client.rest_client.request("GET", self.server.url + "/").read()
+        assert client.rest_client.pool_manager is parent_pool_manager
+        assert client.metrics["connections_reused"] == 1
+
+    def test_worker_pool_gives_each_worker_a_warm_client(self) -> None:
+        configuration = Configuration(host=self.server.url)
+        with worker_pool(
+            configuration, max_workers=2, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            results = list(pool.map(_worker_state, range(4)))
+
+        assert os.getpid() not in {pid for pid, _ in results}
+        for _, metrics in results:
+            # the connection opened during warm-up serves the requests
+            assert metrics["connections_created"] == 1
+            assert metrics["connections_reused"] >= 1
+
+    def test_worker_client_outside_pool(self) -> None:
+        with self.assertRaises(RuntimeError):
+            worker_client()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# coding: utf-8
+
+import pickle
+import unittest
+
+from pydantic import ValidationError
+
+from pytypid import CompactRecord, SimpleRecord
+from pytypid.construct import construct
+from pytypid.record import to_compact_records, to_records, to_simple_records
+from pytypid_generated_client.models import PIDRecord, PIDRecordEntry, SimplePidRecord
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+class TestCompactRecord(unittest.TestCase):
+    """Compact record representation"""
+
+    def setUp(self) -> None:
+        record = PIDRecord.from_dict({
+            "pid": "a",
+            "entries": {
+                KEY: [
+                    {"key": KEY, "name": "name", "value": "1"},
+                    {"key": KEY, "value": "2"},
+                ],
+                "other": [{"key": "other", "value": "3"}],
+            },
+        })
+        assert record is not None
+        self.record = record
+
+    def test_record_roundtrip(self) -> None:
+        compact = CompactRecord.from_record(self.record)
+
+        assert len(compact) == 3
+        assert list(compact) == [(KEY, "1"), (KEY, "2"), ("other", "3")]
+        assert compact.to_record().to_dict() == self.record.to_dict()
+
+    def test_to_dict_matches_model(self) -> None:
+        compact = CompactRecord.from_record(self.record)
+
+        assert compact.to_dict() == self.record.to_dict()
+        assert CompactRecord.from_dict(compact.to_dict()) == compact
+        with self.assertRaises(TypeError):
+            hash(compact)
+
+    def test_simple_record_roundtrip(self) -> None:
+        simple = SimpleRecord.from_dict({
+            "pid": "a",
+            "record": [{"key": KEY, "value": "b"}, {"value": "no key"}, {"key": KEY}],
+        })
+        assert simple is not None
+
+        compact = CompactRecord.from_model(simple)
+
+        assert compact.names is None
+        assert compact.to_dict() == simple.to_record().to_dict()
+        assert compact.to_simple_record().to_dict() == {
+            "pid": "a", "record": [{"key": KEY, "value": "b"}, {"key": KEY}]
+        }
+
+    def test_keys_are_shared(self) -> None:
+        key = "".join(["other"])
+        first = CompactRecord("a", [key], ["1"])
+        second = CompactRecord.from_record(self.record)
+
+        assert first.keys[0] is second.keys[2]
+        assert pickle.loads(pickle.dumps(first)).keys[0] is first.keys[0]
+
+    def test_lengths_must_match(self) -> None:
+        with self.assertRaises(ValueError):
+            CompactRecord("a", [KEY], [])
+
+
+class TestBatchConversion(unittest.TestCase):
+    """Conversion of record lists"""
+
+    def setUp(self) -> None:
+        simple = SimpleRecord.from_dict({
+            "pid": "s",
+            "record": [
+                {"key": "b", "value": "1"}, {"key": "a", "value": "2"}, {"key": "b", "value": "3"}
+            ],
+        })
+        record = PIDRecord.from_dict({
+            "pid": "r", "entries": {"x": [{"key": "x", "name": "n", "value": "4"}]}
+        })
+        assert simple is not None and record is not None
+        self.simple = simple
+        self.record = record
+        self.compact = CompactRecord("c", ["y"], ["5"])
+
+    def test_to_records(self) -> None:
+        for trusted in (True, False):
+            records = to_records([self.simple, self.record, self.compact], trusted=trusted)
+
+            assert [r.to_dict() for r in records] == [
+                self.simple.to_record().to_dict(),
+                self.record.to_dict(),
+                self.compact.to_record().to_dict(),
+            ]
+            assert list((records[0].entries or {}).keys()) == ["b", "a"]
+            assert records[1] is self.record
+
+    def test_to_simple_records(self) -> None:
+        plain = SimplePidRecord.from_dict({"pid": "p", "record": [{"key": "k", "value": "v"}]})
+        assert plain is not None
+        for trusted in (True, False):
+            records = to_simple_records([self.simple, self.record, plain], trusted=trusted)
+
+            assert all(isinstance(r, SimpleRecord) for r in records)
+            assert records[0] is self.simple
+            assert records[1].to_dict() == {"pid": "r", "record": [{"key": "x", "value": "4"}]}
+            assert records[2].to_dict() == plain.to_dict()
+
+    def test_roundtrip_preserves_order(self) -> None:
+        records = to_records(to_compact_records([self.simple]))
+
+        assert [(p.key, p.value) for p in to_simple_records(records)[0].record or ()] == [
+            ("b", "1"), ("b", "3"), ("a", "2")
+        ]
+
+    def test_untrusted_input_is_validated(self) -> None:
+        compact = CompactRecord("c", ["y"], [5])  # type: ignore[list-item]
+
+        assert len(to_records([compact])) == 1  # not checked
+        with self.assertRaises(ValidationError):
+            to_records([compact], trusted=False)
+
+    def test_construct_matches_model_construct(self) -> None:
+        entry = construct(PIDRecordEntry, key="k", value="v")
+        expected = PIDRecordEntry.model_construct(key="k", value="v")
+
+        assert entry == expected
+        assert entry.model_fields_set == expected.model_fields_set
+        assert entry.to_dict() == {"key": "k", "value": "v"}
+        entry.additional_properties["x"] = 1
+        assert construct(PIDRecordEntry, key="k").additional_properties == {}
+
+
+if __name__ == '__main__':
+    unittest.main()
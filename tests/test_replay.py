@@ -0,0 +1,100 @@
+# coding: utf-8
+
+import io
+import time
+import unittest
+from typing import Any, List
+
+from pytypid import ApiClient, Configuration, PIDManagementApi, SimpleRecord
+from pytypid.replay import RecordingTransport, ReplayTransport, read_exchanges
+from pytypid.rest import SharedTransport, transports
+from pytypid_generated_client.exceptions import ApiException, BadRequestException
+from pytypid_generated_client.models import PIDRecord
+
+from stub_server import StubServer
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+def workload(api: PIDManagementApi) -> List[Any]:
+    records = []
+    for i in range(3):
+        simple = SimpleRecord.from_dict({"pid": "p%d" % i, "record": [{"key": KEY, "value": "v"}]})
+        assert simple is not None
+        records.append(simple.to_record())
+    invalid = PIDRecord.from_dict({"entries": {"invalid": []}})
+    assert invalid is not None
+
+    results: List[Any] = [api.create_pids(records, dryrun=True)]
+    with api.find_all_stream(size=100) as stream:
+        results.append(list(stream))
+    results.append(api.find_all(size=5))
+    try:
+        api.create_pid(invalid)
+    except BadRequestException as e:
+        results.append(e.status)
+    return results
+
+
+class TestRecordReplay(unittest.TestCase):
+    """Recording traffic and replaying it without a server"""
+
+    def setUp(self) -> None:
+        self.recording = io.BytesIO()
+        with StubServer(compress_responses=True) as server:
+            configuration = Configuration(
+                host=server.url, api_key={"api_key": "secret"}, request_compression="gzip",
+                request_compression_threshold=0,
+            )
+            recorder = RecordingTransport(self.recording, SharedTransport(configuration))
+            configuration.transport = recorder
+            with ApiClient(configuration) as client:
+                self.recorded = workload(PIDManagementApi(client))
+            recorder.close()
+
+    def tearDown(self) -> None:
+        transports.clear()
+
+    def test_recording(self) -> None:
+        self.recording.seek(0)
+        exchanges = list(read_exchanges(self.recording))
+
+        assert [(e.method, e.target.split("?")[0], e.status) for e in exchanges] == [
+            ("POST", "/api/v1/pit/pids", 201),
+            ("GET", "/api/v1/pit/known-pid", 200),
+            ("GET", "/api/v1/pit/known-pid", 200),
+            ("POST", "/api/v1/pit/pid/", 400),
+        ]
+        assert all(e.elapsed > 0 for e in exchanges)
+        assert [e.start for e in exchanges] == sorted(e.start for e in exchanges)
+        # bodies are kept as they went over the wire
+        assert dict(exchanges[0].request_headers)["Content-Encoding"] == "gzip"
+        assert dict(exchanges[1].response_headers)["Content-Encoding"] == "gzip"
+
+    def test_replay(self) -> None:
+        self.recording.seek(0)
+        transport = ReplayTransport(self.recording)
+        configuration = Configuration(host="http://replay.invalid", transport=transport)
+        api = PIDManagementApi(ApiClient(configuration))
+
+        assert workload(api) == self.recorded
+        assert transport.remaining == 0
+        with self.assertRaises(ApiException):
+            api.find_all(size=5)
+        transport.rewind()
+        assert workload(api) == self.recorded
+
+    def test_replay_latency(self) -> None:
+        self.recording.seek(0)
+        transport = ReplayTransport(self.recording, latency=1.0)
+        configuration = Configuration(host="http://replay.invalid", transport=transport)
+        api = PIDManagementApi(ApiClient(configuration))
+        recorded = sum(e.elapsed for e in transport.exchanges)
+
+        start = time.perf_counter()
+        workload(api)
+        assert time.perf_counter() - start >= recorded
+
+
+if __name__ == '__main__':
+    unittest.main()
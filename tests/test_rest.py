@@ -0,0 +1,179 @@
+# coding: utf-8
+
+import json
+import unittest
+from typing import Any
+
+from urllib3.exceptions import EmptyPoolError
+
+from pytypid import ApiClient, BatchRecordResponse, Configuration, PIDManagementApi
+from pytypid.encoding import decompress
+from pytypid.rest import SharedTransport, transports
+from pytypid_generated_client.models import PIDRecord, PIDRecordEntry
+
+from stub_server import StubServer
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+class TestRESTClientObject(unittest.TestCase):
+    """Connection pool governance of the pytypid REST client"""
+
+    def setUp(self) -> None:
+        self.server = StubServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+
+    def make_client(self, **kwargs: Any) -> ApiClient:
+        return ApiClient(Configuration(
+            host=self.server.url, connection_pool_maxsize=1, **kwargs
+        ))
+
+    def test_reuses_connections(self) -> None:
+        client = self.make_client()
+        for _ in range(3):
+            client.rest_client.request("GET", self.server.url + "/").read()
+
+        metrics = client.metrics.snapshot()
+        assert metrics["connections_created"] == 1
+        assert metrics["connections_reused"] == 2
+        assert metrics["connections_discarded"] == 0
+        assert metrics["pool_waits"] == 3
+
+    def test_non_blocking_pool_discards_surplus_connections(self) -> None:
+        client = self.make_client()
+        first = client.rest_client.request("GET", self.server.url + "/")
+        second = client.rest_client.request("GET", self.server.url + "/")
+        first.read()
+        second.read()
+
+        metrics = client.metrics.snapshot()
+        assert metrics["connections_created"] == 2
+        assert metrics["connections_discarded"] == 1
+
+    def test_blocking_pool_times_out_when_exhausted(self) -> None:
+        client = self.make_client(
+            connection_pool_block=True, connection_pool_timeout=0.01
+        )
+        held = client.rest_client.request("GET", self.server.url + "/")
+        with self.assertRaises(EmptyPoolError):
+            client.rest_client.request("GET", self.server.url + "/")
+        held.read()
+
+        metrics = client.metrics.snapshot()
+        assert metrics["connections_created"] == 1
+        assert metrics["pool_exhausted"] == 1
+        assert metrics["pool_wait_seconds_max"] >= 0.01
+
+    def test_warm_up_stops_at_the_pool_size(self) -> None:
+        client = self.make_client(connection_pool_block=True)
+        assert client.rest_client.warm_up(self.server.url, connections=3) == 1
+        held = client.rest_client.request("GET", self.server.url + "/")
+        # the only connection is in use: nothing to warm up, no waiting and
+        # no warning
+        with self.assertNoLogs("pytypid.rest"):
+            assert client.rest_client.warm_up(self.server.url, connections=3) == 0
+        held.read()
+        assert client.metrics.snapshot()["connections_created"] == 1
+
+
+class TestTransportRegistry(unittest.TestCase):
+    """Sharing of transports between pytypid API clients"""
+
+    def setUp(self) -> None:
+        self.server = StubServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        transports.clear()
+
+    def test_compatible_clients_share_connections(self) -> None:
+        with ApiClient(Configuration(host=self.server.url)) as first:
+            first.rest_client.request("GET", self.server.url + "/").read()
+        with ApiClient(Configuration(host=self.server.url)) as second:
+            second.rest_client.request("GET", self.server.url + "/").read()
+
+        assert first.rest_client.pool_manager is second.rest_client.pool_manager
+        metrics = second.metrics.snapshot()
+        assert metrics["connections_created"] == 1
+        assert metrics["connections_reused"] == 1
+
+    def test_incompatible_clients_do_not_share(self) -> None:
+        with ApiClient(Configuration(host=self.server.url)) as first, \
+                ApiClient(Configuration(host=self.server.url, proxy="http://proxy")) as second:
+            assert first.rest_client.transport is not second.rest_client.transport
+
+    def test_release_keeps_limited_idle_transports(self) -> None:
+        transports.max_idle = 1
+        try:
+            clients = [
+                ApiClient(Configuration(host="http://host-%d" % i)) for i in range(3)
+            ]
+            assert len(transports) == 3
+            for client in clients:
+                client.close()
+                client.close()
+            assert len(transports) == 1
+        finally:
+            transports.max_idle = 8
+
+    def test_https_transport_shares_ssl_context(self) -> None:
+        transport = SharedTransport(Configuration(host="https://localhost"))
+        pool_kw = transport.pool_manager.connection_pool_kw
+
+        assert transport.ssl_context is not None
+        assert pool_kw["ssl_context"] is transport.ssl_context
+        assert "ca_certs" not in pool_kw
+
+
+class TestRequestCompression(unittest.TestCase):
+    """Compression of JSON request bodies"""
+
+    def setUp(self) -> None:
+        self.server = StubServer().__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        transports.clear()
+
+    def create_pids(self, count: int, **kwargs: Any) -> BatchRecordResponse:
+        records = [
+            PIDRecord(pid="tmp/%d" % i, entries={KEY: [PIDRecordEntry(key=KEY, value="v%d" % i)]})
+            for i in range(count)
+        ]
+        configuration = Configuration(host=self.server.url, **kwargs)
+        with ApiClient(configuration) as client:
+            response = PIDManagementApi(client).create_pids(records, dryrun=True)
+            self.metrics = client.metrics.snapshot()
+        return response
+
+    def test_compresses_large_bodies(self) -> None:
+        for encoding in ("gzip", "deflate"):
+            response = self.create_pids(500, request_compression=encoding)
+
+            request = self.server.requests[-1]
+            assert request.headers["Content-Encoding"] == encoding
+            body = decompress(request.body, encoding)
+            assert len(request.body) * 5 < len(body)
+            assert len(json.loads(body)) == 500
+            assert len(response.pid_records or []) == 500
+            assert self.metrics["request_bytes_uncompressed"] >= len(body)
+            transports.clear()
+
+    def test_small_bodies_are_not_compressed(self) -> None:
+        self.create_pids(2, request_compression="gzip")
+        self.create_pids(500, request_compression="gzip", request_compression_threshold=10**7)
+        self.create_pids(500)
+
+        for request in self.server.requests:
+            assert "Content-Encoding" not in request.headers
+            assert len(json.loads(request.body)) in (2, 500)
+
+    def test_rejects_unknown_encoding(self) -> None:
+        with self.assertRaises(ValueError):
+            Configuration(request_compression="br")
+
+
+if __name__ == '__main__':
+    unittest.main()
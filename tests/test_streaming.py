@@ -0,0 +1,196 @@
+# coding: utf-8
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from typing import Any, Iterator, List
+
+from pytypid import ApiClient, Configuration, PIDManagementApi, SimpleRecord
+from pytypid.rest import transports
+from pytypid.streaming import JsonArrayReader, ResponseBody
+from pytypid_generated_client.exceptions import BadRequestException
+from pytypid_generated_client.models import KnownPid, PIDRecord
+
+from stub_server import StubServer
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+def pieces(data: bytes, size: int) -> Iterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class TestJsonArrayReader(unittest.TestCase):
+    """Incremental decoding of JSON arrays"""
+
+    def test_split_anywhere(self) -> None:
+        items = [{"a": "ü€", "b": [1, 2.5, None, True]}, 12345, "x", [], {}]
+        data = json.dumps(items, ensure_ascii=False, indent=1).encode("utf-8")
+        for size in (1, 2, 3, 7, len(data)):
+            assert list(JsonArrayReader(pieces(data, size))) == items
+
+    def test_nested_array(self) -> None:
+        data = json.dumps({"before": 1, "pidRecords": [{"pid": "a"}, {"pid": "b"}], "after": {}})
+        reader = JsonArrayReader(pieces(data.encode(), 4), ("pidRecords",))
+
+        assert list(reader) == [{"pid": "a"}, {"pid": "b"}]
+        assert reader.members == {"before": 1, "after": {}}
+
+    def test_empty_and_missing(self) -> None:
+        assert list(JsonArrayReader([b" [ ] "])) == []
+        reader = JsonArrayReader([b'{"pidRecords": null}'], ("pidRecords",))
+        assert list(reader) == []
+        assert reader.members == {"pidRecords": None}
+
+    def test_texts(self) -> None:
+        items = [{"a": "q\\\"[{", "b": [1, {"c": "]}"}]}, -1.5e3, "x\\", True, None, []]
+        data = json.dumps(items, indent=1).encode("utf-8")
+        for size in (1, 2, 5, len(data)):
+            texts = list(JsonArrayReader(pieces(data, size)).texts())
+            assert [json.loads(text) for text in texts] == items
+
+    def test_large_member(self) -> None:
+        # a member spread over many chunks is scanned once, not once per chunk
+        mapping = {"placeholder/%d" % i: "sandboxed/%d" % i for i in range(10000)}
+        data = json.dumps({"mapping": mapping, "pidRecords": [{"pid": "a"}]}).encode()
+        reader = JsonArrayReader(pieces(data, 64), ("pidRecords",))
+        assert list(reader) == [{"pid": "a"}]
+        assert reader.members["mapping"] == mapping
+
+    def test_malformed(self) -> None:
+        for data in (b"[1, 2", b"[1 2]", b"{}", b"[1] x", b"[{]", b"[1,]"):
+            with self.assertRaises(json.JSONDecodeError):
+                list(JsonArrayReader(pieces(data, 1)))
+            with self.assertRaises(json.JSONDecodeError):
+                for text in JsonArrayReader(pieces(data, 1)).texts():
+                    json.loads(text)
+
+
+class TestStreamingApi(unittest.TestCase):
+    """Streaming variants of PIDManagementApi methods"""
+
+    def setUp(self) -> None:
+        self.server = StubServer().__enter__()
+        self.client = ApiClient(Configuration(host=self.server.url))
+        self.api = PIDManagementApi(self.client)
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        transports.clear()
+
+    def test_find_all_stream(self) -> None:
+        with self.api.find_all_stream(size=1000, chunk_size=256) as stream:
+            known_pids: List[KnownPid] = list(stream)
+
+        assert [k.pid for k in known_pids] == ["sandboxed/known/%d" % i for i in range(1000)]
+        assert known_pids == self.api.find_all(size=1000)
+        # both requests used the same connection
+        assert self.client.metrics["connections_created"] == 1
+
+    def test_early_close(self) -> None:
+        with self.api.find_all_stream(size=1000, chunk_size=256) as stream:
+            next(iter(stream))
+
+        assert len(self.api.find_all(size=2)) == 2
+        assert self.client.metrics["connections_created"] == 2
+
+    def test_create_pids_stream(self) -> None:
+        records = []
+        for i in range(3):
+            simple = SimpleRecord.from_dict({
+                "pid": "p%d" % i, "record": [{"key": KEY, "value": "p%d" % ((i + 1) % 3)}]
+            })
+            assert simple is not None
+            records.append(simple.to_record())
+
+        stream = self.api.create_pids_stream(records, chunk_size=16)
+        created: List[PIDRecord] = list(stream)
+
+        assert [r.pid for r in created] == [stream.mapping["p%d" % i] for i in range(3)]
+        assert (created[0].entries or {})[KEY][0].value == created[1].pid
+
+    def test_error(self) -> None:
+        invalid = PIDRecord.from_dict({"entries": {"invalid": [{"key": "invalid"}]}})
+        assert invalid is not None
+
+        with self.assertRaises(BadRequestException):
+            self.api.create_pids_stream([invalid])
+
+    def test_export_known_pids(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "known-pids.json")
+
+            written = self.api.export_known_pids(path, size=500, chunk_size=100)
+
+            with open(path, "rb") as file:
+                content = file.read()
+        assert written == len(content)
+        assert [k["pid"] for k in json.loads(content)] == [
+            k.pid for k in self.api.find_all(size=500)
+        ]
+        assert self.client.metrics["connections_created"] == 1
+
+    def test_response_body_chunks(self) -> None:
+        response = self.api.find_all_without_preload_content(size=100)
+        with ResponseBody(response, chunk_size=64) as body:
+            chunks = list(body)
+
+        assert max(len(c) for c in chunks) == 64
+        assert len(json.loads(b"".join(chunks))) == 100
+
+        target = io.BytesIO()
+        response = self.api.find_all_without_preload_content(size=100)
+        ResponseBody(response).write_to(target, chunk_size=10)
+        assert target.getvalue() == b"".join(chunks)
+        assert self.client.metrics["connections_created"] == 1
+
+    def test_export_error(self) -> None:
+        with self.assertRaises(BadRequestException):
+            self.api.export_known_pids(io.BytesIO(), size=-1)
+
+
+class TestCompressedResponses(unittest.TestCase):
+    """Decoding of compressed responses"""
+
+    def setUp(self) -> None:
+        self.server = StubServer(compress_responses=True).__enter__()
+
+    def tearDown(self) -> None:
+        self.server.__exit__(None, None, None)
+        transports.clear()
+
+    def make_api(self, **kwargs: Any) -> PIDManagementApi:
+        return PIDManagementApi(ApiClient(Configuration(host=self.server.url, **kwargs)))
+
+    def test_streams_compressed_response(self) -> None:
+        api = self.make_api()
+        with api.find_all_stream(size=1000, chunk_size=256) as stream:
+            known_pids: List[KnownPid] = list(stream)
+
+        assert "gzip" in self.server.requests[-1].headers["Accept-Encoding"]
+        assert len(known_pids) == 1000
+        assert known_pids == api.find_all(size=1000)
+        metrics = api.api_client.metrics.snapshot()
+        assert metrics["response_bytes_received"] * 5 < metrics["response_bytes_decoded"]
+
+    def test_response_body_is_decoded(self) -> None:
+        api = self.make_api()
+        target = io.BytesIO()
+        api.export_known_pids(target, size=100, chunk_size=64)
+
+        assert len(json.loads(target.getvalue())) == 100
+
+    def test_uncompressed(self) -> None:
+        api = self.make_api(response_compression=False)
+        assert len(api.find_all(size=100)) == 100
+
+        assert "gzip" not in self.server.requests[-1].headers.get("Accept-Encoding", "")
+        metrics = api.api_client.metrics.snapshot()
+        assert metrics["response_bytes_received"] == metrics["response_bytes_decoded"] > 0
+
+
+if __name__ == '__main__':
+    unittest.main()
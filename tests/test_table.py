@@ -0,0 +1,134 @@
+# coding: utf-8
+
+import importlib.util
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pytypid import PIDManagementApi
+from pytypid.rest import transports
+from pytypid.stub import StubService
+from pytypid.table import KnownPidTable, from_microseconds, to_microseconds
+from pytypid_generated_client.models import KnownPid
+
+from stub_client import stub_client
+
+UTC = timezone.utc
+START = datetime(2024, 5, 1, 10, tzinfo=UTC)
+
+
+def make_items(count: int, prefix: str = "pid/") -> List[Dict[str, Any]]:
+    return [
+        {
+            "pid": "%s%d" % (prefix, i),
+            "created": (START + timedelta(minutes=i)).isoformat().replace("+00:00", "Z"),
+            "modified": (START + timedelta(minutes=i % 3)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+class TestArrayTable(unittest.TestCase):
+    """KnownPidTable on the `array` module"""
+
+    use_numpy: Optional[bool] = False
+
+    def make_table(self, count: int = 6, prefix: str = "pid/") -> KnownPidTable:
+        return KnownPidTable.from_json(make_items(count, prefix), use_numpy=self.use_numpy)
+
+    def test_build(self) -> None:
+        table = self.make_table()
+        assert len(table) == 6
+        assert table.uses_numpy == bool(self.use_numpy)
+        assert table.pids == ["pid/%d" % i for i in range(6)]
+        assert table.pid(-1) == "pid/5"
+        known_pid = table[2]
+        assert isinstance(known_pid, KnownPid)
+        assert known_pid.created == START + timedelta(minutes=2)
+        assert known_pid.modified == START + timedelta(minutes=2)
+        rows = list(table.rows())
+        assert rows[4] == ("pid/4", START + timedelta(minutes=4), START + timedelta(minutes=1))
+        again = KnownPidTable.from_known_pids(table.to_known_pids(), use_numpy=self.use_numpy)
+        assert again == table
+        assert len(KnownPidTable(use_numpy=self.use_numpy)) == 0
+        with self.assertRaises(ValueError):
+            KnownPidTable.from_json([{"pid": "a"}], use_numpy=self.use_numpy)
+
+    def test_filter(self) -> None:
+        table = self.make_table()
+        window = table.filter(
+            created_after=START + timedelta(minutes=1), created_before=START + timedelta(minutes=5)
+        )
+        assert window.pids == ["pid/1", "pid/2", "pid/3", "pid/4", "pid/5"]
+        assert table.filter(modified_before=START + timedelta(minutes=1)).pids == [
+            "pid/0", "pid/1", "pid/3", "pid/4"
+        ]
+        assert len(table.filter()) == 6
+        assert table.select([True, False] * 3).pids == ["pid/0", "pid/2", "pid/4"]
+        assert table.take([5, 0]).pids == ["pid/5", "pid/0"]
+
+    def test_sort(self) -> None:
+        table = self.make_table()
+        assert table.sort("created", descending=True).pids[:2] == ["pid/5", "pid/4"]
+        assert table.sort("modified").pids == [
+            "pid/0", "pid/3", "pid/1", "pid/4", "pid/2", "pid/5"
+        ]
+        assert table.sort("modified", descending=True).pids[:2] == ["pid/2", "pid/5"]
+        doubled = KnownPidTable.concat([table, table], use_numpy=self.use_numpy)
+        assert doubled.sort("pid", descending=True).pids[:2] == ["pid/5", "pid/5"]
+        assert doubled.sort("pid").pids[:3] == ["pid/0", "pid/0", "pid/1"]
+        with self.assertRaises(ValueError):
+            table.sort("size")
+
+    def test_set_operations(self) -> None:
+        table = self.make_table()
+        other = KnownPidTable.from_json(
+            make_items(6)[4:] + make_items(2, "new/"), use_numpy=self.use_numpy
+        )
+        assert table.intersection(other).pids == ["pid/4", "pid/5"]
+        assert table.difference(other).pids == ["pid/0", "pid/1", "pid/2", "pid/3"]
+        assert table.difference(["pid/0"]).pids[0] == "pid/1"
+        union = table.union(other)
+        assert union.pids == table.pids + ["new/0", "new/1"]
+        assert list(table.isin(["pid/1"])) == [False, True, False, False, False, False]
+
+    def test_conversions(self) -> None:
+        value = datetime(2024, 5, 1, 12, 0, 0, 123456, tzinfo=timezone(timedelta(hours=2)))
+        assert from_microseconds(to_microseconds(value)) == value
+        assert to_microseconds(datetime(1970, 1, 1, 0, 0, 1)) == 1_000_000
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "needs numpy")
+class TestNumpyTable(TestArrayTable):
+    """KnownPidTable on NumPy arrays"""
+
+    use_numpy = True
+
+    def test_datetime64(self) -> None:
+        table = self.make_table()
+        assert str(table.created.dtype) == "datetime64[us]"
+        assert table.mask(created_after=START + timedelta(minutes=3)).sum() == 3
+
+
+class TestFindAllTable(unittest.TestCase):
+    """Filling a table from a find_all response"""
+
+    def tearDown(self) -> None:
+        transports.clear()
+
+    def test_find_all_table(self) -> None:
+        bound = datetime(2024, 5, 1, 10, 0, 1, tzinfo=UTC)
+        with stub_client(StubService()) as client:
+            api = PIDManagementApi(client)
+            table = api.find_all_table(size=120, chunk_size=512)
+            until = api.find_all_table(size=120, modified_before=bound)
+        assert len(table) == 120
+        assert table.pid(61) == "sandboxed/known/61"
+        assert table[61].modified == bound
+        assert len(table.filter(modified_after=datetime(2024, 5, 1, 10, 0, 58, tzinfo=UTC))) == 4
+        # the bounds match those of find_all
+        assert table.filter(modified_before=bound) == until
+
+
+if __name__ == '__main__':
+    unittest.main()
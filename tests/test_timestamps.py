@@ -0,0 +1,91 @@
+# coding: utf-8
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from pytypid import ApiClient, Configuration
+from pytypid.rest import transports
+from pytypid.timestamps import _normalized, parse_datetime
+from pytypid_generated_client.exceptions import ApiException
+
+UTC = timezone.utc
+
+
+class TestParseDatetime(unittest.TestCase):
+    """Parsing of ISO-8601 timestamps"""
+
+    def tearDown(self) -> None:
+        transports.clear()
+
+    def test_server_formats(self) -> None:
+        self.assertEqual(
+            parse_datetime("2024-05-01T10:00:00Z"), datetime(2024, 5, 1, 10, tzinfo=UTC)
+        )
+        self.assertEqual(
+            parse_datetime("2024-05-01T10:00:00.123Z"),
+            datetime(2024, 5, 1, 10, 0, 0, 123000, tzinfo=UTC),
+        )
+        self.assertEqual(
+            parse_datetime("2024-05-01T10:00:00.123456789Z"),
+            datetime(2024, 5, 1, 10, 0, 0, 123456, tzinfo=UTC),
+        )
+        self.assertEqual(
+            parse_datetime("2024-05-01T10:00:00.5+02:00"),
+            datetime(2024, 5, 1, 10, 0, 0, 500000, tzinfo=timezone(timedelta(hours=2))),
+        )
+        self.assertEqual(parse_datetime("2024-05-01T10:00:00"), datetime(2024, 5, 1, 10))
+
+    def test_normalized(self) -> None:
+        # the forms older Python versions cannot parse directly
+        self.assertEqual(_normalized("2024-05-01T10:00Z"), "2024-05-01T10:00+00:00")
+        self.assertEqual(
+            _normalized("2024-05-01T10:00:00.1234567-0130"),
+            "2024-05-01T10:00:00.123456-01:30",
+        )
+        self.assertEqual(
+            _normalized("2024-05-01T10:00:00,5+02"), "2024-05-01T10:00:00.500000+02:00"
+        )
+        self.assertEqual(_normalized("not a timestamp"), "not a timestamp")
+
+    def test_fallback(self) -> None:
+        self.assertEqual(parse_datetime("20240501T100000Z"), datetime(2024, 5, 1, 10, tzinfo=UTC))
+        # like the generated client, accept what `dateutil.parser.parse` does
+        self.assertEqual(
+            parse_datetime("Wed, 01 May 2024 10:00:00 GMT"), datetime(2024, 5, 1, 10, tzinfo=UTC)
+        )
+        with self.assertRaises(ValueError):
+            parse_datetime("yesterday")
+
+    def test_cache(self) -> None:
+        text = "".join(["2024-05-01T10:00:", "07Z"])
+        self.assertIs(parse_datetime(text), parse_datetime("2024-05-01T10:00:07Z"))
+
+    def test_deserialize(self) -> None:
+        client = ApiClient(Configuration(host="http://localhost"))
+        self.assertEqual(
+            client.deserialize('"2024-05-01T10:00:00Z"', "datetime", "application/json"),
+            datetime(2024, 5, 1, 10, tzinfo=UTC),
+        )
+        # fails if the generated client stops calling the overridden method
+        with mock.patch("pytypid.client.parse_datetime", wraps=parse_datetime) as parse:
+            self.assertEqual(
+                client.deserialize('"May 1 2024 10:00 UTC"', "datetime", "application/json"),
+                datetime(2024, 5, 1, 10, tzinfo=UTC),
+            )
+        parse.assert_called_once_with("May 1 2024 10:00 UTC")
+        with self.assertRaises(ApiException):
+            client.deserialize('"yesterday"', "datetime", "application/json")
+        for validation in ("none", "structural"):
+            client = ApiClient(Configuration(response_validation=validation))
+            known_pids = client.deserialize(
+                '[{"pid": "a", "created": "2024-05-01T10:00:00Z",'
+                ' "modified": "2024-05-01T10:00:00Z"}]',
+                "List[KnownPid]", "application/json",
+            )
+            self.assertEqual(known_pids[0].created, datetime(2024, 5, 1, 10, tzinfo=UTC))
+            self.assertIs(known_pids[0].created, known_pids[0].modified)
+
+
+if __name__ == '__main__':
+    unittest.main()
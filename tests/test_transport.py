@@ -0,0 +1,116 @@
+# coding: utf-8
+
+import copy
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from typing import List
+
+from pytypid import ApiClient, Configuration, PIDManagementApi, SimpleRecord
+from pytypid.rest import transports
+from pytypid.stub import StubService
+from pytypid.transport import Transport, WSGITransport
+from pytypid_generated_client.exceptions import BadRequestException
+from pytypid_generated_client.models import KnownPid, PIDRecord
+
+from stub_server import StubServer
+
+KEY = "21.T11148/d0773859091aeb451528"
+
+
+def make_records(count: int) -> List[PIDRecord]:
+    records = []
+    for i in range(count):
+        simple = SimpleRecord.from_dict({
+            "pid": "p%d" % i, "record": [{"key": KEY, "value": "p%d" % ((i + 1) % count)}]
+        })
+        assert simple is not None
+        records.append(simple.to_record())
+    return records
+
+
+class TestWSGITransport(unittest.TestCase):
+    """Calling a WSGI application in-process"""
+
+    def setUp(self) -> None:
+        self.service = StubService(compress_responses=True)
+        self.transport = WSGITransport(self.service)
+        self.client = ApiClient(Configuration(
+            host="http://stub.invalid", transport=self.transport, request_compression="gzip"
+        ))
+        self.api = PIDManagementApi(self.client)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        transports.clear()
+
+    def test_api_calls(self) -> None:
+        response = self.api.create_pids(make_records(3))
+
+        assert len(response.pid_records or []) == 3
+        assert response.mapping is not None
+        created = self.service.records[response.mapping["p0"]]
+        assert created["entries"][KEY][0]["value"] == response.mapping["p1"]
+        invalid = PIDRecord.from_dict({"entries": {"invalid": []}})
+        assert invalid is not None
+        with self.assertRaises(BadRequestException):
+            self.api.create_pid(invalid)
+        assert len(transports) == 0
+
+    def test_compressed_streaming(self) -> None:
+        with self.api.find_all_stream(size=1000, chunk_size=100) as stream:
+            known_pids: List[KnownPid] = list(stream)
+        self.api.create_pids(make_records(300), dryrun=True)
+
+        assert len(known_pids) == 1000
+        metrics = self.client.metrics.snapshot()
+        assert metrics["response_bytes_received"] < metrics["response_bytes_decoded"]
+        assert 0 < metrics["request_bytes_compressed"] < metrics["request_bytes_uncompressed"]
+        assert not self.service.records
+
+    def test_copied_configuration_shares_transport(self) -> None:
+        configuration = copy.deepcopy(self.client.configuration)
+
+        assert configuration.transport is self.transport
+        with ApiClient(configuration) as client:
+            assert client.rest_client.pool_manager is self.transport
+            assert client.rest_client.warm_up("http://stub.invalid") == 0
+
+    def test_transport_is_abstract(self) -> None:
+        with self.assertRaises(TypeError):
+            Transport()  # type: ignore[abstract]
+
+
+class TestConnectionOptions(unittest.TestCase):
+    """Unix domain sockets and HTTP/2"""
+
+    def tearDown(self) -> None:
+        transports.clear()
+
+    def test_unix_socket(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stub.sock")
+            with StubServer(unix_socket=path) as server:
+                configuration = Configuration(host=server.url, unix_socket=path)
+                with ApiClient(configuration) as client:
+                    api = PIDManagementApi(client)
+                    assert len(api.find_all(size=10)) == 10
+                    response = api.create_pids(make_records(2), dryrun=True)
+                    metrics = client.metrics.snapshot()
+
+        assert len(response.pid_records or []) == 2
+        assert json.loads(server.requests[-1].body)[0]["pid"] == "p0"
+        assert server.requests[-1].headers["Host"] == "localhost"
+        assert metrics["connections_created"] == 1
+        assert metrics["connections_reused"] == 1
+
+    @unittest.skipIf(importlib.util.find_spec("h2") is not None, "h2 is installed")
+    def test_http2_needs_h2(self) -> None:
+        with self.assertRaises(ImportError):
+            ApiClient(Configuration(host="https://localhost", http2=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+# coding: utf-8
+
+import unittest
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from urllib3.exceptions import MaxRetryError
+
+from pytypid import CompactRecord
+from pytypid.stub import StubService
+from pytypid.update import (
+    FAILED, UNCHANGED, UPDATED, diff_records, reconcile_records, update_records,
+)
+from pytypid_generated_client.exceptions import ApiException
+from pytypid_generated_client.models import PIDRecord, PIDRecordEntry
+
+from stub_client import StubTestCase
+
+A = "21.T11148/a"
+B = "21.T11148/b"
+
+
+class TestDiffRecords(unittest.TestCase):
+    """Order-insensitive comparison of records"""
+
+    def test_diff(self) -> None:
+        current = CompactRecord("p", [A, A, B], ["1", "2", "x"]).to_record()
+        shuffled = CompactRecord("p", [B, A, A], ["x", "2", "1"]).to_record()
+        assert not diff_records(current, shuffled).changed
+        diff = diff_records(current, CompactRecord("p", [A, A, A], ["2", "3", "2"]).to_record())
+        assert diff.changed
+        assert [(e.value, e.name) for e in diff.added[A]] == [("2", None), ("3", None)]
+        assert [e.value for e in diff.removed[A]] == ["1"]
+        assert [e.value for e in diff.removed[B]] == ["x"]
+        assert B not in diff.added
+        named = CompactRecord("p", [A, A, B], ["1", "2", "x"], ["one", None, None]).to_record()
+        assert diff_records(current, named).changed
+
+
+class TestReconcileRecords(StubTestCase):
+    """Updating only the changed records"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.methods: List[str] = []
+        records = [CompactRecord("r%d" % i, [A], [str(i)]).to_record() for i in range(4)]
+        self.pids = list((self.api.create_pids(records).mapping or {}).values())
+        self.methods.clear()
+
+    def app(self, environ: Dict[str, Any], start_response: Any) -> Iterable[bytes]:
+        self.methods.append(environ["REQUEST_METHOD"])
+        return super().app(environ, start_response)
+
+    def desired(self) -> List[PIDRecord]:
+        return [
+            CompactRecord(pid, [A], ["new" if i == 1 else str(i)]).to_record()
+            for i, pid in enumerate(self.pids)
+        ]
+
+    def test_reconcile(self) -> None:
+        desired = self.desired() + [CompactRecord("sandboxed/missing", [A], ["1"]).to_record()]
+        results = reconcile_records(self.api, desired, workers=2)
+        assert [result.status for result in results] == [
+            UNCHANGED, UPDATED, UNCHANGED, UNCHANGED, FAILED
+        ]
+        assert sorted(self.methods) == ["GET"] * 5 + ["PUT"]
+        updated = results[1]
+        assert updated.diff is not None and updated.record is not None
+        assert [e.value for e in updated.diff.added[A]] == ["new"]
+        assert (updated.record.entries or {})[A][0].value == "new"
+        assert self.service.records[self.pids[1]]["entries"][A][0]["value"] == "new"
+        error = results[4].error
+        assert isinstance(error, ApiException) and error.status == 404
+        with self.assertRaises(ValueError):
+            reconcile_records(self.api, [CompactRecord(None, [A], ["1"]).to_record()])
+
+    def test_transport_error(self) -> None:
+        self.broken = self.pids[2]
+        results = reconcile_records(self.api, self.desired(), workers=1)
+        assert [result.status for result in results] == [
+            UNCHANGED, UPDATED, FAILED, UNCHANGED
+        ]
+        assert isinstance(results[2].error, MaxRetryError)
+        assert self.service.records[self.pids[1]]["entries"][A][0]["value"] == "new"
+
+    def test_cache(self) -> None:
+        cache: Dict[str, PIDRecord] = {}
+        reconcile_records(self.api, self.desired(), cache=cache, dryrun=True)
+        assert self.service.records[self.pids[1]]["entries"][A][0]["value"] == "1"
+        self.methods.clear()
+        results = reconcile_records(self.api, self.desired(), cache=cache)
+        assert self.methods == ["PUT"]
+        assert results[1].status == UPDATED
+        self.methods.clear()
+        results = reconcile_records(self.api, self.desired(), cache=cache)
+        assert self.methods == []
+        assert {result.status for result in results} == {UNCHANGED}
+
+
+def append(value: str) -> Callable[[PIDRecord], PIDRecord]:
+    def mutator(record: PIDRecord) -> PIDRecord:
+        entries = (record.entries or {}).setdefault(A, [])
+        if value not in [entry.value for entry in entries]:
+            entries.append(PIDRecordEntry(key=A, value=value))
+        return record
+    return mutator
+
+
+class TestUpdateRecords(StubTestCase):
+    """Updates with If-Match and retries on conflicts"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.interfere: Callable[[Dict[str, Any]], None] = lambda environ: None
+        self.etags = True
+        self.puts: List[Dict[str, Any]] = []
+        records = [CompactRecord("r%d" % i, [A], ["0"]).to_record() for i in range(3)]
+        self.pids = list((self.api.create_pids(records).mapping or {}).values())
+
+    def stub_service(self) -> StubService:
+        return StubService(require_if_match=True)
+
+    def app(self, environ: Dict[str, Any], start_response: Any) -> Iterable[bytes]:
+        if environ["REQUEST_METHOD"] == "PUT":
+            self.puts.append(environ)
+            self.interfere(environ)
+
+        def respond(status: str, headers: List[Tuple[str, str]]) -> Any:
+            if not self.etags:
+                headers = [(name, value) for name, value in headers if name != "ETag"]
+            return start_response(status, headers)
+        return super().app(environ, respond)
+
+    def values(self, pid: str) -> List[str]:
+        return [entry["value"] for entry in self.service.records[pid]["entries"][A]]
+
+    def test_update(self) -> None:
+        results = update_records(self.api, append("1"), self.pids + ["sandboxed/missing"])
+        assert [result.status for result in results] == [UPDATED] * 3 + [FAILED]
+        assert all(self.values(pid) == ["0", "1"] for pid in self.pids)
+        assert [result.attempts for result in results] == [1] * 4
+        results = update_records(self.api, append("1"), self.pids)
+        assert {result.status for result in results} == {UNCHANGED}
+
+    def test_conflict(self) -> None:
+        target = self.pids[1]
+        puts: List[str] = []
+
+        def interfere(environ: Dict[str, Any]) -> None:
+            puts.append(environ["PATH_INFO"])
+            if environ["PATH_INFO"].endswith(target) and puts.count(environ["PATH_INFO"]) == 1:
+                # another client updates the record in between
+                self.service.records[target]["entries"][A].append({"key": A, "value": "other"})
+        self.interfere = interfere
+        results = update_records(self.api, append("1"), self.pids, workers=1)
+        assert [result.attempts for result in results] == [1, 2, 1]
+        assert self.values(target) == ["0", "other", "1"]
+
+    def test_attempts(self) -> None:
+        def interfere(environ: Dict[str, Any]) -> None:
+            self.service.records[self.pids[0]]["entries"][A][0]["value"] += "+"
+        self.interfere = interfere
+        result = update_records(self.api, append("1"), self.pids[:1], attempts=3)[0]
+        assert (result.status, result.attempts) == (FAILED, 3)
+        assert isinstance(result.error, ApiException) and result.error.status == 412
+        with self.assertRaises(ValueError):
+            update_records(self.api, append("1"), self.pids, attempts=0)
+
+    def test_headers(self) -> None:
+        results = update_records(self.api, append("1"), self.pids[:1], _headers={"X-Job": "7"})
+        assert results[0].status == UPDATED
+        assert self.puts[0]["HTTP_X_JOB"] == "7"
+        assert self.puts[0]["HTTP_IF_MATCH"]
+
+    def test_no_etag(self) -> None:
+        self.etags = False
+        result = update_records(self.api, append("1"), self.pids[:1])[0]
+        assert result.status == FAILED
+        assert isinstance(result.error, ValueError)
+        assert self.puts == []
+        assert self.values(self.pids[0]) == ["0"]
+
+    def test_mutator_error(self) -> None:
+        def mutator(record: PIDRecord) -> PIDRecord:
+            if record.pid == self.pids[1]:
+                raise KeyError("missing")
+            return append("1")(record)
+        results = update_records(self.api, mutator, self.pids, workers=1)
+        assert [result.status for result in results] == [UPDATED, FAILED, UPDATED]
+        assert isinstance(results[1].error, KeyError)
+        assert self.values(self.pids[2]) == ["0", "1"]
+
+    def test_transport_error(self) -> None:
+        self.broken = self.pids[1]
+        results = update_records(self.api, append("1"), self.pids, workers=1)
+        assert [result.status for result in results] == [UPDATED, FAILED, UPDATED]
+        assert isinstance(results[1].error, MaxRetryError)
+        assert self.values(self.pids[2]) == ["0", "1"]
+
+    def test_if_match_required(self) -> None:
+        with self.assertRaises(ApiException) as raised:
+            self.api.update_pid_record(self.pids[0], CompactRecord(None, [A], ["2"]).to_record())
+        assert raised.exception.status == 428
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# coding: utf-8
+
+import unittest
+from typing import Any, Dict, Iterable
+
+from pytypid import CompactRecord, SimpleRecord
+from pytypid.validation import PROFILE_KEY, ValidationCache, record_hash
+
+from stub_client import StubTestCase
+
+A = "21.T11148/a"
+B = "21.T11148/b"
+
+
+def record(pid: str, profile: str = "profile/1", value: str = "1") -> CompactRecord:
+    return CompactRecord(pid, [PROFILE_KEY, A, B], [profile, value, "x"])
+
+
+class TestRecordHash(unittest.TestCase):
+    """Canonical hashes of records"""
+
+    def test_hash(self) -> None:
+        original = CompactRecord("p", [A, B, A], ["1", "x", "2"], ["one", None, None])
+        shuffled = CompactRecord("q", [B, A, A], ["x", "2", "1"], [None, None, "one"])
+        assert record_hash(original) == record_hash(shuffled)
+        assert record_hash(original) == record_hash(original.to_record())
+        assert record_hash(original, include_pid=True) != record_hash(shuffled, include_pid=True)
+        unnamed = CompactRecord("p", [A, B, A], ["1", "x", "2"])
+        assert record_hash(original) != record_hash(unnamed)
+        simple = SimpleRecord.from_dict({"pid": "p", "record": [
+            {"key": A, "value": "1"}, {"key": B, "value": "x"}, {"key": A, "value": "2"},
+        ]})
+        assert simple is not None
+        assert record_hash(simple) == record_hash(unnamed)
+        assert record_hash(CompactRecord("p", [A], [""])) != record_hash(
+            CompactRecord("p", [A], [None])
+        )
+
+
+class TestValidationCache(StubTestCase):
+    """Remembered outcomes of dry runs"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.now = 0.0
+        self.posts = 0
+        self.cache = ValidationCache(ttl=60, max_size=3, clock=lambda: self.now)
+
+    def app(self, environ: Dict[str, Any], start_response: Any) -> Iterable[bytes]:
+        if environ["REQUEST_METHOD"] == "POST":
+            self.posts += 1
+        return self.service(environ, start_response)
+
+    def test_validate(self) -> None:
+        assert self.cache.validate(self.api, record("a")) is None
+        assert self.cache.validate(self.api, record("b")) is None
+        assert self.posts == 1
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+        assert self.service.records == {}
+        invalid = CompactRecord("c", ["invalid"], ["1"])
+        error = self.cache.validate(self.api, invalid)
+        assert error is not None and error.status == 400
+        assert self.cache.validate(self.api, invalid) is error
+        assert self.posts == 2
+        # outcomes expire
+        self.now += 61
+        assert self.cache.validate(self.api, record("d")) is None
+        assert self.posts == 3
+
+    def test_validate_many(self) -> None:
+        records = [record(str(i), value=str(i % 3)) for i in range(9)]
+        records.append(CompactRecord("c", ["invalid"], ["1"]))
+        errors = self.cache.validate_many(self.api, records, workers=3)
+        assert errors[:9] == [None] * 9
+        assert errors[9] is not None
+        assert self.posts == 4
+        # only the newest three outcomes are kept
+        assert len(self.cache) == 3
+        self.cache.validate_many(self.api, records[:3])
+        assert self.posts == 5
+
+    def test_profiles(self) -> None:
+        first, second = record("a"), record("b", profile="profile/2")
+        assert self.cache.key(first)[0] == ("profile/1",)
+        assert self.cache.key(first) != self.cache.key(second)
+        self.cache.validate_many(self.api, [first, second])
+        self.cache.invalidate("profile/1")
+        assert len(self.cache) == 1
+        self.cache.validate_many(self.api, [first, second])
+        assert self.posts == 3
+        self.cache.invalidate()
+        assert len(self.cache) == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
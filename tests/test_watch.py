@@ -0,0 +1,86 @@
+# coding: utf-8
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+
+from pytypid import PIDManagementApi
+from pytypid.watch import KnownPidWatcher, watch_known_pids
+from pytypid_generated_client.models import KnownPid
+
+from stub_client import KnownPidTestCase, stub_client
+
+
+class TestKnownPidWatcher(KnownPidTestCase):
+    """Polling for created and modified known PIDs"""
+
+    def watcher(self, **kwargs: Any) -> KnownPidWatcher:
+        kwargs = dict(dict(start=self.clock.now, page_size=4, min_interval=1, max_interval=8),
+                      **kwargs)
+        return KnownPidWatcher(self.api, **kwargs)
+
+    def test_poll(self) -> None:
+        self.create(1)
+        self.clock.advance(60)
+        watcher = self.watcher()
+        assert watcher.poll() == []
+        assert watcher.interval == 2
+        pids = self.create(6)
+        self.clock.advance(1)
+        changes = watcher.poll()
+        assert sorted(known_pid.pid for known_pid in changes) == sorted(pids)
+        assert watcher.interval == 1
+        # the overlap is read again, but nothing is reported twice
+        assert watcher.poll() == []
+        assert watcher.poll() == []
+        assert watcher.interval == 4
+        self.update(pids[2])
+        changes = watcher.poll()
+        assert [known_pid.pid for known_pid in changes] == [pids[2]]
+        assert changes[0].modified == watcher.watermark == self.clock.now
+        assert watcher.interval == 2
+        for _ in range(5):
+            watcher.poll()
+        assert watcher.interval == 8
+
+    def test_late_modification(self) -> None:
+        watcher = self.watcher(overlap=timedelta(seconds=30))
+        self.create(2)
+        self.clock.advance(60)
+        assert len(watcher.poll()) == 2
+        late = self.create(1)[0]
+        self.service.known_pids[late]["modified"] -= timedelta(seconds=10)
+        assert [known_pid.pid for known_pid in watcher.poll()] == [late]
+
+    def test_cursor(self) -> None:
+        first = self.create(3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "watch.json")
+            watcher = self.watcher(cursor=path, min_interval=0)
+            seen: List[KnownPid] = []
+
+            def handle(known_pid: KnownPid) -> None:
+                seen.append(known_pid)
+                if len(seen) == 3:
+                    watcher.stop()
+            watcher.run(handle)
+            assert sorted(known_pid.pid for known_pid in seen) == sorted(first)
+
+            self.clock.advance(1)
+            second = self.create(2)
+            self.update(first[0])
+            restarted = self.watcher(cursor=path, start=datetime(2000, 1, 1, tzinfo=timezone.utc))
+            assert restarted.watermark == watcher.watermark
+            changes = watch_known_pids(self.api, cursor=path, min_interval=0)
+            pids = [next(changes).pid for _ in range(3)]
+            assert sorted(pids) == sorted(second + first[:1])
+
+            other = PIDManagementApi(stub_client(self.service, "http://other.invalid"))
+            with self.assertRaises(ValueError):
+                KnownPidWatcher(other, path)
+
+
+if __name__ == '__main__':
+    unittest.main()